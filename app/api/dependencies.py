@@ -31,8 +31,8 @@ from app.services.interviews.verification_service import VerificationService
 from app.services.interviews.session_service import SessionService
 from app.services.recordings.recording_service import RecordingService
 from app.services.reporting.reporting_service import ReportingService
-from app.services.analysis.analysis_service import AnalysisService
-from app.services.transcription.transcription_service import TranscriptionService
+from app.services.analysis.analysis_service import AnalysisService, analysis_service
+from app.services.transcription.transcription_service import TranscriptionService, transcription_service
 
 # ============================================================================
 # Database Dependencies
@@ -83,23 +83,17 @@ interviewer_dependency = active_user_dependency  # Interviewers need active subs
 
 # Content processing services
 def get_transcription_service() -> TranscriptionService:
-    """Dependency for getting a TranscriptionService instance."""
-    return TranscriptionService()
+    """Dependency for getting the shared TranscriptionService instance."""
+    return transcription_service
 
 def get_analysis_service() -> AnalysisService:
-    """Dependency for getting an AnalysisService instance."""
-    return AnalysisService()
+    """Dependency for getting the shared AnalysisService instance."""
+    return analysis_service
 
 # Core business services
-def get_recording_service(
-    transcription_service: TranscriptionService = Depends(get_transcription_service),
-    analysis_service: AnalysisService = Depends(get_analysis_service)
-) -> RecordingService:
+def get_recording_service() -> RecordingService:
     """Dependency for getting a RecordingService instance."""
-    return RecordingService(
-        transcription_service=transcription_service,
-        analysis_service=analysis_service
-    )
+    return RecordingService()
 
 def get_session_service() -> SessionService:
     """Dependency for getting a SessionService instance."""
@@ -7,7 +7,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Any, Union
 from enum import Enum
 from sqlalchemy import or_
@@ -28,7 +28,8 @@ from app.schemas.payment_schemas import SubscriptionUpdate
 from app.schemas.admin_schemas import (
     SystemConfigUpdate,
     SystemStatusResponse,
-    MonitoringMetricsResponse
+    MonitoringMetricsResponse,
+    LLMUsageDailyResponse
 )
 from app.api.exceptions import not_found, forbidden, bad_request
 from app.utils.rate_limiter import dynamic_rate_limit
@@ -696,6 +697,43 @@ def get_system_status(
     
     return status
 
+@router.get("/usage/llm/daily",
+          response_model=List[LLMUsageDailyResponse],
+          summary="Daily LLM Usage",
+          description="Get pre-aggregated daily LLM token usage and cost per tenant and model")
+def get_llm_usage_daily(
+    start_day: Optional[date] = Query(None, description="First day included (UTC)"),
+    end_day: Optional[date] = Query(None, description="Last day included (UTC)"),
+    user_id: Optional[int] = Query(None, description="Only this tenant (interviewer user ID)"),
+    model: Optional[str] = Query(None, description="Only this model"),
+    db: Session = db_dependency,
+    _: Admin = admin_dependency
+):
+    """
+    Get daily LLM usage rollups, newest day first.
+    
+    Every analysis call is metered with its tokens and estimated cost; the
+    daily totals per tenant and model are maintained as calls are recorded,
+    so this endpoint reads them without scanning individual calls. Calls
+    still buffered in a worker (up to USAGE_METER_FLUSH_SECONDS) are not
+    included yet.
+    
+    Parameters:
+    - **start_day** (optional): First day included
+    - **end_day** (optional): Last day included
+    - **user_id** (optional): Only this tenant
+    - **model** (optional): Only this model
+    
+    Returns:
+    - One entry per day, tenant and model; user_id is null for calls not tied to a tenant
+    """
+    from app.services.analysis.usage_meter import usage_meter
+    
+    if start_day and end_day and start_day > end_day:
+        bad_request("start_day must not be after end_day")
+    
+    return usage_meter.daily_rollups(db, start_day=start_day, end_day=end_day, user_id=user_id, model=model)
+
 # Add a utility endpoint to fix interviews with invalid questions
 @router.post("/system/fix-invalid-questions", 
              response_model=Dict[str, Any],
@@ -3,14 +3,21 @@ Endpoints for candidate recording management.
 Handles uploading and storing audio recordings.
 All processing logic has been moved to the service layer.
 """
-from fastapi import APIRouter, File, UploadFile, Form
+from fastapi import APIRouter, File, UploadFile, Form, WebSocket, status
 from sqlalchemy.orm import Session
+from typing import Optional
+import json
+import logging
 import os
 
 from app.api.dependencies import db_dependency
 from app.api.dependencies import recording_service_dependency
 from app.schemas import RecordingResponse
 from app.services.recordings.recording_service import RecordingService
+from app.services.transcription.live_transcriber import live_transcriber
+
+# Configure logging
+logger = logging.getLogger(__name__)
 
 # Create router
 recordings_router = APIRouter()
@@ -23,6 +30,7 @@ async def save_recording(
     token: str = Form(..., description="Token used to start the session"),
     question_id: int = Form(...),
     audio_file: UploadFile = File(...),
+    stream_id: Optional[str] = Form(None, description="Live stream of this answer (see /stream); its transcript is reused"),
     db: Session = db_dependency,
     recording_service: RecordingService = recording_service_dependency
 ):
@@ -34,12 +42,17 @@ async def save_recording(
     2. Recording metadata storage in database
     
     Note: Transcription and analysis are now handled via batch processing 
-    after session completion or through the /batch/analyze endpoint.
+    after session completion or through the /batch/analyze endpoint. With
+    TRANSCRIBE_ON_UPLOAD enabled, transcription starts as soon as the upload
+    is saved and session completion only runs the analysis. An answer that
+    was streamed to /stream is already transcribed: pass its stream_id and
+    the streamed transcript is stored instead of transcribing again.
     
     Parameters:
     - **token**: Token used to start the session
     - **question_id**: ID of the question being answered
     - **audio_file**: The audio recording file
+    - **stream_id**: ID of the answer's live stream, if it was streamed
     
     Returns:
     - Recording details including ID and file path. Transcript and analysis will be added later via batch processing.
@@ -51,13 +64,82 @@ async def save_recording(
     file_content = await audio_file.read()
     file_extension = os.path.splitext(audio_file.filename)[1]
     
-    # Delegate business logic to the service (upload-only, no transcription)
+    # Delegate business logic to the service (queues transcription when TRANSCRIBE_ON_UPLOAD is set)
     recording = await recording_service.save_recording_by_token(
         token=token,
         question_id=question_id,
         file_content=file_content,
         file_extension=file_extension,
-        db=db
+        db=db,
+        stream_id=stream_id
     )
     
     return recording
+
+@recordings_router.websocket("/stream")
+async def stream_recording(
+    websocket: WebSocket,
+    token: str,
+    question_id: int,
+    file_extension: str = ".webm",
+    db: Session = db_dependency,
+    recording_service: RecordingService = recording_service_dependency
+):
+    """
+    Stream an answer while it is being recorded, so it is transcribed as it goes.
+    
+    Protocol:
+    1. Connect with the session token and question ID as query parameters.
+       The server replies {"type": "ready", "stream_id": ...}.
+    2. Send the recorder's chunks (e.g. MediaRecorder timeslices) as binary
+       messages, in order. Progress messages {"type": "progress", "text": ...}
+       are sent as audio is transcribed.
+    3. When recording stops, send {"type": "finish"}. The server transcribes
+       the last few seconds and replies {"type": "final", ...} before closing.
+    4. Upload the answer file to the recordings endpoint with the stream_id
+       and the streamed transcript is reused. Streams are held in memory by
+       the worker that received them; an upload handled elsewhere is
+       transcribed normally.
+    
+    A connection that closes before "finish" discards the stream.
+    """
+    try:
+        stream = await recording_service.open_live_stream(token, question_id, file_extension, db)
+    except Exception as e:
+        logger.warning(f"Rejected live stream for question {question_id}: {e}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e)[:120])
+        return
+    finally:
+        # The stream outlives the request; don't hold a DB connection for the whole answer
+        db.close()
+    
+    await websocket.accept()
+    await websocket.send_json({"type": "ready", **stream.to_status()})
+    sent_seconds = 0.0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                await live_transcriber.append(stream, message["bytes"])
+                if stream.committed_seconds > sent_seconds:
+                    sent_seconds = stream.committed_seconds
+                    await websocket.send_json({"type": "progress", **stream.to_status()})
+            elif message.get("text") and json.loads(message["text"]).get("type") == "finish":
+                await live_transcriber.finish(stream)
+                await websocket.send_json({"type": "final", **stream.to_status()})
+                await websocket.close()
+                break
+    except Exception as e:
+        logger.error(f"Live stream {stream.stream_id} failed: {e}")
+        stream.error = str(e)
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
+            # Already closed by the client
+            pass
+    finally:
+        if not stream.finished:
+            live_transcriber.discard(stream)
@@ -48,6 +48,8 @@ def create_interview(
     # Create the interview
     db_interview = Interview(
         title=interview.title,
+        language=interview.language,
+        language_source="explicit" if interview.language else None,
         interviewer_id=current_user.id
     )
     
@@ -94,10 +96,13 @@ def update_interview(
     db: Session = db_dependency,
     current_user: User = active_user_dependency
 ):
-    """Update an interview's title"""
+    """Update an interview's title and, if given, its transcription language"""
     interview = get_interview_by_key(db, interview_key, current_user.id)
     
     interview.title = interview_update.title
+    if "language" in interview_update.model_fields_set:
+        interview.language = interview_update.language
+        interview.language_source = "explicit" if interview_update.language else None
     db.commit()
     db.refresh(interview)
     
@@ -333,6 +338,9 @@ def update_interview_with_questions(
     # Update interview title
     if interview_update.title:
         interview.title = interview_update.title
+    if "language" in interview_update.model_fields_set:
+        interview.language = interview_update.language
+        interview.language_source = "explicit" if interview_update.language else None
     
     # Update questions if provided
     if interview_update.questions:
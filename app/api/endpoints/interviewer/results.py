@@ -11,7 +11,7 @@ import os
 from datetime import datetime, timezone, timedelta
 
 from app.api.dependencies import db_dependency, active_user_dependency
-from app.core.database.models import User, Interview, CandidateSession, Recording, Token, Question
+from app.core.database.models import User, Interview, CandidateSession, Recording, Token
 from app.schemas.interview_schemas import InterviewResult
 from app.schemas.recording_schemas import RecordingDetails, RecordingResponse
 from app.api.exceptions import not_found, forbidden
@@ -574,11 +574,6 @@ async def _process_session_recordings_batch(
             if force_reprocess or recording.transcription_status in ["pending", "failed"]:
                 await _process_recording_transcription(db, recording, force_reprocess)
             
-            # Process analysis if transcription is complete
-            if recording.transcription_status == "completed" and recording.transcript:
-                if force_reprocess or recording.analysis_status in ["pending", "failed"]:
-                    await _process_recording_analysis(db, recording, force_reprocess)
-            
         except Exception as e:
             logger.error(f"Failed to process recording {recording_id} in batch: {str(e)}")
             # Update recording with error status
@@ -591,6 +586,16 @@ async def _process_session_recordings_batch(
             except Exception as db_error:
                 logger.error(f"Failed to update recording error status: {str(db_error)}")
     
+    # Answers are analyzed together once every transcript is in
+    recordings = db.query(Recording).filter(Recording.id.in_(recording_ids)).all()
+    to_analyze = [
+        recording for recording in recordings
+        if recording.transcription_status == "completed" and recording.transcript
+        and (force_reprocess or recording.analysis_status in ["pending", "failed"])
+    ]
+    if to_analyze:
+        await _process_session_analysis(db, session_id, to_analyze)
+    
     logger.info(f"Completed batch processing for session {session_id}")
 
 async def _process_recording_transcription(
@@ -607,23 +612,17 @@ async def _process_recording_transcription(
         db.commit()
         
         # Import transcription service locally to avoid circular imports
-        from app.services.transcription.transcription_service import TranscriptionService
-        transcription_service = TranscriptionService()
+        from app.services.transcription.transcription_service import transcription_service
         
-        # Attempt transcription
-        transcript = await transcription_service.transcribe_audio(
-            recording.file_path,
-            recording.storage_type
-        )
-        
-        if transcript:
-            recording.transcript = transcript
-            recording.transcription_status = "completed"
-            recording.transcription_error = None
+        # Attempt transcription (byte-identical audio is served from the transcript cache)
+        success = await transcription_service.transcribe_recording(recording.id, db)
+        db.refresh(recording)
+
+        if success:
             if hasattr(recording, 'transcription_retry_count'):
                 recording.transcription_retry_count = 0  # Reset retry count on success
         else:
-            raise Exception("Empty transcript returned")
+            raise Exception(recording.transcription_error or "Empty transcript returned")
             
     except Exception as e:
         error_message = str(e)
@@ -662,57 +661,61 @@ async def _process_recording_transcription(
     finally:
         db.commit()
 
-async def _process_recording_analysis(
+async def _process_session_analysis(
     db: Session,
-    recording: Recording,
-    force_reprocess: bool
+    session_id: int,
+    recordings: List[Recording]
 ):
     """
-    Process analysis with smart retry logic.
+    Analyze a session's answers with smart retry logic.
+    
+    The session is analyzed in one go and each recording stores its own
+    entry of the result; unchanged prompts are served from the analysis cache.
     """
     try:
         # Update status to indicate processing
-        recording.analysis_status = "processing"
+        for recording in recordings:
+            recording.analysis_status = "processing"
         db.commit()
         
         # Import analysis service locally to avoid circular imports
-        from app.services.analysis.analysis_service import AnalysisService
-        analysis_service = AnalysisService()
+        from app.services.analysis.analysis_service import analysis_service
         
-        # Get question text for context
-        question = db.query(Question).filter(Question.id == recording.question_id).first()
-        question_text = question.text if question else None
+        analysis_result = await analysis_service.analyze_session_transcripts(session_id, db)
+        if "error" in analysis_result:
+            raise Exception(analysis_result["error"])
         
-        # Attempt analysis using the analysis service
-        analysis_result = await analysis_service.analyze_response(
-            recording.transcript,
-            question_text
-        )
-        
-        if analysis_result and "error" not in analysis_result:
-            import json
-            recording.analysis = json.dumps(analysis_result)
+        import json
+        responses = {response["recording_id"]: response for response in analysis_result.get("question_responses", [])}
+        for recording in recordings:
+            response = responses.get(recording.id)
+            if response is None:
+                recording.analysis_status = "failed"
+                recording.analysis_error = "Recording missing from the session analysis"
+                continue
+            # The segments are already stored with the transcript
+            recording.analysis = json.dumps({key: value for key, value in response.items() if key != "segments"})
             recording.analysis_status = "completed"
             recording.analysis_error = None
-        else:
-            error_msg = analysis_result.get("error", "Unknown analysis error") if analysis_result else "No analysis result"
-            raise Exception(error_msg)
             
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Analysis failed for recording {recording.id}: {error_message}")
+        logger.error(f"Analysis failed for session {session_id}: {error_message}")
         
-        # For analysis errors, try immediate retry with different approach if available
-        if "rate limit" in error_message.lower():
-            if hasattr(recording, 'next_retry_at'):
-                recording.analysis_status = "retry_scheduled"
-                recording.next_retry_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        # The LLM scheduler has already paced and retried the call; a rate limit that
+        # still comes through means the quota is exhausted, so try again much later
+        from openai import RateLimitError
+        for recording in recordings:
+            if isinstance(e, RateLimitError):
+                if hasattr(recording, 'next_retry_at'):
+                    recording.analysis_status = "retry_scheduled"
+                    recording.next_retry_at = datetime.now(timezone.utc) + timedelta(hours=1)
+                else:
+                    recording.analysis_status = "failed"
             else:
                 recording.analysis_status = "failed"
-        else:
-            recording.analysis_status = "failed"
-        
-        recording.analysis_error = error_message[:500]
+            
+            recording.analysis_error = error_message[:500]
     
     finally:
         db.commit()
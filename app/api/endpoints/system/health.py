@@ -15,6 +15,18 @@ from app.api.dependencies import db_dependency
 from app.core.database.db import get_db_status
 from app.core.tasks import scheduler
 from app.core.config import settings
+from app.services.transcription.model_registry import whisper_model_registry
+from app.services.transcription.inference_executor import inference_executor
+from app.services.transcription.thread_budget import thread_budget
+from app.services.transcription.transcript_cache import transcript_cache
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory
+from app.services.transcription.confidence_cascade import confidence_cascade
+from app.services.transcription.live_transcriber import live_transcriber
+from app.services.monitoring.loop_lag_monitor import loop_lag_monitor
+from app.services.analysis.llm_client import llm_client
+from app.services.analysis.llm_scheduler import llm_scheduler
+from app.services.analysis.usage_meter import usage_meter
+from app.services.analysis.analysis_cache import analysis_cache
 
 # Create router
 system_router = APIRouter()
@@ -96,6 +108,7 @@ def system_status(db: Session = db_dependency):
     Returns:
     - **status**: Overall system status (online/degraded/offline)
     - **components**: Status of individual system components
+    - **inference_thread_budget**: Cores, web workers and the intra/inter-op thread counts chosen for inference
     - **api_version**: Current API version
     - **environment**: Current deployment environment
     - **server_time**: Current server time
@@ -140,6 +153,7 @@ def system_status(db: Session = db_dependency):
             },
             # Add other components as needed
         },
+        "inference_thread_budget": thread_budget.get_stats(),
         "server_time": get_utc_now().isoformat()
     }
 
@@ -168,6 +182,17 @@ def system_metrics():
     - **memory**: Memory utilization metrics
     - **disk**: Disk utilization metrics
     - **system**: General system information
+    - **transcription**: Whisper models resident in this worker with load time and memory cost
+    - **inference_pool**: Inference pool configuration and decode counters
+    - **transcript_cache**: Transcript cache hit rate and eviction counters
+    - **transcription_backends**: Configured backend chain, fallbacks and per-backend counters
+    - **transcription_cascade**: Cascade escalation rates and estimated CPU-seconds saved per recording
+    - **live_transcription**: Live answer streams and how much audio was transcribed before recording stopped
+    - **llm_client**: Analysis completions in flight, timed out, cancelled and their average latency
+    - **llm_scheduler**: Calls queued for rate-limit budget, time spent waiting, retries and remaining budget per model
+    - **usage_meter**: LLM usage records buffered, flushed and dropped in this worker
+    - **analysis_cache**: Analysis cache hit rate and the tokens and cost hits saved
+    - **event_loop**: Event loop lag percentiles, showing whether the web path stays responsive
     - **timestamp**: When these metrics were collected
     """
     # CPU information
@@ -206,5 +231,16 @@ def system_metrics():
             "machine": uname.machine,
             "python_version": platform.python_version()
         },
+        "transcription": whisper_model_registry.get_stats(),
+        "inference_pool": inference_executor.get_stats(),
+        "transcript_cache": transcript_cache.get_stats(),
+        "transcription_backends": TranscriptionBackendFactory.get_stats(),
+        "transcription_cascade": confidence_cascade.get_stats(),
+        "live_transcription": live_transcriber.get_stats(),
+        "llm_client": llm_client.get_stats(),
+        "llm_scheduler": llm_scheduler.get_stats(),
+        "usage_meter": usage_meter.get_stats(),
+        "analysis_cache": analysis_cache.get_stats(),
+        "event_loop": loop_lag_monitor.get_stats(),
         "timestamp": get_utc_now().isoformat()
     }
\ No newline at end of file
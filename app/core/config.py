@@ -4,6 +4,7 @@ Application configuration settings.
 """
 import os
 import sys
+import tempfile
 from typing import Dict, Any, List
 
 # Try to import from pydantic_settings first (newer versions)
@@ -106,12 +107,93 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours    # OpenAI API key for Whisper
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_ANALYSIS_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_ANALYSIS_TIMEOUT_SECONDS", 120))  # Per attempt of an analysis completion
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", 10))
+    OPENAI_ANALYSIS_MAX_RETRIES: int = int(os.getenv("OPENAI_ANALYSIS_MAX_RETRIES", 2))
+    LLM_SCHEDULER_ENABLED: bool = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() in ("true", "1", "t")  # Pace completions against per-model rate limits
+    LLM_DEFAULT_RPM: int = int(os.getenv("LLM_DEFAULT_RPM", 500))  # Requests per minute for models not in LLM_RATE_LIMITS
+    LLM_DEFAULT_TPM: int = int(os.getenv("LLM_DEFAULT_TPM", 200000))  # Tokens per minute for models not in LLM_RATE_LIMITS
+    LLM_RATE_LIMITS: str = os.getenv("LLM_RATE_LIMITS", "")  # Per-model overrides, e.g. "gpt-4o-mini=500:200000,gpt-4o=500:30000"
+    LLM_RETRY_ATTEMPTS: int = int(os.getenv("LLM_RETRY_ATTEMPTS", 5))  # Attempts for rate-limited, connection and 5xx failures
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", 1))
+    LLM_RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", 60))
+    ANALYSIS_MODEL: str = os.getenv("ANALYSIS_MODEL", "gpt-4o-mini")
+    ANALYSIS_MODE: str = os.getenv("ANALYSIS_MODE", "session")  # "session" (one call) or "per_question" (concurrent calls + merge)
+    ANALYSIS_QUESTION_CONCURRENCY: int = int(os.getenv("ANALYSIS_QUESTION_CONCURRENCY", 4))  # Question calls in flight per session
+    ANALYSIS_QUESTION_MAX_COMPLETION_TOKENS: int = int(os.getenv("ANALYSIS_QUESTION_MAX_COMPLETION_TOKENS", 1000))
+    ANALYSIS_PROMPT_TOKEN_BUDGET: int = int(os.getenv("ANALYSIS_PROMPT_TOKEN_BUDGET", 12000))  # Answers are trimmed/compressed beyond this
+    ANALYSIS_MAX_COMPLETION_TOKENS: int = int(os.getenv("ANALYSIS_MAX_COMPLETION_TOKENS", 4000))
+    ANALYSIS_CONTEXT_WINDOW_TOKENS: int = int(os.getenv("ANALYSIS_CONTEXT_WINDOW_TOKENS", 128000))
+    ANALYSIS_MIN_ANSWER_TOKENS: int = int(os.getenv("ANALYSIS_MIN_ANSWER_TOKENS", 40))  # Below this per answer, only metrics are sent
+    SPEECH_METRICS_IN_PROMPT: bool = os.getenv("SPEECH_METRICS_IN_PROMPT", "true").lower() in ("true", "1", "t")  # Send filler-free answers with fluency as compact numbers
+    SPEECH_METRICS_RATE_WINDOWS: int = int(os.getenv("SPEECH_METRICS_RATE_WINDOWS", 3))  # Parts of each answer the speaking rate is reported for
+    TOKEN_COUNT_CACHE_SIZE: int = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 4096))  # Cached transcript token counts
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() in ("true", "1", "t")  # Reuse completions for identical analysis requests
+    ANALYSIS_CACHE_DIR: str = os.getenv("ANALYSIS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "interview_analysis_cache"))
+    ANALYSIS_CACHE_MAX_MB: float = float(os.getenv("ANALYSIS_CACHE_MAX_MB", 64))
+    ANALYSIS_CACHE_TTL_HOURS: float = float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", 24 * 7))
+    USAGE_METER_ENABLED: bool = os.getenv("USAGE_METER_ENABLED", "true").lower() in ("true", "1", "t")  # Persist per-call LLM token usage and daily rollups
+    USAGE_METER_FLUSH_SECONDS: float = float(os.getenv("USAGE_METER_FLUSH_SECONDS", 10))  # Buffered usage is written at least this often
+    USAGE_METER_BATCH_SIZE: int = int(os.getenv("USAGE_METER_BATCH_SIZE", 200))  # Flush early once this many calls are buffered
+    USAGE_METER_MAX_BUFFER: int = int(os.getenv("USAGE_METER_MAX_BUFFER", 10000))  # Oldest records are dropped beyond this while the database is unreachable
+    ANALYSIS_BATCH_BACKEND: str = os.getenv("ANALYSIS_BATCH_BACKEND", "openai")  # "openai" (Batch API) or "stub" (local, for tests)
+    ANALYSIS_BATCH_DIR: str = os.getenv("ANALYSIS_BATCH_DIR", os.path.join(tempfile.gettempdir(), "interview_analysis_batches"))  # Request, manifest and results files
+    ANALYSIS_BATCH_MAX_SESSIONS: int = int(os.getenv("ANALYSIS_BATCH_MAX_SESSIONS", 1000))  # Sessions per request file
+    ANALYSIS_BATCH_COMPLETION_WINDOW: str = os.getenv("ANALYSIS_BATCH_COMPLETION_WINDOW", "24h")
+    ANALYSIS_BATCH_POLL_SECONDS: float = float(os.getenv("ANALYSIS_BATCH_POLL_SECONDS", 60))
+    ANALYSIS_BATCH_INGEST_CHUNK: int = int(os.getenv("ANALYSIS_BATCH_INGEST_CHUNK", 500))  # Sessions per bulk UPDATE
+    ANALYSIS_BATCH_PRICE_FACTOR: float = float(os.getenv("ANALYSIS_BATCH_PRICE_FACTOR", 0.5))  # Batch price relative to synchronous calls
+    ANALYSIS_BATCH_NIGHTLY: bool = os.getenv("ANALYSIS_BATCH_NIGHTLY", "false").lower() in ("true", "1", "t")  # Queue pending sessions every night
     
     # Transcription settings
     USE_OPENAI_WHISPER: bool = os.getenv("USE_OPENAI_WHISPER", "false").lower() in ("true", "1", "t")
-    TRANSCRIPTION_BACKEND: str = os.getenv("TRANSCRIPTION_BACKEND", "openai_api")  # "openai_api" or "local_whisper"
+    TRANSCRIPTION_BACKEND: str = os.getenv("TRANSCRIPTION_BACKEND", "openai_api")  # "openai_api", "local_whisper", "faster_whisper_int8" or "stub"
     WHISPER_MODEL_SIZE: str = os.getenv("WHISPER_MODEL_SIZE", "base")  # tiny, base, small, medium, large
     USE_FALLBACK_TRANSCRIPTION: bool = os.getenv("USE_FALLBACK_TRANSCRIPTION", "true").lower() == "true"  # Enable fallback to local whisper
+    TRANSCRIPTION_FALLBACK_BACKEND: str = os.getenv("TRANSCRIPTION_FALLBACK_BACKEND", "local_whisper")  # Tried when the primary backend fails
+    OPENAI_TRANSCRIPTION_MODEL: str = os.getenv("OPENAI_TRANSCRIPTION_MODEL", "whisper-1")
+    OPENAI_TRANSCRIPTION_CONCURRENCY: int = int(os.getenv("OPENAI_TRANSCRIPTION_CONCURRENCY", 4))  # Concurrent API requests
+    INT8_TRANSCRIPTION_CONCURRENCY: int = int(os.getenv("INT8_TRANSCRIPTION_CONCURRENCY", 1))  # Concurrent faster-whisper decodes
+    STUB_TRANSCRIPTION_SECONDS_PER_AUDIO_SECOND: float = float(os.getenv("STUB_TRANSCRIPTION_SECONDS_PER_AUDIO_SECOND", 0))  # Simulated stub latency
+    INFERENCE_EXECUTOR_MODE: str = os.getenv("INFERENCE_EXECUTOR_MODE", "process")  # "process" or "thread"
+    INFERENCE_POOL_WORKERS: int = int(os.getenv("INFERENCE_POOL_WORKERS", 1))  # Whisper processes per web worker
+    INFERENCE_MAX_CONCURRENT: int = int(os.getenv("INFERENCE_MAX_CONCURRENT", 0))  # Max in-flight decodes (0 = pool size)
+    INFERENCE_THREAD_BUDGET_ENABLED: bool = os.getenv("INFERENCE_THREAD_BUDGET_ENABLED", "true").lower() in ("true", "1", "t")  # Split cores across workers instead of one thread per core per decode
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 1))  # Gunicorn web workers (gunicorn reads the same variable)
+    INFERENCE_CPU_CORES: int = int(os.getenv("INFERENCE_CPU_CORES", 0))  # Cores to budget (0 = detect from affinity/cgroup quota)
+    INFERENCE_INTRA_OP_THREADS: int = int(os.getenv("INFERENCE_INTRA_OP_THREADS", 0))  # Threads per decode (0 = derive from the budget)
+    INFERENCE_INTER_OP_THREADS: int = int(os.getenv("INFERENCE_INTER_OP_THREADS", 1))
+    SESSION_TRANSCRIPTION_CONCURRENCY: int = int(os.getenv("SESSION_TRANSCRIPTION_CONCURRENCY", 2))  # Recordings transcribed at once per session
+    TRANSCRIPTION_CASCADE_ENABLED: bool = os.getenv("TRANSCRIPTION_CASCADE_ENABLED", "false").lower() in ("true", "1", "t")  # Fast model first, escalate unsure segments
+    CASCADE_FAST_MODEL_SIZE: str = os.getenv("CASCADE_FAST_MODEL_SIZE", "tiny")  # First-pass model; WHISPER_MODEL_SIZE handles escalations
+    CASCADE_MIN_AVG_LOGPROB: float = float(os.getenv("CASCADE_MIN_AVG_LOGPROB", -0.8))
+    CASCADE_MAX_NO_SPEECH_PROB: float = float(os.getenv("CASCADE_MAX_NO_SPEECH_PROB", 0.6))
+    CASCADE_MAX_COMPRESSION_RATIO: float = float(os.getenv("CASCADE_MAX_COMPRESSION_RATIO", 2.4))
+    CASCADE_PADDING_SECONDS: float = float(os.getenv("CASCADE_PADDING_SECONDS", 0.5))  # Context around re-transcribed segments
+    INTERVIEW_LANGUAGE_LEARN_SAMPLES: int = int(os.getenv("INTERVIEW_LANGUAGE_LEARN_SAMPLES", 3))  # Agreeing transcripts needed to pin an interview's language (0 = never learn)
+    TRANSCRIBE_ON_UPLOAD: bool = os.getenv("TRANSCRIBE_ON_UPLOAD", "false").lower() in ("true", "1", "t")  # Start transcription when each answer is uploaded
+    TRANSCRIPTION_WAIT_TIMEOUT_SECONDS: float = float(os.getenv("TRANSCRIPTION_WAIT_TIMEOUT_SECONDS", 1800))  # Longest wait for upload transcriptions before a session is processed
+    TRANSCRIPTION_WAIT_POLL_SECONDS: float = float(os.getenv("TRANSCRIPTION_WAIT_POLL_SECONDS", 2))
+    TRANSCRIPTION_STALE_SECONDS: float = float(os.getenv("TRANSCRIPTION_STALE_SECONDS", 900))  # Queued/processing rows without a heartbeat for this long are reclaimed
+    TRANSCRIPTION_HEARTBEAT_SECONDS: float = float(os.getenv("TRANSCRIPTION_HEARTBEAT_SECONDS", 60))  # How often a worker refreshes the heartbeat of rows it holds
+    LIVE_TRANSCRIPTION_INTERVAL_SECONDS: float = float(os.getenv("LIVE_TRANSCRIPTION_INTERVAL_SECONDS", 5))  # How often streamed answers are transcribed while recording
+    LIVE_TRANSCRIPTION_TAIL_SECONDS: float = float(os.getenv("LIVE_TRANSCRIPTION_TAIL_SECONDS", 1.0))  # Newest audio left for the next pass
+    LIVE_TRANSCRIPTION_STREAM_TTL_SECONDS: float = float(os.getenv("LIVE_TRANSCRIPTION_STREAM_TTL_SECONDS", 900))  # Unclaimed streams are discarded after this
+    LIVE_TRANSCRIPTION_MAX_BYTES: int = int(os.getenv("LIVE_TRANSCRIPTION_MAX_BYTES", 500 * 1024 * 1024))
+    AUDIO_CACHE_DIR: str = os.getenv("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "interview_audio_cache"))  # Decoded 16 kHz PCM cache
+    AUDIO_CACHE_MAX_AGE_HOURS: float = float(os.getenv("AUDIO_CACHE_MAX_AGE_HOURS", 72))
+    TRANSCRIPT_CACHE_DIR: str = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "interview_transcript_cache"))  # Finished transcripts by audio hash
+    TRANSCRIPT_CACHE_MAX_MB: float = float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", 256))
+    TRANSCRIPT_CACHE_MAX_AGE_DAYS: float = float(os.getenv("TRANSCRIPT_CACHE_MAX_AGE_DAYS", 30))
+    COMPACT_TRANSCRIPT_STORAGE: bool = os.getenv("COMPACT_TRANSCRIPT_STORAGE", "true").lower() in ("true", "1", "t")  # Store transcripts in the columnar compact format (legacy JSON is still read)
+    TRANSCRIPTION_CHUNK_MIN_SECONDS: float = float(os.getenv("TRANSCRIPTION_CHUNK_MIN_SECONDS", 300))  # Longer recordings are transcribed in chunks
+    TRANSCRIPTION_CHUNK_SECONDS: float = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", 120))  # Preferred chunk length
+    TRANSCRIPTION_CHUNK_MAX_SECONDS: float = float(os.getenv("TRANSCRIPTION_CHUNK_MAX_SECONDS", 240))  # Hard cut when no silence is found
+    VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "true").lower() in ("true", "1", "t")  # Trim long silences before inference
+    VAD_MIN_SILENCE_SECONDS: float = float(os.getenv("VAD_MIN_SILENCE_SECONDS", 1.0))  # Shorter pauses are kept
+    VAD_PADDING_SECONDS: float = float(os.getenv("VAD_PADDING_SECONDS", 0.25))  # Context kept around speech
+    WHISPER_PRELOAD_ON_STARTUP: bool = os.getenv("WHISPER_PRELOAD_ON_STARTUP", "false").lower() in ("true", "1", "t")  # Warm the model registry at startup
+    WHISPER_PRELOAD_IN_MASTER: bool = os.getenv("WHISPER_PRELOAD_IN_MASTER", "false").lower() in ("true", "1", "t")  # Load the model in the gunicorn master and share it copy-on-write (thread executor mode)
     
     # App settings
     PORT: int = int(os.getenv("PORT", 8000))
@@ -132,6 +214,7 @@ class Settings(BaseSettings):
     AWS_STORAGE_BUCKET_NAME: str = os.getenv("AWS_STORAGE_BUCKET_NAME", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     AWS_S3_CUSTOM_DOMAIN: str = os.getenv("AWS_S3_CUSTOM_DOMAIN", "")  # Optional CloudFront domain
+    S3_DOWNLOAD_CHUNK_BYTES: int = int(os.getenv("S3_DOWNLOAD_CHUNK_BYTES", 1024 * 1024))  # Read size when streaming recordings from S3
     
     # Storage configuration with explicit controls per content type
     USE_S3_FOR_VIDEO: bool = os.getenv("USE_S3_FOR_VIDEO", "false").lower() == "true"
@@ -2,7 +2,7 @@
 Database module for the Interview Backend application.
 Includes database connection, session management, and ORM models.
 """
-from app.core.database.db import get_db, engine, Base, SessionLocal
+from app.core.database.db import get_db, engine, Base, SessionLocal, create_task_session
 from app.core.database.models import create_tables
 
-__all__ = ["get_db", "engine", "Base", "SessionLocal", "create_tables"]
\ No newline at end of file
+__all__ = ["get_db", "engine", "Base", "SessionLocal", "create_task_session", "create_tables"]
\ No newline at end of file
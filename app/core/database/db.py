@@ -68,6 +68,19 @@ def get_db():
     finally:
         db.close()
 
+def create_task_session():
+    """
+    Create an independent database session for a concurrent async task.
+    
+    SessionLocal is a thread-scoped registry, so coroutines running on the same
+    event loop thread would all receive the same session from SessionLocal().
+    Tasks that run concurrently need their own short-lived session instead.
+    
+    Returns:
+        SQLAlchemy Session: A new session the caller must close
+    """
+    return SessionLocal.session_factory()
+
 def get_db_status(db=None) -> Dict[str, Any]:
     """
     Get database connection status and information.
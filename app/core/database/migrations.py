@@ -276,6 +276,122 @@ def migrate_database():
                             ALTER TABLE recordings ADD COLUMN next_retry_at TIMESTAMP WITH TIME ZONE;
                             RAISE NOTICE 'Added column next_retry_at to recordings table';
                         END IF;
+
+                        -- Add content_hash column to recordings table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'recordings' AND column_name = 'content_hash'
+                        ) THEN
+                            -- Add the content_hash column used by the transcript cache
+                            ALTER TABLE recordings ADD COLUMN content_hash VARCHAR(64);
+                            CREATE INDEX IF NOT EXISTS ix_recordings_content_hash ON recordings (content_hash);
+                            RAISE NOTICE 'Added column content_hash to recordings table';
+                        END IF;
+
+                        -- Add transcript_chunks column to recordings table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'recordings' AND column_name = 'transcript_chunks'
+                        ) THEN
+                            -- Add the transcript_chunks column for resumable chunked transcription
+                            ALTER TABLE recordings ADD COLUMN transcript_chunks TEXT;
+                            RAISE NOTICE 'Added column transcript_chunks to recordings table';
+                        END IF;
+
+                        -- Add transcription_started_at column to recordings table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'recordings' AND column_name = 'transcription_started_at'
+                        ) THEN
+                            -- Add the transcription_started_at column used to reclaim abandoned transcriptions
+                            ALTER TABLE recordings ADD COLUMN transcription_started_at TIMESTAMP WITH TIME ZONE;
+                            RAISE NOTICE 'Added column transcription_started_at to recordings table';
+                        END IF;
+
+                        -- Add transcription_heartbeat_at column to recordings table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'recordings' AND column_name = 'transcription_heartbeat_at'
+                        ) THEN
+                            -- Add the transcription_heartbeat_at column refreshed by the worker holding a transcription
+                            ALTER TABLE recordings ADD COLUMN transcription_heartbeat_at TIMESTAMP WITH TIME ZONE;
+                            RAISE NOTICE 'Added column transcription_heartbeat_at to recordings table';
+                        END IF;
+
+                        -- Add analysis_result column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analysis_result'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analysis_result TEXT;
+                            RAISE NOTICE 'Added column analysis_result to candidate_sessions table';
+                        END IF;
+
+                        -- Add analysis_status column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analysis_status'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analysis_status VARCHAR DEFAULT 'pending';
+                            RAISE NOTICE 'Added column analysis_status to candidate_sessions table';
+                        END IF;
+
+                        -- Add analysis_error column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analysis_error'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analysis_error VARCHAR;
+                            RAISE NOTICE 'Added column analysis_error to candidate_sessions table';
+                        END IF;
+
+                        -- Add analyzed_at column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analyzed_at'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analyzed_at TIMESTAMP WITH TIME ZONE;
+                            RAISE NOTICE 'Added column analyzed_at to candidate_sessions table';
+                        END IF;
+
+                        -- Add analysis_score column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analysis_score'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analysis_score DOUBLE PRECISION;
+                            RAISE NOTICE 'Added column analysis_score to candidate_sessions table';
+                        END IF;
+
+                        -- Add hiring_recommendation column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'hiring_recommendation'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN hiring_recommendation VARCHAR;
+                            RAISE NOTICE 'Added column hiring_recommendation to candidate_sessions table';
+                        END IF;
+
+                        -- Add analysis_batch_id column to candidate_sessions table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'candidate_sessions' AND column_name = 'analysis_batch_id'
+                        ) THEN
+                            ALTER TABLE candidate_sessions ADD COLUMN analysis_batch_id VARCHAR;
+                            CREATE INDEX IF NOT EXISTS ix_candidate_sessions_analysis_batch_id ON candidate_sessions (analysis_batch_id);
+                            RAISE NOTICE 'Added column analysis_batch_id to candidate_sessions table';
+                        END IF;
+
+                        -- Add language column to interviews table if it doesn't exist
+                        IF NOT EXISTS (
+                            SELECT 1 FROM information_schema.columns 
+                            WHERE table_name = 'interviews' AND column_name = 'language'
+                        ) THEN
+                            -- Add the language and language_source columns for pinned-language transcription
+                            ALTER TABLE interviews ADD COLUMN language VARCHAR(8);
+                            ALTER TABLE interviews ADD COLUMN language_source VARCHAR;
+                            RAISE NOTICE 'Added columns language and language_source to interviews table';
+                        END IF;
                         
                         -- Rename owner_id to interviewer_id in interviews table if needed
                         IF EXISTS (
@@ -408,9 +524,68 @@ def migrate_database():
     except Exception as e:
         logger.error(f"Database migration failed: {e}")
         raise
+    
+    if settings.COMPACT_TRANSCRIPT_STORAGE:
+        try:
+            migrate_transcripts_to_compact()
+        except Exception as e:
+            # Legacy JSON transcripts stay readable, so this must not block startup
+            logger.warning(f"Compact transcript migration failed: {e}")
         
     return True
 
+def migrate_transcripts_to_compact(batch_size: int = 200):
+    """
+    Re-encode legacy JSON transcripts in the compact columnar format.
+    
+    Rows are converted in ID order, one transaction per batch, so the
+    migration can be interrupted and resumed. Rows that fail to parse are
+    left as they are.
+    
+    Args:
+        batch_size: Recordings converted per transaction
+        
+    Returns:
+        dict: Recordings converted and total bytes before and after
+    """
+    from app.services.transcription.compact_transcript import encode_transcript
+    import json
+    
+    totals = {"recordings": 0, "json_bytes": 0, "compact_bytes": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(text("""
+                SELECT id, transcript FROM recordings
+                WHERE id > :last_id AND transcript LIKE '{%'
+                ORDER BY id LIMIT :batch_size
+            """), {"last_id": last_id, "batch_size": batch_size}).fetchall()
+            if not rows:
+                break
+            
+            for recording_id, transcript in rows:
+                last_id = recording_id
+                try:
+                    encoded, _ = encode_transcript(json.loads(transcript))
+                except Exception as e:
+                    logger.warning(f"Skipping transcript of recording {recording_id}: {e}")
+                    continue
+                connection.execute(text("UPDATE recordings SET transcript = :transcript WHERE id = :id"),
+                                   {"transcript": encoded, "id": recording_id})
+                # Measured against the stored text, which is what the row actually shrinks by
+                json_bytes, compact_bytes = len(transcript.encode("utf-8")), len(encoded)
+                logger.info(f"Compacted transcript of recording {recording_id}: {json_bytes} -> {compact_bytes} bytes "
+                            f"({json_bytes - compact_bytes} saved)")
+                totals["recordings"] += 1
+                totals["json_bytes"] += json_bytes
+                totals["compact_bytes"] += compact_bytes
+    
+    if totals["recordings"]:
+        saved = totals["json_bytes"] - totals["compact_bytes"]
+        logger.info(f"Compacted {totals['recordings']} transcripts, {saved} bytes saved "
+                    f"({saved // totals['recordings']} per recording)")
+    return totals
+
 def print_migration_status():
     """
     Print information about obsolete tables and suggested migration commands.
@@ -1,7 +1,7 @@
 """
 Database ORM models for the Interview Backend application.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, Float, Date, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database.db import Base
@@ -146,6 +146,8 @@ class Interview(Base):
     title = Column(String, index=True)
     slug = Column(String, unique=True, index=True, nullable=True)
     interviewer_id = Column(Integer, ForeignKey("users.id"))
+    language = Column(String(8), nullable=True)  # ISO-639-1 code passed to transcription so language detection is skipped
+    language_source = Column(String, nullable=True)  # "explicit" (set by the interviewer) or "detected" (learned from transcripts)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -191,6 +193,13 @@ class CandidateSession(Base):
     token_id = Column(Integer, ForeignKey("tokens.id"))
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), nullable=True)
+    analysis_result = Column(Text, nullable=True)  # JSON-encoded session analysis
+    analysis_status = Column(String, default="pending")  # pending, batch_preparing, batch_queued, batch_ingesting, completed, failed
+    analysis_error = Column(String, nullable=True)
+    analyzed_at = Column(DateTime(timezone=True), nullable=True)
+    analysis_score = Column(Float, nullable=True)
+    hiring_recommendation = Column(String, nullable=True)
+    analysis_batch_id = Column(String, nullable=True, index=True)  # Offline batch the session is queued in
     
     # Relationships
     token = relationship("Token", back_populates="candidate_sessions")
@@ -205,9 +214,13 @@ class Recording(Base):
     file_path = Column(String)  # Local path or S3 key
     file_url = Column(String, nullable=True)  # Full URL for file access (for S3 presigned URLs)
     storage_type = Column(String, default="local")  # "local" or "s3"
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded bytes
     transcript = Column(Text, nullable=True)
-    transcription_status = Column(String, default="pending")  # pending, completed, failed, retry_scheduled
+    transcript_chunks = Column(Text, nullable=True)  # JSON chunk plan and finished chunks of an in-progress long transcription
+    transcription_status = Column(String, default="pending")  # pending, queued, processing, completed, failed, retry_scheduled
     transcription_error = Column(String, nullable=True)
+    transcription_started_at = Column(DateTime(timezone=True), nullable=True)  # When the current transcription attempt started
+    transcription_heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Last sign of life from the worker holding a queued/processing row
     transcription_retry_count = Column(Integer, default=0)  # Track number of retry attempts
     next_retry_at = Column(DateTime(timezone=True), nullable=True)  # Schedule for next retry
     analysis = Column(Text, nullable=True)  # JSON-encoded analysis results
@@ -217,4 +230,33 @@ class Recording(Base):
     
     # Relationships
     session = relationship("CandidateSession", back_populates="recordings")
-    question = relationship("Question", back_populates="recordings")
\ No newline at end of file
+    question = relationship("Question", back_populates="recordings")
+
+class LLMUsage(Base):
+    __tablename__ = "llm_usage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), index=True)  # When the call completed
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Tenant: the interviewer who owns the session
+    session_id = Column(Integer, ForeignKey("candidate_sessions.id"), nullable=True, index=True)
+    model = Column(String)
+    purpose = Column(String, nullable=True)  # session_analysis, question_analysis, session_merge, batch_analysis
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)  # Estimated USD
+
+class LLMUsageDaily(Base):
+    __tablename__ = "llm_usage_daily"
+    __table_args__ = (UniqueConstraint("day", "user_id", "model", name="uq_llm_usage_daily_day_user_model"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, index=True)  # UTC day
+    user_id = Column(Integer, nullable=False, default=0, index=True)  # Tenant user ID; 0 for calls not tied to one (NULLs would defeat the unique key)
+    model = Column(String)
+    calls = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
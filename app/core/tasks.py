@@ -3,6 +3,7 @@ Background tasks and scheduled jobs for the application.
 """
 from datetime import datetime, timedelta
 import os
+import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy.orm import Session
@@ -176,6 +177,42 @@ def cleanup_old_recordings_job():
     finally:
         db.close()
 
+def cleanup_audio_cache_job():
+    """Remove decoded PCM files that have not been used within the cache age limit."""
+    try:
+        from app.services.transcription.audio_preprocessor import audio_preprocessor
+        removed = audio_preprocessor.cleanup()
+        logger.info(f"Removed {removed} cached audio file(s)")
+    except Exception as e:
+        logger.error(f"Error cleaning up audio cache: {str(e)}")
+
+async def analysis_batch_job():
+    """
+    Ingest finished offline analysis batches, then queue pending sessions in a new one.
+    This job runs nightly when ANALYSIS_BATCH_NIGHTLY is enabled; it never waits for a batch.
+    """
+    db = SessionLocal()
+    try:
+        # Import here to avoid circular imports
+        from app.services.analysis.batch_analysis import BatchAnalysisPipeline
+        pipeline = BatchAnalysisPipeline()
+        
+        for summary in await pipeline.ingest_finished_batches(db):
+            logger.info(f"Ingested analysis batch {summary['batch_id']}: {summary['completed']} completed, "
+                        f"{summary['failed']} failed")
+        
+        # Prompt building and tokenization block, so they run off the event loop
+        job = await asyncio.to_thread(pipeline.prepare, db)
+        if job:
+            await pipeline.submit(db, job)
+            logger.info(f"Queued {len(job.sessions)} session(s) in analysis batch {job.batch_id}")
+        else:
+            logger.debug("No sessions pending batch analysis")
+    except Exception as e:
+        logger.error(f"Error in analysis batch job: {str(e)}")
+    finally:
+        db.close()
+
 async def process_transcription_retries_job():
     """
     Check for recordings with scheduled retries and process them.
@@ -245,6 +282,25 @@ def start_scheduler():
         id="cleanup_old_recordings_job"
     )
     
+    # Cleanup decoded audio cache - run daily
+    scheduler.add_job(
+        cleanup_audio_cache_job,
+        'cron',
+        hour=4,
+        minute=0,
+        id="cleanup_audio_cache_job"
+    )
+    
+    # Offline analysis batches - ingest finished ones and queue pending sessions nightly
+    if settings.ANALYSIS_BATCH_NIGHTLY:
+        scheduler.add_job(
+            analysis_batch_job,
+            'cron',
+            hour=5,
+            minute=0,
+            id="analysis_batch_job"
+        )
+    
     # Process transcription retries - run every 5 minutes
     scheduler.add_job(
         process_transcription_retries_job,
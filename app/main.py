@@ -4,6 +4,7 @@ from fastapi.responses import RedirectResponse
 import uvicorn
 import logging
 import atexit
+import asyncio
 
 # Import the bcrypt fix before other imports
 import app.core.security.bcrypt_fix  # Apply bcrypt compatibility patch
@@ -226,6 +227,53 @@ def start_scheduler():
     """Start the background task scheduler when the application starts."""
     setup_scheduler()
 
+@app.on_event("startup")
+def warm_transcription_models():
+    """Preload the configured Whisper model so the first transcription does not stall."""
+    if settings.WHISPER_PRELOAD_ON_STARTUP:
+        from app.services.transcription.model_registry import whisper_model_registry
+        stats = whisper_model_registry.warm_up()
+        logger.info(f"Whisper model registry warmed: {stats['loaded_models']}")
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    """Sample event loop lag so blocking work on the web path shows up in metrics."""
+    from app.services.monitoring.loop_lag_monitor import loop_lag_monitor
+    loop_lag_monitor.start()
+
+@app.on_event("startup")
+async def warm_llm_client():
+    """Create the shared OpenAI client and load the tokenizer before the first analysis."""
+    from app.services.analysis.llm_client import llm_client
+    from app.services.analysis.prompt_builder import token_counter
+    llm_client.warm_up()
+    # The BPE file may be fetched over the network on first load, so keep it off the loop
+    await asyncio.to_thread(token_counter.get_encoding, settings.ANALYSIS_MODEL)
+
+@app.on_event("shutdown")
+def shutdown_inference_pool():
+    """Stop the Whisper inference pool processes."""
+    from app.services.transcription.inference_executor import inference_executor
+    inference_executor.shutdown(wait=False)
+
+@app.on_event("startup")
+async def start_usage_meter():
+    """Flush buffered LLM usage records to the database in the background."""
+    from app.services.analysis.usage_meter import usage_meter
+    usage_meter.start()
+
+@app.on_event("shutdown")
+async def flush_usage_meter():
+    """Write LLM usage still buffered in this worker."""
+    from app.services.analysis.usage_meter import usage_meter
+    await usage_meter.stop()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Close the shared OpenAI client's connection pool."""
+    from app.services.analysis.llm_client import llm_client
+    await llm_client.aclose()
+
 # Register shutdown function to properly close the scheduler
 atexit.register(shutdown_scheduler)
 
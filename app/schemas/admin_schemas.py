@@ -3,7 +3,7 @@ Admin module specific schemas.
 """
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import datetime, date
 
 
 class SystemConfigUpdate(BaseModel):
@@ -103,4 +103,30 @@ class MonitoringMetricsResponse(BaseModel):
                     }
                 }
             }
-        }
\ No newline at end of file
+        }
+
+
+class LLMUsageDailyResponse(BaseModel):
+    """Schema for one day of LLM usage by a tenant on a model"""
+    day: date
+    user_id: Optional[int] = None
+    model: str
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost: float
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "day": "2024-05-01",
+                "user_id": 12,
+                "model": "gpt-4o-mini",
+                "calls": 48,
+                "prompt_tokens": 210340,
+                "completion_tokens": 38112,
+                "total_tokens": 248452,
+                "cost": 0.054418
+            }
+        }
@@ -83,6 +83,17 @@ class QuestionUpdateOrCreate(QuestionBase):
 class InterviewBase(BaseModel):
     """Base schema for interview information"""
     title: str
+    language: Optional[str] = Field(default=None, description="ISO-639-1 language code of the answers (e.g. 'en'); skips language detection during transcription")
+    
+    @field_validator('language')
+    @classmethod
+    def language_must_be_code(cls, v):
+        if v is None:
+            return v
+        v = v.strip().lower()
+        if not v.isalpha() or not 2 <= len(v) <= 3:
+            raise ValueError('Language must be an ISO-639-1 code such as "en"')
+        return v
 
 
 class InterviewCreateWithQuestions(InterviewBase):
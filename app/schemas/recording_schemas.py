@@ -41,6 +41,16 @@ class RecordingResponse(RecordingResponseBase):
     transcript: Optional[str] = None
     analysis: Optional[Dict[str, Any]] = None
     
+    @field_validator('transcript', mode='before')
+    @classmethod
+    def decode_transcript(cls, v):
+        # Import locally to avoid circular imports (the models import these schemas)
+        from app.services.transcription.compact_transcript import CompactTranscript, is_compact
+        # Compact transcripts are returned in the JSON shape clients already parse
+        if isinstance(v, str) and is_compact(v):
+            return json.dumps(CompactTranscript.decode(v).to_dict())
+        return v
+    
     @field_validator('analysis', mode='before')
     @classmethod
     def parse_analysis(cls, v):
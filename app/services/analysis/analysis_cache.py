@@ -0,0 +1,96 @@
+"""
+Analysis Cache
+Disk cache of LLM analysis completions keyed by a fingerprint of
+(model, system prompt, user prompt, temperature, analysis version)
+"""
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.utils.disk_cache import JsonDiskCache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class AnalysisCache(JsonDiskCache):
+    """
+    Fingerprint-addressed cache of analysis completions.
+
+    Re-analysing a session whose transcripts and prompt template have not
+    changed (force_reanalyze, repeated batch processing) produces the same
+    request, so the stored completion is returned instead of paying for the
+    call again. Any change to the prompts, model, temperature or
+    ANALYSIS_VERSION changes the fingerprint, so stale entries are never hit
+    and simply age out. Entries expire after max_age_hours and the least
+    recently used are evicted once the cache grows past max_size_mb.
+    """
+
+    label = "analysis cache"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 max_age_hours: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Cache directory. Defaults to settings.ANALYSIS_CACHE_DIR.
+            max_size_mb: Size limit. Defaults to settings.ANALYSIS_CACHE_MAX_MB.
+            max_age_hours: Age limit. Defaults to settings.ANALYSIS_CACHE_TTL_HOURS.
+        """
+        max_size_mb = max_size_mb if max_size_mb is not None else settings.ANALYSIS_CACHE_MAX_MB
+        max_age_hours = max_age_hours if max_age_hours is not None else settings.ANALYSIS_CACHE_TTL_HOURS
+        super().__init__(cache_dir or settings.ANALYSIS_CACHE_DIR, int(max_size_mb * 1024 ** 2), max_age_hours * 3600,
+                         {"bypassed": 0, "saved_tokens": 0, "saved_cost": 0.0})
+
+    @staticmethod
+    def fingerprint(model: str, system_prompt: str, user_prompt: str, temperature: float,
+                    analysis_version: str) -> str:
+        """SHA-256 over everything that determines a completion."""
+        material = json.dumps([model, system_prompt, user_prompt, round(float(temperature), 4), analysis_version],
+                              ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key: Fingerprint from fingerprint()
+
+        Returns:
+            Cached completion, or None on a miss
+        """
+        return self._read(self._entry_path(key))
+
+    def put(self, key: str, completion: Dict[str, Any]) -> None:
+        """Store a completion, then evict old entries if the cache may be over its size limit."""
+        self._write(self._entry_path(key), completion)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry, e.g. a completion that turned out to be unusable."""
+        self._discard(self._entry_path(key))
+
+    def record_bypass(self) -> None:
+        """Count a lookup skipped because the caller asked for a fresh analysis."""
+        self._count("bypassed")
+
+    def record_savings(self, tokens: int, cost: float) -> None:
+        """Add the tokens and cost a hit avoided."""
+        with self._lock:
+            self._counters["saved_tokens"] += tokens
+            self._counters["saved_cost"] += cost
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and savings counters for this process."""
+        return {
+            "enabled": settings.ANALYSIS_CACHE_ENABLED,
+            **self._lookup_stats(),
+            "max_age_hours": round(self.max_age_seconds / 3600, 2)
+        }
+
+# Create singleton instance
+analysis_cache = AnalysisCache()
@@ -2,33 +2,60 @@
 Analysis Service
 Handles interview transcript analysis using OpenAI LLM with comprehensive evaluation
 """
-import logging
 import json
-from openai import OpenAI
-from typing import Dict, Any, List
+import asyncio
+import logging
+from typing import Dict, Any, List, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database.models import Recording, Question, CandidateSession
+from app.core.database.models import Recording, Question, CandidateSession, Token, Interview
+from app.services.transcription.compact_transcript import decode_transcript
+from .llm_client import llm_client
+from .prompt_builder import prompt_builder, PromptPlan, trim_filler
+from .speech_metrics import speech_metrics_engine, buffer_timings, pause_bin_labels, LONG_PAUSE_SECONDS
+from .analysis_cache import analysis_cache
+from .usage_meter import usage_meter, usage_context
 from .report_generator import report_generator
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Bump when analysis output changes without a prompt change; cached completions are keyed on it
+ANALYSIS_VERSION = "2.0"
+
+# Required JSON format for a single-question evaluation
+QUESTION_RESPONSE_FORMAT = """
+## Required JSON Response Format
+{
+  "score": <number 1-10>,
+  "scores": {
+    "communication_skills": <number 1-10>,
+    "technical_knowledge": <number 1-10>,
+    "problem_solving": <number 1-10>,
+    "cultural_fit": <number 1-10>,
+    "experience_relevance": <number 1-10>
+  },
+  "strengths": ["<strength 1>", "..."],
+  "weaknesses": ["<weakness 1>", "..."],
+  "evidence": [
+    {"observation": "<what you observed>", "evidence": "<specific quote>", "impact": "<positive|negative|neutral>"}
+  ],
+  "summary": "<one or two sentences>"
+}
+"""
+
 class AnalysisService:
     """
     Service for analyzing interview transcripts using OpenAI LLM with comprehensive evaluation.
     """
     def __init__(self):
-        """Initialize the analysis service with OpenAI client."""
-        if not settings.OPENAI_API_KEY:
+        """Initialize the analysis service; LLM calls go through the process-wide llm_client."""
+        if not llm_client.is_configured:
             logger.warning("OpenAI API key not found. Analysis service will not be available.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         
-        # Token usage tracking
+        # Token usage of this instance only; persistent per-tenant usage goes through usage_meter
         self.token_usage = {
             "total_prompt_tokens": 0,
             "total_completion_tokens": 0,
@@ -36,13 +63,14 @@ class AnalysisService:
             "api_calls": 0
         }
 
-    async def analyze_session_transcripts(self, session_id: int, db: Session) -> Dict[str, Any]:
+    async def analyze_session_transcripts(self, session_id: int, db: Session, bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Analyze all transcripts for a session using OpenAI with comprehensive evaluation.
         
         Args:
             session_id: Session ID
             db: Database session
+            bypass_cache: Call OpenAI even if an identical analysis is cached (the result is re-cached)
             
         Returns:
             Comprehensive analysis results with structured scoring
@@ -52,139 +80,25 @@ class AnalysisService:
             return {"error": "Analysis service not configured"}
 
         try:
-            # Get session info
-            session = db.query(CandidateSession).filter(CandidateSession.id == session_id).first()
-            if not session:
-                raise ValueError(f"Session {session_id} not found")
-            
-            # Get all completed transcriptions for the session
-            recordings = db.query(Recording).filter(
-                Recording.session_id == session_id,
-                Recording.transcription_status == "completed",
-                Recording.transcript.isnot(None)
-            ).all()
-            
-            if not recordings:
-                raise ValueError(f"No completed transcriptions found for session {session_id}")
-            
-            # Prepare transcript data with questions and timing analysis
-            transcript_data = []
-            total_words = 0
-            total_speaking_time = 0
-            
-            for recording in recordings:
-                question = db.query(Question).filter(Question.id == recording.question_id).first()
-                transcript_json = json.loads(recording.transcript)
-                
-                # Calculate speaking metrics
-                text = transcript_json["text"]
-                word_count = len(text.split()) if text else 0
-                duration = transcript_json.get("duration", 0)
-                
-                # Extract pause analysis from segments if available
-                segments = transcript_json.get("segments", [])
-                pause_analysis = self._analyze_speech_timing(segments) if segments else {}
-                
-                transcript_data.append({
-                    "question_id": recording.question_id,
-                    "question_text": question.text if question else "Unknown question",
-                    "question_category": getattr(question, 'category', 'general') if question else 'general',
-                    "transcript": text,
-                    "word_count": word_count,
-                    "duration": duration,
-                    "speaking_rate": (word_count / (duration / 60)) if duration > 0 else 0,  # words per minute
-                    "segments": segments,
-                    "pause_analysis": pause_analysis,
-                    "recording_id": recording.id
-                })
-                
-                total_words += word_count
-                total_speaking_time += duration
-            
-            # Calculate session-level metrics
-            session_metrics = {
-                "total_questions": len(transcript_data),
-                "total_words": total_words,
-                "total_duration": total_speaking_time,
-                "average_speaking_rate": (total_words / (total_speaking_time / 60)) if total_speaking_time > 0 else 0,
-                "average_response_length": total_words / len(transcript_data) if transcript_data else 0
-            }
-              # Prepare comprehensive OpenAI prompt
-            analysis_prompt = self._build_comprehensive_analysis_prompt(transcript_data, session, session_metrics)
-            
-            # Call OpenAI API with structured request
-            logger.info(f"Starting comprehensive OpenAI analysis for session {session_id} with {len(transcript_data)} responses")
-            
-            if not self.client:
-                raise ValueError("OpenAI client not initialized - API key required")
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Use cost-effective model
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": analysis_prompt
-                    }
-                ],
-                temperature=0.2,  # Lower temperature for more consistent analysis
-                max_tokens=4000,  # Reduced to comply with model limits
-                response_format={"type": "json_object"}  # Request structured JSON response
-            )
+            # Loading, decoding and the speech metrics are blocking work, kept off the event loop
+            session, transcript_data, session_metrics = await asyncio.to_thread(
+                self._collect_transcript_data, session_id, db)
             
-            # Track token usage
-            token_usage = self._track_token_usage(response)
-            
-            # Parse structured analysis
-            try:
-                structured_analysis = json.loads(response.choices[0].message.content)
-            except json.JSONDecodeError:
-                # Fallback to plain text if JSON parsing fails
-                structured_analysis = {
-                    "overall_assessment": response.choices[0].message.content,
-                    "scores": {},
-                    "parsing_error": True
-                }
-            
-            # Build comprehensive analysis result
-            analysis_result = {
-                "session_id": session_id,
-                "candidate_id": session.candidate_id,
-                "analyzed_at": datetime.now(timezone.utc).isoformat(),
-                "session_metrics": session_metrics,
-                "structured_analysis": structured_analysis,
-                "question_responses": transcript_data,
-                "recommendations": {
-                    "hiring_recommendation": structured_analysis.get("hiring_recommendation", "requires_review"),
-                    "confidence_level": structured_analysis.get("confidence_level", "medium"),
-                    "key_strengths": structured_analysis.get("key_strengths", []),
-                    "areas_for_improvement": structured_analysis.get("areas_for_improvement", []),
-                    "follow_up_questions": structured_analysis.get("follow_up_questions", [])
-                },
-                "analysis_metadata": {
-                    "model_used": response.model,
-                    "openai_usage": {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens,
-                        "estimated_cost": self._calculate_cost(response.usage, response.model)
-                    },
-                    "analysis_version": "2.0",
-                    "features_used": ["timing_analysis", "structured_scoring", "hiring_recommendation"]
-                }
-            }
-              # Save comprehensive analysis to session
-            session.analysis_result = json.dumps(analysis_result)
-            session.analysis_status = "completed"
-            session.analyzed_at = datetime.now(timezone.utc)
+            # LLM usage is metered against the interviewer who owns the session
+            with usage_context(user_id=self._tenant_id(db, session), session_id=session.id):
+                if settings.ANALYSIS_MODE == "per_question":
+                    # Each answer is scored in its own call, then a small merge call produces the verdict
+                    structured_analysis, completions, prompt_budget = await self._analyze_questions_and_merge(
+                        transcript_data, session_metrics, bypass_cache)
+                else:
+                    structured_analysis, completions, prompt_budget = await self._analyze_whole_session(
+                        transcript_data, session, session_metrics, bypass_cache)
             
-            # Add analysis summary to session for quick access
-            if isinstance(structured_analysis, dict) and "overall_score" in structured_analysis:
-                session.analysis_score = structured_analysis.get("overall_score", 0)
-                session.hiring_recommendation = structured_analysis.get("hiring_recommendation", "requires_review")
+            # Candidates are identified by their access token
+            analysis_result = self._build_analysis_result(session.id, session.token_id, transcript_data, session_metrics,
+                                                          structured_analysis, completions, prompt_budget)
+            for column, value in self._session_analysis_columns(analysis_result).items():
+                setattr(session, column, value)
             
             db.commit()
             
@@ -215,6 +129,315 @@ class AnalysisService:
                 db.commit()            
             raise
     
+    def _collect_transcript_data(self, session_id: int, db: Session) -> Tuple[CandidateSession, List[Dict], Dict[str, Any]]:
+        """
+        Load a session's completed transcripts with per-question and session-level speech metrics.
+
+        Returns:
+            (session, transcript data per question, session metrics)
+
+        Raises:
+            ValueError: If the session does not exist or has no completed transcriptions
+        """
+        # Get session info
+        session = db.query(CandidateSession).filter(CandidateSession.id == session_id).first()
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        
+        # Get all completed transcriptions for the session
+        recordings = db.query(Recording).filter(
+            Recording.session_id == session_id,
+            Recording.transcription_status == "completed",
+            Recording.transcript.isnot(None)
+        ).all()
+        
+        if not recordings:
+            raise ValueError(f"No completed transcriptions found for session {session_id}")
+        
+        # Prepare transcript data with questions and timing analysis
+        transcript_data = []
+        total_words = 0
+        total_speaking_time = 0
+        timings = []
+        
+        for recording in recordings:
+            question = db.query(Question).filter(Question.id == recording.question_id).first()
+            # Compact or legacy JSON
+            transcript = decode_transcript(recording.transcript)
+            
+            # Calculate speaking metrics
+            text = transcript.text
+            word_count = len(text.split()) if text else 0
+            duration = transcript.duration or 0
+            
+            # The speech metrics read the stored timing arrays and UTF-8 segment text directly;
+            # segment dicts are only built for the stored question responses
+            starts, ends = transcript.timings()
+            timings.append(buffer_timings(starts, ends, *transcript.segment_text_buffer(), text or ""))
+            
+            transcript_data.append({
+                "question_id": recording.question_id,
+                "question_text": question.text if question else "Unknown question",
+                "question_category": getattr(question, 'category', 'general') if question else 'general',
+                "transcript": text,
+                "word_count": word_count,
+                "duration": duration,
+                "speaking_rate": (word_count / (duration / 60)) if duration > 0 else 0,  # words per minute
+                "segments": [segment.to_dict() for segment in transcript.segments],
+                "recording_id": recording.id
+            })
+            
+            total_words += word_count
+            total_speaking_time += duration
+        
+        # Pause, fluency and pace metrics for all recordings in one pass
+        speech_metrics = speech_metrics_engine.analyze_session(timings)
+        for data, metrics in zip(transcript_data, speech_metrics):
+            data["pause_analysis"] = metrics
+        
+        # Calculate session-level metrics
+        session_metrics = {
+            "total_questions": len(transcript_data),
+            "total_words": total_words,
+            "total_duration": total_speaking_time,
+            "average_speaking_rate": (total_words / (total_speaking_time / 60)) if total_speaking_time > 0 else 0,
+            "average_response_length": total_words / len(transcript_data) if transcript_data else 0,
+            "speech_summary": speech_metrics_engine.summarize(speech_metrics)
+        }
+        return session, transcript_data, session_metrics
+
+    def _tenant_id(self, db: Session, session: CandidateSession):
+        """ID of the interviewer whose interview the session belongs to."""
+        return db.query(Interview.interviewer_id).join(Token, Token.interview_id == Interview.id).filter(
+            Token.id == session.token_id).scalar()
+
+    def _build_analysis_result(self, session_id: int, candidate_id: int, transcript_data: List[Dict], session_metrics: Dict,
+                               structured_analysis: Dict[str, Any], completions: List[Dict[str, Any]],
+                               prompt_budget: Dict[str, Any], analysis_mode: str = None) -> Dict[str, Any]:
+        """Assemble the stored analysis result from the model's structured analysis and the calls that produced it."""
+        return {
+            "session_id": session_id,
+            "candidate_id": candidate_id,
+            "analyzed_at": datetime.now(timezone.utc).isoformat(),
+            "session_metrics": session_metrics,
+            "structured_analysis": structured_analysis,
+            "question_responses": transcript_data,
+            "recommendations": {
+                "hiring_recommendation": structured_analysis.get("hiring_recommendation", "requires_review"),
+                "confidence_level": structured_analysis.get("confidence_level", "medium"),
+                "key_strengths": structured_analysis.get("key_strengths", []),
+                "areas_for_improvement": structured_analysis.get("areas_for_improvement", []),
+                "follow_up_questions": structured_analysis.get("follow_up_questions", [])
+            },
+            "analysis_metadata": {
+                "analysis_mode": analysis_mode or settings.ANALYSIS_MODE,
+                "model_used": completions[-1]["model"],
+                # Cache hits spend nothing; what they saved is under "cache"
+                "openai_usage": self._summarize_usage(completions),
+                "cache": completions[0]["cache"] if len(completions) == 1 else self._summarize_cache(completions),
+                "prompt_budget": prompt_budget,
+                "analysis_version": ANALYSIS_VERSION,
+                "features_used": ["timing_analysis", "structured_scoring", "hiring_recommendation"]
+            }
+        }
+
+    def _session_analysis_columns(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """CandidateSession column values for a finished analysis, with the score summary for quick access."""
+        structured_analysis = analysis_result["structured_analysis"]
+        columns = {
+            "analysis_result": json.dumps(analysis_result),
+            "analysis_status": "completed",
+            "analysis_error": None,
+            "analyzed_at": datetime.now(timezone.utc)
+        }
+        if isinstance(structured_analysis, dict) and "overall_score" in structured_analysis:
+            columns["analysis_score"] = structured_analysis.get("overall_score", 0)
+            columns["hiring_recommendation"] = structured_analysis.get("hiring_recommendation", "requires_review")
+        return columns
+
+    async def _analyze_whole_session(self, transcript_data: List[Dict], session, session_metrics: Dict,
+                                     bypass_cache: bool) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Analyze the whole interview in one call.
+
+        Returns:
+            (structured analysis, [completion], prompt budget metadata)
+        """
+        prompt_plan = self._build_comprehensive_analysis_prompt(transcript_data, session, session_metrics)
+        
+        logger.info(f"Starting comprehensive OpenAI analysis for session {session.id} with {len(transcript_data)} responses: "
+                    f"{prompt_plan.prompt_tokens} prompt tokens ({prompt_plan.level}), "
+                    f"up to {prompt_plan.max_completion_tokens} completion tokens, "
+                    f"estimated max cost ${self._estimate_cost(prompt_plan.prompt_tokens, prompt_plan.max_completion_tokens, prompt_plan.model)}")
+        
+        completion = await self._cached_completion(
+            purpose="session_analysis",
+            model=prompt_plan.model,
+            system_prompt=self._get_system_prompt(),
+            user_prompt=prompt_plan.prompt,
+            temperature=0.2,  # Lower temperature for more consistent analysis
+            bypass_cache=bypass_cache,
+            max_tokens=prompt_plan.max_completion_tokens,
+            response_format={"type": "json_object"}  # Request structured JSON response
+        )
+        
+        # Parse structured analysis
+        try:
+            structured_analysis = json.loads(completion["content"])
+        except json.JSONDecodeError:
+            # Fallback to plain text if JSON parsing fails; not worth replaying from the cache
+            analysis_cache.discard(completion["cache"]["key"])
+            structured_analysis = {
+                "overall_assessment": completion["content"],
+                "scores": {},
+                "parsing_error": True
+            }
+        return structured_analysis, [completion], prompt_plan.to_metadata()
+
+    async def _analyze_questions_and_merge(self, transcript_data: List[Dict], session_metrics: Dict,
+                                           bypass_cache: bool) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Score every answer concurrently, then merge the scores into a session verdict.
+
+        At most settings.ANALYSIS_QUESTION_CONCURRENCY question calls run at
+        once. Each call is cached on its own prompt, so re-analysis only pays
+        for answers that changed. A failed or malformed question is reported
+        in its own entry and left out of the merge instead of failing the
+        session; if the merge call itself fails, scores are combined locally.
+
+        Returns:
+            (structured analysis, completions of all calls, prompt budget metadata)
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.ANALYSIS_QUESTION_CONCURRENCY))
+        
+        async def analyze_question(index: int) -> Tuple[Dict[str, Any], PromptPlan]:
+            plan = prompt_builder.build(
+                system_prompt=self._get_question_system_prompt(),
+                header="Evaluate this answer from a video interview. Provide your response as a valid JSON object.\n"
+                       + self._render_pause_bins(),
+                footer=QUESTION_RESPONSE_FORMAT,
+                answers=[self._prompt_answer(transcript_data[index])],
+                render_block=lambda _, response: self._render_question_block(index + 1, transcript_data[index], response)
+            )
+            async with semaphore:
+                completion = await self._cached_completion(
+                    purpose="question_analysis",
+                    model=plan.model,
+                    system_prompt=self._get_question_system_prompt(),
+                    user_prompt=plan.prompt,
+                    temperature=0.2,
+                    bypass_cache=bypass_cache,
+                    max_tokens=min(plan.max_completion_tokens, settings.ANALYSIS_QUESTION_MAX_COMPLETION_TOKENS),
+                    response_format={"type": "json_object"}
+                )
+            return completion, plan
+        
+        logger.info(f"Starting per-question analysis of {len(transcript_data)} responses "
+                    f"({settings.ANALYSIS_QUESTION_CONCURRENCY} at a time)")
+        outcomes = await asyncio.gather(*[analyze_question(i) for i in range(len(transcript_data))],
+                                        return_exceptions=True)
+        
+        completions, question_budgets, question_results = [], [], []
+        for data, outcome in zip(transcript_data, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Analysis of question {data['question_id']} failed: {outcome}")
+                data["question_analysis"] = {"error": str(outcome)[:500]}
+                continue
+            completion, plan = outcome
+            completions.append(completion)
+            question_budgets.append(plan.to_metadata())
+            try:
+                result = json.loads(completion["content"])
+                if not isinstance(result, dict):
+                    raise ValueError("not a JSON object")
+            except ValueError:
+                analysis_cache.discard(completion["cache"]["key"])
+                data["question_analysis"] = {"error": "parsing_error", "raw": (completion["content"] or "")[:500]}
+                continue
+            data["question_analysis"] = result
+            question_results.append((data, result))
+        
+        if not question_results:
+            raise ValueError("No question could be analyzed")
+        
+        merge_plan = prompt_builder.build(
+            system_prompt=self._get_system_prompt(),
+            header=self._render_merge_header(session_metrics, len(transcript_data)),
+            footer=self._get_session_response_format(),
+            answers=[json.dumps(result, ensure_ascii=False) for _, result in question_results],
+            render_block=lambda i, evaluation: self._render_merge_block(
+                transcript_data.index(question_results[i][0]) + 1, question_results[i][0], evaluation)
+        )
+        try:
+            merge_completion = await self._cached_completion(
+                purpose="session_merge",
+                model=merge_plan.model,
+                system_prompt=self._get_system_prompt(),
+                user_prompt=merge_plan.prompt,
+                temperature=0.2,
+                bypass_cache=bypass_cache,
+                max_tokens=merge_plan.max_completion_tokens,
+                response_format={"type": "json_object"}
+            )
+            completions.append(merge_completion)
+            structured_analysis = json.loads(merge_completion["content"])
+        except json.JSONDecodeError:
+            logger.warning("Session merge returned malformed JSON, combining question scores locally")
+            analysis_cache.discard(merge_completion["cache"]["key"])
+            structured_analysis = self._merge_question_results_locally(question_results)
+        except Exception as e:
+            logger.warning(f"Session merge failed, combining question scores locally: {e}")
+            structured_analysis = self._merge_question_results_locally(question_results)
+        
+        return structured_analysis, completions, {"questions": question_budgets, "merge": merge_plan.to_metadata()}
+
+    def _merge_question_results_locally(self, question_results: List[Tuple[Dict, Dict]]) -> Dict[str, Any]:
+        """Average the per-question scores when the merge call is unavailable; the verdict is left for review."""
+        def mean(values: List[float]) -> float:
+            values = [v for v in values if isinstance(v, (int, float))]
+            return round(sum(values) / len(values), 1) if values else 0
+        
+        dimensions = {key for _, result in question_results for key in (result.get("scores") or {})}
+        return {
+            "overall_score": mean([result.get("score") for _, result in question_results]),
+            "hiring_recommendation": "requires_review",
+            "confidence_level": "low",
+            "scores": {key: mean([(result.get("scores") or {}).get(key) for _, result in question_results])
+                       for key in sorted(dimensions)},
+            "assessment": {
+                "strengths": [s for _, result in question_results for s in result.get("strengths", [])],
+                "weaknesses": [w for _, result in question_results for w in result.get("weaknesses", [])]
+            },
+            "key_insights": [result["summary"] for _, result in question_results if result.get("summary")],
+            "merged_locally": True
+        }
+
+    def _summarize_usage(self, completions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tokens and cost actually spent across calls; cache hits count as zero."""
+        spent = [completion for completion in completions if not completion["cache"]["hit"]]
+        prompt_tokens = sum(completion["usage"]["prompt_tokens"] for completion in spent)
+        completion_tokens = sum(completion["usage"]["completion_tokens"] for completion in spent)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "estimated_cost": round(sum(self._estimate_cost(completion["usage"]["prompt_tokens"],
+                                                            completion["usage"]["completion_tokens"],
+                                                            completion["model"]) for completion in spent), 6),
+            "calls": len(spent)
+        }
+
+    def _summarize_cache(self, completions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Cache hits and savings across the calls of one analysis."""
+        hits = [completion["cache"] for completion in completions if completion["cache"]["hit"]]
+        return {
+            "hit": len(hits) == len(completions),
+            "hits": len(hits),
+            "misses": len(completions) - len(hits),
+            "saved_tokens": sum(cache["saved_tokens"] for cache in hits),
+            "saved_cost": round(sum(cache["saved_cost"] for cache in hits), 6)
+        }
+
     def _prepare_combined_transcript(self, recordings: List[Recording], questions: Dict[int, str]) -> str:
         """Prepare combined transcript with questions and responses."""
         transcript_parts = []
@@ -222,7 +445,8 @@ class AnalysisService:
         for i, recording in enumerate(recordings, 1):
             question_text = questions.get(recording.question_id, f"Question {recording.question_id}")
             transcript_parts.append(f"Question {i}: {question_text}")
-            transcript_parts.append(f"Response {i}: {recording.transcript}")
+            transcript = decode_transcript(recording.transcript)
+            transcript_parts.append(f"Response {i}: {transcript.text if transcript else ''}")
             transcript_parts.append("---")
         
         return "\n\n".join(transcript_parts)
@@ -270,24 +494,15 @@ Provide a comprehensive analysis in JSON format with:
 """
         
         try:
-            if not self.client:
-                raise ValueError("OpenAI client not initialized - API key required")
-            
-            response = self.client.chat.completions.create(
+            completion = await self._cached_completion(
+                purpose="transcript_analysis",
                 model="gpt-4",  # Use GPT-4 for better analysis
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": f"Interview Transcript:\n\n{combined_transcript}"}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3
+                system_prompt=system_message,
+                user_prompt=f"Interview Transcript:\n\n{combined_transcript}",
+                temperature=0.3,
+                response_format={"type": "json_object"}
             )
-            
-            # Track token usage
-            self._track_token_usage(response)
-            
-            analysis_text = response.choices[0].message.content
-            return json.loads(analysis_text)
+            return json.loads(completion["content"])
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse OpenAI response: {e}")
@@ -296,14 +511,16 @@ Provide a comprehensive analysis in JSON format with:
             logger.error(f"OpenAI analysis error: {e}")
             return {"error": f"Analysis service error: {str(e)}"}
     
-    async def batch_analyze_session(self, session_id: int, db: Session, force_reanalyze: bool = False) -> Dict[str, Any]:
+    async def batch_analyze_session(self, session_id: int, db: Session, force_reanalyze: bool = False,
+                                    bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Batch analyze all transcripts for a session.
         
         Args:
             session_id: Session ID to process
             db: Database session
-            force_reanalyze: Re-analyze even if analysis exists
+            force_reanalyze: Re-analyze even if analysis exists; unchanged prompts are served from the analysis cache
+            bypass_cache: Also skip the analysis cache and call OpenAI again
             
         Returns:
             Analysis results
@@ -323,7 +540,7 @@ Provide a comprehensive analysis in JSON format with:
                 return {"message": "Analysis already completed", "reanalyzed": False}
         
         # Perform analysis
-        analysis_result = await self.analyze_session_transcripts(session_id, db)
+        analysis_result = await self.analyze_session_transcripts(session_id, db, bypass_cache=bypass_cache)
         
         return {
             "message": "Session analysis completed",
@@ -331,8 +548,71 @@ Provide a comprehensive analysis in JSON format with:
             "reanalyzed": force_reanalyze
         }
 
+    async def _cached_completion(self, model: str, system_prompt: str, user_prompt: str, temperature: float,
+                                 bypass_cache: bool = False, purpose: str = "analysis", **request) -> Dict[str, Any]:
+        """
+        Chat completion served from the analysis cache when an identical request was made before.
+
+        Args:
+            model: Chat model
+            system_prompt: System message
+            user_prompt: User message
+            temperature: Sampling temperature
+            bypass_cache: Skip the lookup (the fresh completion is still cached)
+            purpose: What the call is for, recorded with its metered usage
+            **request: Other chat.completions.create arguments (max_tokens, response_format, ...)
+
+        Returns:
+            {"content", "model", "usage", "cached_at", "cache"}, where "cache" says
+            whether this was a hit and what it saved
+        """
+        enabled = settings.ANALYSIS_CACHE_ENABLED
+        key = analysis_cache.fingerprint(model, system_prompt, user_prompt, temperature, ANALYSIS_VERSION)
+
+        if enabled and bypass_cache:
+            analysis_cache.record_bypass()
+        elif enabled:
+            cached = await asyncio.to_thread(analysis_cache.get, key)
+            if cached is not None:
+                usage = cached["usage"]
+                saved_cost = self._estimate_cost(usage["prompt_tokens"], usage["completion_tokens"], cached["model"])
+                analysis_cache.record_savings(usage["total_tokens"], saved_cost)
+                logger.info(f"Analysis cache hit {key[:12]}: saved {usage['total_tokens']} tokens (${saved_cost})")
+                return {**cached, "cache": {"hit": True, "key": key, "cached_at": cached["cached_at"],
+                                            "saved_tokens": usage["total_tokens"], "saved_cost": saved_cost}}
+
+        response = await llm_client.chat_completion(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            **request
+        )
+        usage = self._track_token_usage(response)
+        usage_meter.record(response.model, usage["prompt_tokens"], usage["completion_tokens"],
+                           self._estimate_cost(usage["prompt_tokens"], usage["completion_tokens"], response.model),
+                           purpose=purpose)
+        completion = {
+            "content": response.choices[0].message.content,
+            "model": response.model,
+            "usage": usage,
+            "cached_at": datetime.now(timezone.utc).isoformat()
+        }
+        # A completion cut off at max_tokens would be replayed truncated, so it is not kept
+        if enabled and response.choices[0].finish_reason != "length":
+            await asyncio.to_thread(analysis_cache.put, key, completion)
+        return {**completion, "cache": {"hit": False, "key": key, "enabled": enabled, "bypassed": bypass_cache}}
+
     def _analyze_speech_timing(self, segments: List[Dict]) -> Dict[str, Any]:
-        """Analyze speech timing patterns from Whisper segments."""
+        """
+        Analyze speech timing patterns from Whisper segments, one recording at a time.
+
+        Sessions are analyzed with speech_metrics_engine, which returns the
+        same figures for all recordings at once; this loop is kept as its
+        reference (and benchmark baseline).
+        """
         if not segments:
             return {}
         
@@ -386,35 +666,112 @@ Provide a comprehensive analysis in JSON format with:
         score = (continuity_ratio * 10) - long_pause_penalty
         return max(0, min(10, score))
 
-    def _build_comprehensive_analysis_prompt(self, transcript_data: List[Dict], session, session_metrics: Dict) -> str:
-        """Build comprehensive analysis prompt with structured output request."""
-        prompt = f"""
+    def _build_comprehensive_analysis_prompt(self, transcript_data: List[Dict], session, session_metrics: Dict) -> PromptPlan:
+        """
+        Build comprehensive analysis prompt with structured output request.
+
+        The prompt is fitted to settings.ANALYSIS_PROMPT_TOKEN_BUDGET: answers are
+        shortened only when the full transcripts do not fit.
+
+        Returns:
+            The prompt with its predicted token count and completion allowance
+        """
+        header = f"""
 Analyze this video interview session comprehensively. Provide your response as a valid JSON object.
 
 ## Interview Context
 - Session ID: {session.id}
-- Candidate ID: {session.candidate_id}
+- Candidate ID: {session.token_id}
 - Total Questions: {session_metrics['total_questions']}
 - Total Speaking Time: {session_metrics['total_duration']:.1f} seconds
 - Total Words: {session_metrics['total_words']}
 - Average Speaking Rate: {session_metrics['average_speaking_rate']:.1f} words/minute
-
+{self._render_speech_summary(session_metrics)}
 ## Questions and Detailed Responses
 """
         
-        for i, data in enumerate(transcript_data, 1):
-            prompt += f"""
-### Question {i} [{data.get('question_category', 'general').upper()}]
+        return prompt_builder.build(
+            system_prompt=self._get_system_prompt(),
+            header=header,
+            footer=self._get_session_response_format(),
+            answers=[self._prompt_answer(data) for data in transcript_data],
+            render_block=lambda index, response: self._render_question_block(index + 1, transcript_data[index], response)
+        )
+
+    def _render_question_block(self, number: int, data: Dict, response: str) -> str:
+        """Prompt block for one question with its (possibly shortened) response and speech metrics."""
+        block = f"""
+### Question {number} [{data.get('question_category', 'general').upper()}]
 **Question:** {data['question_text']}
-**Response:** {data['transcript']}
-**Metrics:** {data['word_count']} words, {data['duration']:.1f}s, {data['speaking_rate']:.1f} wpm
+**Response:** {response}
 """
-            if data.get('pause_analysis'):
-                pause_info = data['pause_analysis']
-                prompt += f"**Speech Pattern:** {pause_info.get('total_pauses', 0)} pauses, continuity score {pause_info.get('speech_continuity_score', 0):.1f}/10\n"
-            prompt += "\n"
-        
-        prompt += """
+        pause_info = data.get('pause_analysis')
+        if pause_info and settings.SPEECH_METRICS_IN_PROMPT and 'pause_histogram' in pause_info:
+            # One line in place of the metrics and speech pattern lines; pause counts follow the
+            # bins listed once in the interview context
+            histogram = "/".join(str(count) for count in pause_info['pause_histogram'])
+            rates = "/".join(f"{rate:.0f}" for rate in pause_info['speaking_rate_over_time'])
+            return block + (f"**Delivery:** {data['word_count']} words, {data['duration']:.0f}s, "
+                            f"{data['speaking_rate']:.0f} wpm (by part {rates}); pauses {histogram}; "
+                            f"fillers {pause_info['filler_rate']:.1f}%; "
+                            f"continuity {pause_info['speech_continuity_score']:.1f}/10\n\n")
+        block += f"**Metrics:** {data['word_count']} words, {data['duration']:.1f}s, {data['speaking_rate']:.1f} wpm\n"
+        if pause_info:
+            block += f"**Speech Pattern:** {pause_info.get('total_pauses', 0)} pauses, continuity score {pause_info.get('speech_continuity_score', 0):.1f}/10\n"
+        return block + "\n"
+
+    def _prompt_answer(self, data: Dict) -> str:
+        """
+        Answer text as sent to the model.
+
+        With SPEECH_METRICS_IN_PROMPT, hesitation words are left out: the
+        speech line already reports them as a filler rate. Repeated words are
+        only collapsed once the prompt is over budget, since some are meant.
+        """
+        text = data['transcript'] or ""
+        return trim_filler(text) if settings.SPEECH_METRICS_IN_PROMPT else text
+
+    def _render_speech_summary(self, session_metrics: Dict) -> str:
+        """Session-wide pause and filler totals for the interview context, empty when not sent."""
+        summary = session_metrics.get('speech_summary')
+        if not summary or not settings.SPEECH_METRICS_IN_PROMPT:
+            return ""
+        histogram = "/".join(str(count) for count in summary['pause_histogram'])
+        return (f"- Speech: {summary['total_pauses']} pauses, by length {'/'.join(pause_bin_labels())}: {histogram} "
+                f"(over {LONG_PAUSE_SECONDS:g}s is long); {summary['filler_words']} fillers; "
+                f"average continuity {summary['average_continuity_score']:.1f}/10\n")
+
+    def _render_pause_bins(self) -> str:
+        """Legend of the pause counts in the delivery lines, for prompts without the session speech summary."""
+        if not settings.SPEECH_METRICS_IN_PROMPT:
+            return ""
+        return f"Pause counts are by length {'/'.join(pause_bin_labels())} (over {LONG_PAUSE_SECONDS:g}s is long).\n"
+
+    def _render_merge_header(self, session_metrics: Dict, total_questions: int) -> str:
+        """Session context for the merge call, which sees per-question evaluations instead of transcripts."""
+        return f"""
+Combine these per-question evaluations of a video interview into one session assessment. Provide your response as a valid JSON object.
+
+## Interview Context
+- Total Questions: {total_questions}
+- Total Speaking Time: {session_metrics['total_duration']:.1f} seconds
+- Total Words: {session_metrics['total_words']}
+- Average Speaking Rate: {session_metrics['average_speaking_rate']:.1f} words/minute
+
+## Per-Question Evaluations
+"""
+
+    def _render_merge_block(self, number: int, data: Dict, evaluation: str) -> str:
+        """Prompt block for one question's evaluation in the merge call."""
+        return f"""
+### Question {number} [{data.get('question_category', 'general').upper()}]
+**Question:** {data['question_text']}
+**Evaluation:** {evaluation}
+"""
+
+    def _get_session_response_format(self) -> str:
+        """Required JSON format and guidelines for a session assessment."""
+        return """
 ## Required JSON Response Format
 Provide your analysis as a JSON object with this exact structure:
 
@@ -471,8 +828,13 @@ Provide your analysis as a JSON object with this exact structure:
 6. Provide actionable insights for hiring decisions
 7. Consider the speaking patterns and fluency metrics provided
 """
-        
-        return prompt
+
+    def _get_question_system_prompt(self) -> str:
+        """Get the system prompt for evaluating a single answer."""
+        return """You are an expert interview analyst evaluating one answer from a video interview.
+
+Score the answer objectively, quote specific evidence from it, and take the speaking metrics into account.
+Always respond with valid JSON in the exact format requested. Be thorough but concise."""
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for OpenAI analysis."""
@@ -491,6 +853,10 @@ Always respond with valid JSON in the exact format requested. Be thorough but co
 
     def _calculate_cost(self, usage, model: str) -> float:
         """Calculate estimated OpenAI API cost."""
+        return self._estimate_cost(usage.prompt_tokens, usage.completion_tokens, model)
+
+    def _estimate_cost(self, prompt_tokens: int, completion_tokens: int, model: str) -> float:
+        """Estimate OpenAI API cost from token counts, e.g. before a call from the prompt plan."""
         # Pricing as of 2024 (per 1K tokens)
         pricing = {
             "gpt-4o-mini": {"input": 0.00015, "output": 0.0006},  # Much cheaper!
@@ -501,8 +867,8 @@ Always respond with valid JSON in the exact format requested. Be thorough but co
         
         model_pricing = pricing.get(model, pricing["gpt-4o-mini"])
         
-        input_cost = (usage.prompt_tokens / 1000) * model_pricing["input"]
-        output_cost = (usage.completion_tokens / 1000) * model_pricing["output"]
+        input_cost = (prompt_tokens / 1000) * model_pricing["input"]
+        output_cost = (completion_tokens / 1000) * model_pricing["output"]
         
         return round(input_cost + output_cost, 6)
 
@@ -0,0 +1,426 @@
+"""
+Batch Analysis Pipeline
+Offline session analysis for bulk re-scoring and overnight backlogs: pending
+session prompts are written to a JSONL request file, processed by a batch
+provider, and the results are written back to the sessions in bulk
+"""
+import os
+import json
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database.models import CandidateSession, Recording
+from .analysis_service import AnalysisService, analysis_service, ANALYSIS_VERSION
+from .analysis_cache import analysis_cache
+from .usage_meter import usage_meter
+from .batch_backends import BatchBackend, BatchStatus, get_batch_backend
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Sessions are matched to result lines through the request's custom_id
+CUSTOM_ID_PREFIX = "session-"
+
+# Transcription states that mean a recording's transcript is still to come
+_TRANSCRIPTION_OUTSTANDING = ["pending", "queued", "processing", "retry_scheduled"]
+
+@dataclass
+class BatchJob:
+    """A request file and what is needed to ingest its results, persisted next to the file as a manifest."""
+    request_file: str
+    backend: str
+    created_at: str
+    sessions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    batch_id: Optional[str] = None
+    status: str = "prepared"
+
+    @property
+    def session_ids(self) -> List[int]:
+        return [int(session_id) for session_id in self.sessions]
+
+    @property
+    def manifest_file(self) -> str:
+        return f"{os.path.splitext(self.request_file)[0]}.manifest.json"
+
+    def save(self) -> None:
+        with open(self.manifest_file, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, manifest_file: str) -> "BatchJob":
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+class BatchAnalysisPipeline:
+    """
+    Prepare, submit, poll and ingest offline analysis batches.
+
+    Each session becomes one request with the same prompt the synchronous
+    "session" analysis sends, so results are interchangeable and are also
+    stored in the analysis cache. Sessions are claimed as "batch_preparing"
+    before their requests are written, so schedulers in several workers
+    never queue a session twice, and are marked "batch_queued" with the
+    provider's batch ID until their results are ingested, so an interrupted
+    process can pick finished batches up again with ingest_finished_batches().
+    Ingest claims the queued sessions as "batch_ingesting" the same way, so
+    results and usage are written once however many workers find a batch.
+    prepare() and ingest() are blocking (prompt tokenization, file parsing,
+    bulk updates); async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, backend: Optional[BatchBackend] = None, batch_dir: Optional[str] = None,
+                 service: Optional[AnalysisService] = None):
+        """
+        Args:
+            backend: Batch provider. Defaults to settings.ANALYSIS_BATCH_BACKEND.
+            batch_dir: Directory for request, manifest and results files. Defaults to settings.ANALYSIS_BATCH_DIR.
+            service: Analysis service that builds prompts and results
+        """
+        self.backend = backend or get_batch_backend()
+        self.batch_dir = batch_dir or settings.ANALYSIS_BATCH_DIR
+        self.service = service or analysis_service
+        os.makedirs(self.batch_dir, exist_ok=True)
+
+    def pending_session_ids(self, db: Session, limit: Optional[int] = None) -> List[int]:
+        """Ended sessions awaiting analysis whose recordings are all transcribed (at least one successfully)."""
+        rows = db.query(CandidateSession.id).filter(
+            (CandidateSession.analysis_status == "pending") | (CandidateSession.analysis_status.is_(None)),
+            CandidateSession.analysis_batch_id.is_(None),
+            CandidateSession.end_time.isnot(None),
+            CandidateSession.recordings.any(Recording.transcription_status == "completed"),
+            ~CandidateSession.recordings.any(Recording.transcription_status.in_(_TRANSCRIPTION_OUTSTANDING))
+        ).order_by(CandidateSession.id).limit(limit or settings.ANALYSIS_BATCH_MAX_SESSIONS).all()
+        return [row.id for row in rows]
+
+    def claim_sessions(self, db: Session, session_ids: List[int]) -> List[int]:
+        """
+        Atomically mark pending sessions as "batch_preparing".
+
+        A single conditional UPDATE, so when several workers run the batch
+        job at once each session is claimed by exactly one of them.
+
+        Returns:
+            The sessions this call claimed, in the order given
+        """
+        if not session_ids:
+            return []
+        claimed = set(db.execute(
+            update(CandidateSession)
+            .where(CandidateSession.id.in_(session_ids),
+                   (CandidateSession.analysis_status == "pending") | (CandidateSession.analysis_status.is_(None)),
+                   CandidateSession.analysis_batch_id.is_(None))
+            .values(analysis_status="batch_preparing")
+            .returning(CandidateSession.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        db.commit()
+        return [session_id for session_id in session_ids if session_id in claimed]
+
+    def release_sessions(self, db: Session, session_ids: List[int]) -> None:
+        """Return claimed sessions that did not make it into a batch to pending."""
+        if not session_ids:
+            return
+        db.query(CandidateSession).filter(
+            CandidateSession.id.in_(session_ids),
+            CandidateSession.analysis_status == "batch_preparing"
+        ).update({"analysis_status": "pending"}, synchronize_session=False)
+        db.commit()
+
+    def claim_batch(self, db: Session, batch_id: str) -> List[int]:
+        """
+        Atomically mark a batch's queued sessions as "batch_ingesting".
+
+        Like claim_sessions(), a single conditional UPDATE, so when several
+        workers find the same finished batch only one of them writes each
+        session's result and records its usage.
+
+        Returns:
+            The sessions this call claimed
+        """
+        return sorted(db.execute(
+            update(CandidateSession)
+            .where(CandidateSession.analysis_batch_id == batch_id,
+                   CandidateSession.analysis_status == "batch_queued")
+            .values(analysis_status="batch_ingesting")
+            .returning(CandidateSession.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+
+    def prepare(self, db: Session, session_ids: Optional[List[int]] = None) -> Optional[BatchJob]:
+        """
+        Claim a set of sessions and write their request file.
+
+        Args:
+            db: Database session
+            session_ids: Sessions to analyze. Defaults to pending_session_ids().
+
+        Returns:
+            The prepared job, or None when no session was claimed or had anything to analyze
+        """
+        session_ids = session_ids if session_ids is not None else self.pending_session_ids(db)
+        session_ids = self.claim_sessions(db, session_ids)
+        if not session_ids:
+            return None
+
+        timestamp = datetime.now(timezone.utc)
+        job = BatchJob(
+            request_file=os.path.join(self.batch_dir, f"analysis_batch_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}.jsonl"),
+            backend=self.backend.name,
+            created_at=timestamp.isoformat()
+        )
+        try:
+            self._write_requests(db, job, session_ids)
+        except Exception:
+            self.release_sessions(db, session_ids)
+            if os.path.exists(job.request_file):
+                os.unlink(job.request_file)
+            raise
+
+        # Sessions skipped for lack of transcripts go back to pending
+        self.release_sessions(db, [session_id for session_id in session_ids if str(session_id) not in job.sessions])
+        if not job.sessions:
+            os.unlink(job.request_file)
+            return None
+        job.save()
+        logger.info(f"Prepared analysis batch {job.request_file} with {len(job.sessions)} session(s)")
+        return job
+
+    def _write_requests(self, db: Session, job: BatchJob, session_ids: List[int]) -> None:
+        """Write one request line per session to the job's request file and record what ingest needs."""
+        system_prompt = self.service._get_system_prompt()
+
+        with open(job.request_file, "w", encoding="utf-8") as f:
+            for session_id in session_ids:
+                try:
+                    session, transcript_data, session_metrics = self.service._collect_transcript_data(session_id, db)
+                except ValueError as e:
+                    logger.warning(f"Skipping session {session_id} in analysis batch: {str(e)}")
+                    continue
+
+                plan = self.service._build_comprehensive_analysis_prompt(transcript_data, session, session_metrics)
+                body = {
+                    "model": plan.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": plan.prompt}
+                    ],
+                    "temperature": 0.2,
+                    "max_tokens": plan.max_completion_tokens,
+                    "response_format": {"type": "json_object"}
+                }
+                f.write(json.dumps({"custom_id": f"{CUSTOM_ID_PREFIX}{session_id}", "method": "POST",
+                                    "url": "/v1/chat/completions", "body": body}) + "\n")
+                job.sessions[str(session_id)] = {
+                    "candidate_id": session.token_id,
+                    "user_id": self.service._tenant_id(db, session),
+                    "transcript_data": transcript_data,
+                    "session_metrics": session_metrics,
+                    "prompt_budget": plan.to_metadata(),
+                    "cache_key": analysis_cache.fingerprint(plan.model, system_prompt, plan.prompt, 0.2, ANALYSIS_VERSION)
+                }
+
+    async def submit(self, db: Session, job: BatchJob) -> BatchJob:
+        """Submit a prepared job and mark its sessions as queued in the provider's batch."""
+        try:
+            job.batch_id = await self.backend.submit(job.request_file)
+        except Exception:
+            self.release_sessions(db, job.session_ids)
+            raise
+        job.status = "submitted"
+        job.save()
+
+        db.bulk_update_mappings(CandidateSession, [
+            {"id": session_id, "analysis_status": "batch_queued", "analysis_batch_id": job.batch_id,
+             "analysis_error": None}
+            for session_id in job.session_ids
+        ])
+        db.commit()
+        return job
+
+    async def wait(self, job: BatchJob, poll_seconds: Optional[float] = None,
+                   timeout_seconds: Optional[float] = None) -> BatchStatus:
+        """
+        Poll a submitted job until the provider has finished with it.
+
+        Raises:
+            TimeoutError: If the batch is still running after timeout_seconds
+        """
+        poll_seconds = poll_seconds if poll_seconds is not None else settings.ANALYSIS_BATCH_POLL_SECONDS
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds if timeout_seconds else None
+        while True:
+            status = await self.backend.retrieve(job.batch_id, self.batch_dir)
+            if status.is_terminal:
+                return status
+            if deadline is not None and loop.time() >= deadline:
+                raise TimeoutError(f"Analysis batch {job.batch_id} still {status.status} after {timeout_seconds}s")
+            logger.info(f"Analysis batch {job.batch_id} {status.status}: {status.completed}/{status.total} done")
+            await asyncio.sleep(poll_seconds)
+
+    def ingest(self, db: Session, job: BatchJob, status: BatchStatus) -> Dict[str, Any]:
+        """
+        Write a finished batch's results to its sessions in bulk.
+
+        Only the sessions this call claims with claim_batch() are written, so
+        a batch found by several workers is ingested once. Sessions whose
+        line failed, did not parse or is missing from the results are marked
+        failed with the reason.
+
+        Returns:
+            Counts of completed and failed sessions
+        """
+        claimed = self.claim_batch(db, job.batch_id)
+        db.commit()
+        try:
+            updates, failed = self._ingest_results(job, status, claimed)
+            chunk_size = max(1, settings.ANALYSIS_BATCH_INGEST_CHUNK)
+            for start in range(0, len(updates), chunk_size):
+                db.bulk_update_mappings(CandidateSession, updates[start:start + chunk_size])
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.query(CandidateSession).filter(
+                CandidateSession.id.in_(claimed),
+                CandidateSession.analysis_status == "batch_ingesting"
+            ).update({"analysis_status": "batch_queued"}, synchronize_session=False)
+            db.commit()
+            raise
+
+        if claimed:
+            job.status = "ingested"
+            job.save()
+        summary = {"batch_id": job.batch_id, "status": status.status, "sessions": len(claimed),
+                   "completed": len(updates) - failed, "failed": failed}
+        logger.info(f"Ingested analysis batch {job.batch_id}: {summary['completed']} completed, {failed} failed")
+        return summary
+
+    def _ingest_results(self, job: BatchJob, status: BatchStatus, session_ids: List[int]):
+        """Session updates for the claimed sessions of a finished batch, and how many of them failed."""
+        if not session_ids:
+            return [], 0
+        results = self._read_results(status.output_file) if status.output_file else {}
+        updates, failed = [], 0
+        price_factor = settings.ANALYSIS_BATCH_PRICE_FACTOR
+
+        for session_id in map(str, session_ids):
+            entry = job.sessions.get(session_id)
+            if entry is None:
+                failed += 1
+                updates.append({"id": int(session_id), "analysis_status": "failed",
+                                "analysis_error": "Batch analysis failed: session missing from the batch manifest"})
+                continue
+            line = results.get(f"{CUSTOM_ID_PREFIX}{session_id}")
+            try:
+                if line is None:
+                    raise ValueError(status.error or f"No result in batch output (batch {status.status})")
+                response = line.get("response") or {}
+                if line.get("error") or response.get("status_code") != 200:
+                    error = line.get("error") or response.get("body", {}).get("error") or {}
+                    raise ValueError(error.get("message") if isinstance(error, dict) else str(error))
+
+                body = response["body"]
+                choice = body["choices"][0]
+                structured_analysis = json.loads(choice["message"]["content"])
+                completion = {
+                    "content": choice["message"]["content"],
+                    "model": body["model"],
+                    "usage": {key: body["usage"][key] for key in ("prompt_tokens", "completion_tokens", "total_tokens")},
+                    "cached_at": datetime.now(timezone.utc).isoformat()
+                }
+                if choice.get("finish_reason") != "length":
+                    analysis_cache.put(entry["cache_key"], completion)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                failed += 1
+                updates.append({"id": int(session_id), "analysis_status": "failed",
+                                "analysis_error": f"Batch analysis failed: {str(e) or type(e).__name__}"[:500]})
+                continue
+
+            analysis_result = self.service._build_analysis_result(
+                int(session_id), entry["candidate_id"], entry["transcript_data"], entry["session_metrics"],
+                structured_analysis, [{**completion, "cache": {"hit": False, "key": entry["cache_key"]}}],
+                entry["prompt_budget"], analysis_mode="batch")
+            usage = analysis_result["analysis_metadata"]["openai_usage"]
+            usage["estimated_cost"] = round(usage["estimated_cost"] * price_factor, 6)
+            usage_meter.record(completion["model"], usage["prompt_tokens"], usage["completion_tokens"],
+                               usage["estimated_cost"], user_id=entry.get("user_id"), session_id=int(session_id),
+                               purpose="batch_analysis")
+            analysis_result["analysis_metadata"]["batch_id"] = job.batch_id
+            updates.append({"id": int(session_id), **self.service._session_analysis_columns(analysis_result)})
+        return updates, failed
+
+    def _read_results(self, output_file: str) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        with open(output_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable line in {output_file}")
+                    continue
+                results[result.get("custom_id")] = result
+        return results
+
+    def find_job(self, batch_id: str) -> Optional[BatchJob]:
+        """The manifest of a submitted batch, if it is still on disk."""
+        for name in os.listdir(self.batch_dir):
+            if name.endswith(".manifest.json"):
+                job = BatchJob.load(os.path.join(self.batch_dir, name))
+                if job.batch_id == batch_id:
+                    return job
+        return None
+
+    async def ingest_finished_batches(self, db: Session) -> List[Dict[str, Any]]:
+        """
+        Ingest every queued batch the provider has finished with.
+
+        Returns:
+            One ingest summary per finished batch
+        """
+        batch_ids = [row.analysis_batch_id for row in db.query(CandidateSession.analysis_batch_id).filter(
+            CandidateSession.analysis_status == "batch_queued").distinct()]
+        summaries = []
+        for batch_id in filter(None, batch_ids):
+            job = self.find_job(batch_id)
+            if job is None:
+                # Without the manifest the results cannot be matched up; send the sessions round again
+                logger.warning(f"No manifest for analysis batch {batch_id}; returning its sessions to pending")
+                db.query(CandidateSession).filter(CandidateSession.analysis_batch_id == batch_id).update(
+                    {"analysis_status": "pending", "analysis_batch_id": None}, synchronize_session=False)
+                db.commit()
+                continue
+            if job.status == "ingested":
+                continue
+            status = await self.backend.retrieve(batch_id, self.batch_dir)
+            if status.is_terminal:
+                summaries.append(await asyncio.to_thread(self.ingest, db, job, status))
+        return summaries
+
+    async def run(self, db: Session, session_ids: Optional[List[int]] = None,
+                  poll_seconds: Optional[float] = None, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Prepare, submit, wait for and ingest one batch.
+
+        Args:
+            db: Database session
+            session_ids: Sessions to analyze. Defaults to pending_session_ids().
+            poll_seconds: Seconds between status checks. Defaults to settings.ANALYSIS_BATCH_POLL_SECONDS.
+            timeout_seconds: Give up waiting after this long (the batch stays queued for a later ingest)
+
+        Returns:
+            Ingest summary
+        """
+        job = await asyncio.to_thread(self.prepare, db, session_ids)
+        if job is None:
+            return {"batch_id": None, "sessions": 0, "completed": 0, "failed": 0}
+        await self.submit(db, job)
+        status = await self.wait(job, poll_seconds, timeout_seconds)
+        return await asyncio.to_thread(self.ingest, db, job, status)
@@ -0,0 +1,229 @@
+"""
+Batch analysis backends.
+Submit a JSONL file of chat completion requests for offline processing and
+fetch the results file once the provider has worked through it.
+"""
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from pathlib import Path
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Type, Optional
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Provider statuses after which a batch will not change any more
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+@dataclass
+class BatchStatus:
+    """Progress of a submitted batch; output_file is set once results were downloaded."""
+    batch_id: str
+    status: str
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+    output_file: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+class BatchBackend(ABC):
+    """
+    Abstract base class for batch completion providers.
+
+    Request files use the OpenAI batch format, one request per line:
+    {"custom_id", "method": "POST", "url": "/v1/chat/completions", "body"}.
+    Results files hold one line per request: {"custom_id", "response":
+    {"status_code", "body"}, "error"}.
+    """
+
+    # Registry name
+    name: str = ""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check whether the backend can take batches (credentials configured)."""
+        pass
+
+    @abstractmethod
+    async def submit(self, request_file: str) -> str:
+        """
+        Submit a request file.
+
+        Args:
+            request_file: Path to the JSONL request file
+
+        Returns:
+            Provider batch ID
+        """
+        pass
+
+    @abstractmethod
+    async def retrieve(self, batch_id: str, output_dir: str) -> BatchStatus:
+        """
+        Check a batch and, once it completed, download its results into output_dir.
+
+        Args:
+            batch_id: Provider batch ID
+            output_dir: Directory for the results file
+
+        Returns:
+            Current status; output_file is set when results are available
+        """
+        pass
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API: half the price of synchronous calls, results within the completion window."""
+
+    name = "openai"
+
+    def is_available(self) -> bool:
+        return bool(settings.OPENAI_API_KEY)
+
+    async def submit(self, request_file: str) -> str:
+        # Import here to avoid circular imports
+        from app.services.analysis.llm_client import llm_client
+
+        client = llm_client.get_client()
+        uploaded = await client.files.create(file=Path(request_file), purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=settings.ANALYSIS_BATCH_COMPLETION_WINDOW,
+            metadata={"source": "interview_analysis", "request_file": os.path.basename(request_file)}
+        )
+        logger.info(f"Submitted analysis batch {batch.id} from {request_file} (file {uploaded.id})")
+        return batch.id
+
+    async def retrieve(self, batch_id: str, output_dir: str) -> BatchStatus:
+        from app.services.analysis.llm_client import llm_client
+
+        client = llm_client.get_client()
+        batch = await client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        status = BatchStatus(
+            batch_id=batch_id,
+            status=batch.status,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            total=counts.total if counts else 0,
+            error="; ".join(error.message or "" for error in batch.errors.data or []) if batch.errors else None
+        )
+        # Expired and cancelled batches keep the lines that finished before they stopped
+        if not status.is_terminal or not (batch.output_file_id or batch.error_file_id):
+            return status
+
+        # Successful lines go to the output file and failed ones to the error file; both are ingested
+        output_file = os.path.join(output_dir, f"{batch_id}.results.jsonl")
+        with open(output_file, "wb") as f:
+            for file_id in filter(None, (batch.output_file_id, batch.error_file_id)):
+                content = await client.files.content(file_id)
+                await asyncio.to_thread(f.write, content.content)
+        status.output_file = output_file
+        return status
+
+class StubBatchBackend(BatchBackend):
+    """
+    Processes request files locally, for tests and dry runs.
+
+    Every request gets a deterministic JSON assessment derived from its
+    prompt, so ingest can be exercised without a provider or API key.
+    """
+
+    name = "stub"
+
+    def __init__(self):
+        self._batches: Dict[str, str] = {}
+
+    def is_available(self) -> bool:
+        return True
+
+    async def submit(self, request_file: str) -> str:
+        batch_id = f"batch_stub_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = request_file
+        return batch_id
+
+    async def retrieve(self, batch_id: str, output_dir: str) -> BatchStatus:
+        request_file = self._batches.get(batch_id)
+        if request_file is None:
+            return BatchStatus(batch_id=batch_id, status="failed", error="Unknown batch")
+
+        output_file = os.path.join(output_dir, f"{batch_id}.results.jsonl")
+        total = await asyncio.to_thread(self._process, request_file, output_file)
+        return BatchStatus(batch_id=batch_id, status="completed", completed=total, total=total, output_file=output_file)
+
+    def _process(self, request_file: str, output_file: str) -> int:
+        total = 0
+        with open(request_file, "r", encoding="utf-8") as requests, open(output_file, "w", encoding="utf-8") as results:
+            for line in requests:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request["body"]
+                prompt = "".join(message["content"] for message in body["messages"])
+                digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+                content = json.dumps({
+                    "overall_score": 4 + digest % 6,
+                    "hiring_recommendation": "requires_review",
+                    "confidence_level": "low",
+                    "summary": "Stub batch assessment"
+                })
+                prompt_tokens = len(prompt) // 4
+                completion_tokens = len(content) // 4
+                results.write(json.dumps({
+                    "id": f"batch_req_{total}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": body["model"],
+                            "created": int(time.time()),
+                            "choices": [{"index": 0, "finish_reason": "stop",
+                                         "message": {"role": "assistant", "content": content}}],
+                            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                      "total_tokens": prompt_tokens + completion_tokens}
+                        }
+                    },
+                    "error": None
+                }) + "\n")
+                total += 1
+        return total
+
+_BACKENDS: Dict[str, Type[BatchBackend]] = {
+    "openai": OpenAIBatchBackend,
+    "stub": StubBatchBackend,
+}
+
+# One shared instance per backend, so the stub keeps track of its batches
+_instances: Dict[str, BatchBackend] = {}
+
+def get_batch_backend(backend_name: Optional[str] = None) -> BatchBackend:
+    """
+    Get a batch backend instance.
+
+    Args:
+        backend_name: Registry name. Defaults to settings.ANALYSIS_BATCH_BACKEND.
+
+    Returns:
+        Shared instance of the backend
+
+    Raises:
+        ValueError: If no backend is registered under the name
+    """
+    backend_name = backend_name or settings.ANALYSIS_BATCH_BACKEND
+    if backend_name not in _BACKENDS:
+        raise ValueError(f"Unknown batch analysis backend '{backend_name}'. Available: {', '.join(_BACKENDS)}")
+    if backend_name not in _instances:
+        _instances[backend_name] = _BACKENDS[backend_name]()
+    return _instances[backend_name]
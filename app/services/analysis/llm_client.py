@@ -0,0 +1,158 @@
+"""
+LLM Client
+Process-wide async OpenAI client for analysis, so LLM round trips never block
+the event loop and every request reuses the same keep-alive connection pool
+"""
+import time
+import asyncio
+import logging
+import weakref
+from typing import Dict, Any, Optional
+
+from openai import AsyncOpenAI, APITimeoutError, Timeout
+
+from app.core.config import settings
+from app.services.analysis.llm_scheduler import llm_scheduler
+from app.services.analysis.prompt_builder import token_counter, TOKENS_PER_MESSAGE, TOKENS_PER_REPLY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class LLMClient:
+    """
+    Shared AsyncOpenAI client for chat completions.
+
+    One client (and with it one HTTP connection pool) is created per event
+    loop on first use and reused by every caller on that loop; connections
+    are bound to the loop that opened them, so a background asyncio.run()
+    gets its own. Calls take a per-call timeout and are cancelled with the
+    task awaiting them.
+    """
+
+    def __init__(self):
+        """Initialize without a client; clients are created on first use."""
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._stats = {
+            "calls": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0
+        }
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(settings.OPENAI_API_KEY)
+
+    def _create_client(self):
+        """Build an AsyncOpenAI client with the configured timeouts and retries."""
+        return AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=Timeout(settings.OPENAI_ANALYSIS_TIMEOUT_SECONDS, connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS),
+            # The scheduler retries with backoff against the shared budgets; SDK retries would bypass them
+            max_retries=0 if llm_scheduler.enabled else settings.OPENAI_ANALYSIS_MAX_RETRIES
+        )
+
+    def get_client(self):
+        """Get the client for the running event loop, creating it on first use."""
+        if not self.is_configured:
+            raise ValueError("OpenAI client not initialized - API key required")
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._create_client()
+            self._clients[loop] = client
+        return client
+
+    def warm_up(self) -> None:
+        """
+        Create the running loop's client ahead of the first analysis.
+
+        Building the client and resolving its resource modules takes a few
+        hundred milliseconds of blocking work; doing it at startup keeps that
+        off the first request.
+        """
+        if self.is_configured:
+            self.get_client().chat.completions
+
+    def estimate_tokens(self, request: Dict[str, Any]) -> int:
+        """Tokens a request can consume: its messages plus the completion allowance."""
+        model = request.get("model") or settings.ANALYSIS_MODEL
+        prompt_tokens = sum(TOKENS_PER_MESSAGE + token_counter.count(str(message.get("content") or ""), model)
+                            for message in request.get("messages", []))
+        return prompt_tokens + TOKENS_PER_REPLY + (request.get("max_tokens") or settings.ANALYSIS_MAX_COMPLETION_TOKENS)
+
+    async def chat_completion(self, timeout: Optional[float] = None, **request):
+        """
+        Create a chat completion without blocking the event loop.
+
+        The call waits for its model's rate-limit budget in the scheduler,
+        which also retries rate-limited and transient failures.
+
+        Args:
+            timeout: Seconds allowed per attempt. Defaults to settings.OPENAI_ANALYSIS_TIMEOUT_SECONDS.
+            **request: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            The ChatCompletion response
+
+        Raises:
+            openai.APITimeoutError: When an attempt (and its retries) ran out of time
+            openai.RateLimitError: When the API still refused the call after the scheduler's retries
+            asyncio.CancelledError: When the awaiting task was cancelled; the request is aborted
+        """
+        client = self.get_client()
+        if timeout is not None:
+            request["timeout"] = timeout
+
+        self._stats["calls"] += 1
+        self._stats["in_flight"] += 1
+        start_time = time.perf_counter()
+        try:
+            response = await llm_scheduler.submit(
+                request.get("model") or settings.ANALYSIS_MODEL,
+                self.estimate_tokens(request),
+                lambda: client.chat.completions.create(**request)
+            )
+            self._stats["completed"] += 1
+            return response
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            logger.info(f"Chat completion ({request.get('model')}) cancelled after "
+                        f"{time.perf_counter() - start_time:.1f}s")
+            raise
+        except APITimeoutError:
+            self._stats["timed_out"] += 1
+            raise
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._stats["in_flight"] -= 1
+            self._stats["total_seconds"] += time.perf_counter() - start_time
+
+    async def aclose(self) -> None:
+        """Close the running loop's client and its connections."""
+        try:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        except RuntimeError:
+            return
+        if client is not None:
+            await client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call counters and average latency."""
+        finished = self._stats["calls"] - self._stats["in_flight"]
+        return {
+            "configured": self.is_configured,
+            "clients": len(self._clients),
+            **{key: round(value, 3) if isinstance(value, float) else value
+               for key, value in self._stats.items()},
+            "average_seconds": round(self._stats["total_seconds"] / finished, 3) if finished else 0.0
+        }
+
+# Create singleton instance
+llm_client = LLMClient()
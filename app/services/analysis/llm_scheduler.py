@@ -0,0 +1,258 @@
+"""
+LLM Scheduler
+Paces chat completions against per-model requests-per-minute and
+tokens-per-minute budgets and retries rate-limited calls with jittered backoff
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt; APITimeoutError is an APIConnectionError
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse per-model limits written as "model=rpm:tpm,model=rpm:tpm".
+
+    Args:
+        spec: Limits string, e.g. settings.LLM_RATE_LIMITS
+
+    Returns:
+        {model: (requests per minute, tokens per minute)}
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            model, values = entry.split("=", 1)
+            rpm, tpm = values.split(":", 1)
+            limits[model.strip()] = (int(rpm), int(tpm))
+        except ValueError:
+            logger.warning(f"Ignoring malformed LLM rate limit '{entry}' (expected model=rpm:tpm)")
+    return limits
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The Retry-After delay the API sent with an error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+class TokenBucket:
+    """
+    Reservation token bucket refilled continuously at capacity per minute.
+
+    reserve() takes the amount straight away, letting the level go negative,
+    and returns how long the caller must wait before the reservation is
+    covered. Callers are therefore served in the order they reserved, and
+    the bucket is safe to share between threads and event loops.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self._level = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount from the bucket.
+
+        Args:
+            amount: Requests or tokens; capped at the capacity so an oversized
+                    request waits for a full bucket instead of forever
+
+        Returns:
+            Seconds until the reservation is covered (0 when it already is)
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, when negative, take) part of a reservation once the real cost is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every later reservation back for at least seconds, e.g. after a 429."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self._level, -seconds * self.rate)
+
+    @property
+    def level(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._level
+
+class LLMScheduler:
+    """
+    Central pacing for chat completions.
+
+    Every call reserves one request and its estimated tokens (prompt plus
+    completion allowance) from its model's RPM and TPM buckets and waits
+    until both are covered, so a burst of finished sessions is queued
+    instead of running into 429s. Unused tokens are refunded from the
+    response's usage. Rate-limit, connection and 5xx errors are retried with
+    jittered exponential backoff (never sooner than the API's Retry-After),
+    and a 429 pauses the model's buckets for everyone.
+    """
+
+    def __init__(self):
+        """Initialize without buckets; a model's buckets are created on its first call."""
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "delayed": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "retries": 0,
+            "rate_limited": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LLM_SCHEDULER_ENABLED
+
+    def limits_for(self, model: str) -> Tuple[int, int]:
+        """(requests per minute, tokens per minute) for a model."""
+        limits = parse_rate_limits(settings.LLM_RATE_LIMITS)
+        return limits.get(model, (settings.LLM_DEFAULT_RPM, settings.LLM_DEFAULT_TPM))
+
+    def _buckets_for(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        with self._lock:
+            if model not in self._buckets:
+                rpm, tpm = self.limits_for(model)
+                self._buckets[model] = (TokenBucket(rpm), TokenBucket(tpm))
+            return self._buckets[model]
+
+    async def _acquire(self, model: str, tokens: int) -> None:
+        """Reserve a request and its tokens, then wait until the budgets cover them."""
+        requests, token_bucket = self._buckets_for(model)
+        wait = max(requests.reserve(1), token_bucket.reserve(tokens))
+        self._stats["requests"] += 1
+        if wait <= 0:
+            return
+
+        self._stats["delayed"] += 1
+        self._stats["queued"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queued"])
+        start_time = time.monotonic()
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # The call was never sent, so its budget goes back to the callers behind it
+            requests.refund(1)
+            token_bucket.refund(tokens)
+            raise
+        finally:
+            waited = time.monotonic() - start_time
+            self._stats["queued"] -= 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def _retry_wait(self, retry_state) -> float:
+        """Jittered exponential backoff, but at least the Retry-After the API asked for."""
+        backoff = wait_random_exponential(multiplier=settings.LLM_RETRY_BASE_SECONDS,
+                                          max=settings.LLM_RETRY_MAX_SECONDS)(retry_state)
+        error = retry_state.outcome.exception()
+        retry_after = retry_after_seconds(error) if error is not None else None
+        return max(backoff, retry_after or 0.0)
+
+    def _before_retry(self, model: str, retry_state) -> None:
+        error = retry_state.outcome.exception()
+        self._stats["retries"] += 1
+        if isinstance(error, RateLimitError):
+            self._stats["rate_limited"] += 1
+            # Everyone else queued for this model would hit the same limit
+            pause = retry_after_seconds(error) or settings.LLM_RETRY_BASE_SECONDS
+            for bucket in self._buckets_for(model):
+                bucket.pause(pause)
+        logger.warning(f"LLM call to {model} failed ({type(error).__name__}), attempt "
+                       f"{retry_state.attempt_number}; retrying in {retry_state.next_action.sleep:.1f}s")
+
+    async def submit(self, model: str, estimated_tokens: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a completion within the model's budgets, retrying transient failures.
+
+        Args:
+            model: Chat model the call is billed to
+            estimated_tokens: Prompt tokens plus the completion allowance (max_tokens)
+            call: Makes one attempt; called again for every retry
+
+        Returns:
+            The call's result
+
+        Raises:
+            The last error once settings.LLM_RETRY_ATTEMPTS attempts have failed,
+            or immediately for errors that are not worth retrying
+        """
+        if not self.enabled:
+            return await call()
+
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type(RETRYABLE_ERRORS),
+            stop=stop_after_attempt(max(1, settings.LLM_RETRY_ATTEMPTS)),
+            wait=self._retry_wait,
+            before_sleep=lambda retry_state: self._before_retry(model, retry_state),
+            reraise=True
+        )
+        async for attempt in retrying:
+            with attempt:
+                await self._acquire(model, estimated_tokens)
+                try:
+                    response = await call()
+                except RateLimitError:
+                    # A rejected request does not count against the quota
+                    for bucket, amount in zip(self._buckets_for(model), (1, estimated_tokens)):
+                        bucket.refund(amount)
+                    raise
+                usage = getattr(response, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None) is not None:
+                    self._buckets_for(model)[1].refund(estimated_tokens - usage.total_tokens)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, time spent waiting for budget, retries and the remaining budget per model."""
+        delayed = self._stats["delayed"]
+        return {
+            "enabled": self.enabled,
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in self._stats.items()},
+            "average_wait_seconds": round(self._stats["total_wait_seconds"] / delayed, 3) if delayed else 0.0,
+            "models": {
+                model: {
+                    "rpm_limit": requests.capacity,
+                    "tpm_limit": tokens.capacity,
+                    "requests_available": round(requests.level, 1),
+                    "tokens_available": round(tokens.level)
+                }
+                for model, (requests, tokens) in list(self._buckets.items())
+            }
+        }
+
+# Create singleton instance
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,305 @@
+"""
+Prompt Builder
+Token-budgeted analysis prompts: counts tokens with tiktoken before the call,
+caches the count of every transcript, and shrinks answers step by step
+(filler words, then per-question compression) until the prompt fits
+"""
+import re
+import math
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Every chat message costs a few tokens of framing on top of its content
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Hesitations carry no content; the speech metrics already describe fluency. The text is
+# split on them (a comma before a hesitation goes with it), which is much faster than
+# substituting with a pattern that looks for that comma at every position.
+_FILLER = re.compile(r"(?i)\b(?:u+m+|u+h+m*|e+r+m*|h+m+|mm+|a+h+)\b[,.]?|,\s*you know,")
+_STUTTER = re.compile(r"(?i)\b(\w+)(?:\s+\1\b)+")
+
+# Words that are grammatical when doubled ("had had", "that that", "very very") are not stutters
+DOUBLED_WORDS = frozenset({
+    "had", "that", "is", "do", "very", "really", "so", "much", "many", "more", "far", "long", "again",
+    "over", "on", "and", "by", "round", "out", "now", "well", "no", "yes", "bye", "go", "wait", "ha"
+})
+_SPACES = re.compile(r"\s{2,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+OMISSION_MARKER = " [...] "
+
+def is_stutter(word: str) -> bool:
+    """Whether a word said twice in a row is a stutter: numbers and DOUBLED_WORDS are meant."""
+    word = word.lower().strip(",.;:!?")
+    return bool(word) and not any(character.isdigit() for character in word) and word not in DOUBLED_WORDS
+
+@lru_cache(maxsize=256)
+def strip_filler(text: str) -> Tuple[str, int]:
+    """
+    Remove hesitation words ("um", "uh", ", you know,") from a transcript.
+
+    Returns the trimmed text and the number of hesitations removed. Results
+    are cached: the speech metrics count a session's fillers and every
+    prompt built for it trims the same answers, so each is scanned once.
+    """
+    parts = _FILLER.split(text)
+    if len(parts) == 1:
+        return text.strip(), 0
+    pieces = []
+    for part in parts[:-1]:
+        part = part.rstrip()
+        pieces.append((part[:-1] if part.endswith(",") else part).strip())
+    pieces.append(parts[-1].strip())
+    return " ".join(piece for piece in pieces if piece), len(parts) - 1
+
+def trim_filler(text: str) -> str:
+    """Remove hesitation words ("um", "uh", ", you know,") from a transcript."""
+    return strip_filler(text)[0]
+
+def collapse_stutters(text: str) -> str:
+    """Collapse stuttered repeats ("I I think") to one word, keeping numbers and DOUBLED_WORDS."""
+    text = _STUTTER.sub(lambda match: match.group(1) if is_stutter(match.group(1)) else match.group(0), text)
+    return _SPACES.sub(" ", text).strip()
+
+class TokenCounter:
+    """
+    tiktoken counts with an LRU cache keyed by content hash.
+
+    A session's transcripts are re-counted for every analysis and every
+    compression step, so counts are cached per (encoding, text). When the
+    encoding cannot be loaded (e.g. no network to fetch the BPE file) counts
+    fall back to a 4-characters-per-token estimate and are marked inexact.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Cached counts kept. Defaults to settings.TOKEN_COUNT_CACHE_SIZE.
+        """
+        self.max_entries = max_entries or settings.TOKEN_COUNT_CACHE_SIZE
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._encodings: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get_encoding(self, model: str):
+        """The model's tiktoken encoding, or None when it cannot be loaded."""
+        if model not in self._encodings:
+            try:
+                import tiktoken
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken encoding for '{model}' unavailable, estimating token counts: {str(e)}")
+                encoding = None
+            self._encodings[model] = encoding
+        return self._encodings[model]
+
+    def is_exact(self, model: str) -> bool:
+        return self.get_encoding(model) is not None
+
+    def count(self, text: str, model: str) -> int:
+        """
+        Count the tokens of text for a model, from the cache when possible.
+
+        Args:
+            text: Text to count
+            model: Chat model the text is sent to
+
+        Returns:
+            Token count
+        """
+        if not text:
+            return 0
+        encoding = self.get_encoding(model)
+        key = (encoding.name if encoding is not None else "estimate", hashlib.sha1(text.encode("utf-8")).hexdigest())
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                self._stats["hits"] += 1
+                return count
+
+        count = len(encoding.encode(text)) if encoding is not None else math.ceil(len(text) / 4)
+        with self._lock:
+            self._stats["misses"] += 1
+            self._counts[key] = count
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return count
+
+    def truncate(self, text: str, max_tokens: int, model: str) -> str:
+        """Cut text to at most max_tokens, at a word boundary."""
+        encoding = self.get_encoding(model)
+        if encoding is not None:
+            cut = encoding.decode(encoding.encode(text)[:max_tokens])
+        else:
+            cut = text[:max_tokens * 4]
+        if len(cut) < len(text) and " " in cut:
+            cut = cut.rsplit(" ", 1)[0]
+        return cut
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._counts),
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+@dataclass
+class PromptPlan:
+    """An analysis prompt that fits the budget, with its predicted token counts."""
+    prompt: str
+    model: str
+    prompt_tokens: int
+    budget_tokens: int
+    max_completion_tokens: int
+    level: str
+    exact: bool
+    answers: List[Dict[str, int]] = field(default_factory=list)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "predicted_prompt_tokens": self.prompt_tokens,
+            "budget_tokens": self.budget_tokens,
+            "max_completion_tokens": self.max_completion_tokens,
+            "compression_level": self.level,
+            "exact_count": self.exact,
+            "answer_tokens": self.answers
+        }
+
+class PromptBuilder:
+    """
+    Fits an analysis prompt into a token budget.
+
+    The prompt is fixed text (system prompt, interview header, response
+    format) plus one block per question whose answer can be shortened.
+    Answers are reduced only as far as needed, in levels:
+    - "full": every answer verbatim
+    - "filler_trimmed": hesitations removed and stutters collapsed in every answer
+    - "compressed": answers longer than a common cap are cut to their
+      opening sentences and closing sentence, with the cap chosen so short
+      answers stay whole and the remaining budget is shared by the long ones
+    - "metrics_only": answers replaced by a word count when not even
+      ANALYSIS_MIN_ANSWER_TOKENS per answer is left
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        self.counter = counter or token_counter
+
+    def build(self, system_prompt: str, header: str, footer: str, answers: List[str],
+              render_block: Callable[[int, str], str], model: Optional[str] = None,
+              budget_tokens: Optional[int] = None) -> PromptPlan:
+        """
+        Build the user prompt: header, one rendered block per answer, footer.
+
+        Args:
+            system_prompt: System message sent with the prompt (counted, not included)
+            header: Text before the question blocks
+            footer: Text after the question blocks
+            answers: Answer transcripts, in question order
+            render_block: Renders question block i (0-based) around an answer text
+            model: Chat model. Defaults to settings.ANALYSIS_MODEL.
+            budget_tokens: Prompt budget, system prompt included. Defaults to
+                           settings.ANALYSIS_PROMPT_TOKEN_BUDGET.
+
+        Returns:
+            The fitted prompt with its token count and completion allowance
+        """
+        model = model or settings.ANALYSIS_MODEL
+        budget = budget_tokens or settings.ANALYSIS_PROMPT_TOKEN_BUDGET
+        count = lambda text: self.counter.count(text, model)
+
+        # Everything except the answers themselves
+        overhead = (2 * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY + count(system_prompt) + count(header) + count(footer)
+                    + sum(count(render_block(i, "")) for i in range(len(answers))))
+        available = budget - overhead
+
+        original = [count(answer) for answer in answers]
+        level, texts = "full", list(answers)
+        if sum(original) > available:
+            level, texts = "filler_trimmed", [collapse_stutters(trim_filler(answer)) for answer in answers]
+            if sum(count(text) for text in texts) > available:
+                level, texts = self._compress(texts, available, model)
+
+        prompt = header + "".join(render_block(i, text) for i, text in enumerate(texts)) + footer
+        prompt_tokens = count(system_prompt) + count(prompt) + 2 * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY
+        max_completion = max(0, min(settings.ANALYSIS_MAX_COMPLETION_TOKENS,
+                                    settings.ANALYSIS_CONTEXT_WINDOW_TOKENS - prompt_tokens))
+
+        if level != "full":
+            logger.info(f"Analysis prompt compressed to fit {budget} tokens ({level}): "
+                        f"{sum(original)} -> {sum(count(text) for text in texts)} answer tokens")
+        return PromptPlan(
+            prompt=prompt,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            budget_tokens=budget,
+            max_completion_tokens=max_completion,
+            level=level,
+            exact=self.counter.is_exact(model),
+            answers=[{"original": before, "sent": count(text)} for before, text in zip(original, texts)]
+        )
+
+    def _compress(self, texts: List[str], available: int, model: str) -> Tuple[str, List[str]]:
+        """Cap every answer at the largest common size that fits what is left of the budget."""
+        counts = [self.counter.count(text, model) for text in texts]
+        minimum = settings.ANALYSIS_MIN_ANSWER_TOKENS
+        if not texts or available < minimum * len(texts):
+            return "metrics_only", [f"[response omitted: {len(text.split())} words]" for text in texts]
+
+        # Largest cap with sum(min(count, cap)) <= available
+        low, high = minimum, max(counts)
+        while low < high:
+            cap = (low + high + 1) // 2
+            if sum(min(c, cap) for c in counts) <= available:
+                low = cap
+            else:
+                high = cap - 1
+
+        compressed = [text if c <= low else self._shorten(text, low, model) for text, c in zip(texts, counts)]
+        return "compressed", compressed
+
+    def _shorten(self, text: str, max_tokens: int, model: str) -> str:
+        """
+        Keep the opening sentences and the closing sentence of an answer.
+
+        The opening usually states the candidate's answer and the close their
+        conclusion; the middle goes first. Falls back to a plain cut when even
+        the first sentence does not fit.
+        """
+        count = lambda value: self.counter.count(value, model)
+        sentences = _SENTENCE_END.split(text)
+        limit = max_tokens - count(OMISSION_MARKER)
+        closing = sentences[-1] if len(sentences) > 1 and count(sentences[-1]) <= limit // 3 else ""
+
+        kept, used = [], count(closing)
+        for sentence in sentences[:-1] if closing else sentences:
+            tokens = count(sentence) + 1
+            if used + tokens > limit:
+                break
+            kept.append(sentence)
+            used += tokens
+
+        if not kept:
+            return self.counter.truncate(text, limit, model) + OMISSION_MARKER.rstrip()
+        return " ".join(kept) + OMISSION_MARKER + closing if closing else " ".join(kept) + OMISSION_MARKER.rstrip()
+
+# Create singleton instances
+token_counter = TokenCounter()
+prompt_builder = PromptBuilder(token_counter)
@@ -0,0 +1,269 @@
+"""
+Speech Metrics
+Vectorized fluency metrics for all of a session's recordings at once: pauses
+and their histogram, long pauses, continuity, speaking rate over the course
+of each answer and filler-word rates, compact enough to replace verbose
+transcript text in the analysis prompt
+"""
+import logging
+import operator
+from itertools import compress, islice
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from .prompt_builder import strip_filler, is_stutter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Gaps between segments shorter than this are not pauses
+PAUSE_THRESHOLD_SECONDS = 0.1
+
+# Pauses longer than this cost continuity points
+LONG_PAUSE_SECONDS = 3.0
+
+# Upper edges of the pause histogram bins; the last bin is open-ended
+PAUSE_BIN_EDGES = (0.5, 1.0, 2.0, 3.0)
+
+_START = operator.itemgetter("start")
+_END = operator.itemgetter("end")
+_TEXT = operator.itemgetter("text")
+
+def pause_bin_labels() -> List[str]:
+    """Labels of the pause histogram bins, e.g. "0.1-0.5s" ... "3+s"."""
+    lower = (PAUSE_THRESHOLD_SECONDS,) + PAUSE_BIN_EDGES
+    labels = [f"{low:g}-{high:g}s" for low, high in zip(lower, PAUSE_BIN_EDGES)]
+    return labels + [f"{PAUSE_BIN_EDGES[-1]:g}+s"]
+
+def recording_timings(segments: List[Dict[str, Any]], text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Engine input for one recording.
+
+    Args:
+        segments: Segment dicts with start, end and text, as stored in transcripts
+        text: Full transcript text, for filler counts. Defaults to the joined segment text.
+
+    Returns:
+        {"starts", "ends", "segment_texts", "text"}
+    """
+    segment_texts = [segment_text or "" for segment_text in map(_TEXT, segments)]
+    return {
+        "starts": np.fromiter(map(_START, segments), dtype=np.float64, count=len(segments)),
+        "ends": np.fromiter(map(_END, segments), dtype=np.float64, count=len(segments)),
+        "segment_texts": segment_texts,
+        "text": text if text is not None else " ".join(segment_texts)
+    }
+
+def buffer_timings(starts, ends, text_buffer: bytes, text_offsets, text: str) -> Dict[str, Any]:
+    """
+    Engine input for one recording as stored, e.g. CompactTranscript.timings() and
+    segment_text_buffer(), so segment texts need not be decoded one by one.
+
+    Args:
+        starts: Segment start times (any sequence or buffer of floats)
+        ends: Segment end times
+        text_buffer: UTF-8 text of all segments
+        text_offsets: n+1 byte offsets of the segments in text_buffer
+        text: Full transcript text, for filler counts
+
+    Returns:
+        {"starts", "ends", "text_buffer", "text_offsets", "text"}
+    """
+    return {
+        "starts": np.asarray(starts, dtype=np.float64),
+        "ends": np.asarray(ends, dtype=np.float64),
+        "text_buffer": text_buffer,
+        "text_offsets": np.asarray(text_offsets, dtype=np.int64),
+        "text": text
+    }
+
+def count_filler(text: str) -> Dict[str, int]:
+    """
+    Words, hesitation words and stuttered repeats ("I I think") in a transcript.
+
+    Hesitations are what trim_filler removes, counted in the same cached
+    scan the prompt's trimming uses, so the rate describes exactly the
+    words left out of the prompt. Repeats are found by comparing
+    neighbouring tokens; repeated numbers and words that are grammatical
+    when doubled ("had had") are not counted.
+    """
+    tokens = text.lower().split()
+    # Neighbours are compared in C (map/compress); is_stutter only sees the few repeated tokens
+    repeated = compress(tokens, map(operator.eq, tokens, islice(tokens, 1, None)))
+    repeats = sum(map(is_stutter, repeated))
+    return {"words": len(tokens), "fillers": strip_filler(text)[1] + repeats}
+
+def _word_counts(is_space: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Words per segment, given which characters are spaces and the n+1 segment offsets into them."""
+    # A word starts at a non-space character that follows a space or opens a segment
+    follows_space = np.empty(is_space.size, dtype=bool)
+    follows_space[:1] = True
+    follows_space[1:] = is_space[:-1]
+    follows_space[offsets[:-1][np.diff(offsets) > 0]] = True
+    word_starts = np.concatenate(([0], np.cumsum(~is_space & follows_space)))
+    return (word_starts[offsets[1:]] - word_starts[offsets[:-1]]).astype(np.float64)
+
+def _segment_word_counts(segment_texts: List[str]) -> np.ndarray:
+    """Whitespace-separated words per segment, counted over the joined text of all segments at once."""
+    lengths = np.fromiter(map(len, segment_texts), dtype=np.int64, count=len(segment_texts))
+    codes = np.frombuffer("".join(segment_texts).encode("utf-32-le"), dtype=np.uint32)
+    is_space = (codes <= 32) | (codes == 0xA0) | ((codes >= 0x2000) & (codes <= 0x200A)) | (codes == 0x3000)
+    return _word_counts(is_space, np.concatenate(([0], np.cumsum(lengths))))
+
+def _buffer_word_counts(text_buffer: bytes, text_offsets: np.ndarray) -> np.ndarray:
+    """
+    Words per segment straight from UTF-8 bytes. Multi-byte characters never
+    contain bytes below 0x80, so ASCII whitespace is found byte by byte (the
+    rare non-ASCII spaces count as word characters here).
+    """
+    return _word_counts(np.frombuffer(text_buffer, dtype=np.uint8) <= 32, text_offsets)
+
+def _recording_word_counts(recording: Dict[str, Any]) -> np.ndarray:
+    if "text_buffer" in recording:
+        return _buffer_word_counts(recording["text_buffer"], recording["text_offsets"])
+    return _segment_word_counts(recording["segment_texts"])
+
+class SpeechMetricsEngine:
+    """
+    Computes speech metrics for every recording of a session in one pass.
+
+    The segment timings of all recordings are concatenated into flat arrays
+    tagged with their recording index, so gaps, pause statistics, histogram
+    counts and per-window word counts are array operations grouped with
+    bincount instead of a Python loop per segment. The pause figures match
+    AnalysisService._analyze_speech_timing, which the prompt used before.
+    """
+
+    def __init__(self, rate_windows: Optional[int] = None):
+        """
+        Args:
+            rate_windows: Equal parts of each answer the speaking rate is reported for.
+                          Defaults to settings.SPEECH_METRICS_RATE_WINDOWS.
+        """
+        self.rate_windows = max(1, rate_windows or settings.SPEECH_METRICS_RATE_WINDOWS)
+
+    def analyze_session(self, recordings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compute metrics for a session's recordings.
+
+        Args:
+            recordings: One recording_timings() or buffer_timings() dict per recording
+
+        Returns:
+            One metrics dict per recording, in order ({} for recordings without segments)
+        """
+        if not recordings:
+            return []
+
+        total = len(recordings)
+        lengths = np.array([len(recording["starts"]) for recording in recordings], dtype=np.int64)
+        starts = np.concatenate([np.asarray(recording["starts"], dtype=np.float64) for recording in recordings])
+        ends = np.concatenate([np.asarray(recording["ends"], dtype=np.float64) for recording in recordings])
+        words = np.concatenate([_recording_word_counts(recording) for recording in recordings])
+        owner = np.repeat(np.arange(total), lengths)
+        pauses = self.pause_statistics(starts, ends, lengths)
+
+        # Speaking rate per window: segments are placed by their midpoint within the answer's span
+        windows = self.rate_windows
+        nonempty = lengths > 0
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        first_start = np.zeros(total)
+        last_end = np.zeros(total)
+        first_start[nonempty] = np.minimum.reduceat(starts, offsets[nonempty]) if starts.size else 0
+        last_end[nonempty] = np.maximum.reduceat(ends, offsets[nonempty]) if ends.size else 0
+        span = last_end - first_start
+        window_seconds = span / windows
+        midpoints = (starts + ends) / 2 - first_start[owner]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            position = np.where(span[owner] > 0, midpoints / span[owner], 0.0)
+            window = np.clip((position * windows).astype(np.int64), 0, windows - 1)
+            window_words = np.bincount(owner * windows + window, weights=words,
+                                       minlength=total * windows).reshape(total, windows)
+            rate = np.where(window_seconds[:, None] > 0, window_words / (window_seconds[:, None] / 60), 0.0)
+
+        results = []
+        for i, recording in enumerate(recordings):
+            if not lengths[i]:
+                results.append({})
+                continue
+            counts = count_filler(recording.get("text") or "")
+            results.append({
+                "total_pauses": int(pauses["total_pauses"][i]),
+                "average_pause_duration": float(pauses["average_pause_duration"][i]),
+                "longest_pause": float(pauses["longest_pause"][i]),
+                "speaking_segments": int(lengths[i]),
+                "average_segment_duration": float(pauses["average_segment_duration"][i]),
+                "speech_continuity_score": float(pauses["speech_continuity_score"][i]),
+                "long_pauses": int(pauses["long_pauses"][i]),
+                "pause_histogram": [int(value) for value in pauses["pause_histogram"][i]],
+                "speaking_rate_over_time": [round(float(value), 1) for value in rate[i]],
+                "filler_words": counts["fillers"],
+                "filler_rate": round(100 * counts["fillers"] / counts["words"], 2) if counts["words"] else 0.0
+            })
+        return results
+
+    def pause_statistics(self, starts: np.ndarray, ends: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Pause and continuity figures for concatenated recordings, one array entry per recording.
+
+        Args:
+            starts: Segment start times of all recordings, recording after recording
+            ends: Segment end times, in the same order
+            lengths: Number of segments of each recording
+
+        Returns:
+            Arrays keyed like the _analyze_speech_timing figures, plus
+            long_pauses and pause_histogram (one row of bin counts per recording)
+        """
+        total = len(lengths)
+        owner = np.repeat(np.arange(total), lengths)
+        segment_time = np.bincount(owner, weights=ends - starts, minlength=total)
+
+        # Gaps to the next segment of the same recording
+        gaps = starts[1:] - ends[:-1]
+        is_pause = (owner[1:] == owner[:-1]) & (gaps > PAUSE_THRESHOLD_SECONDS)
+        pauses, pause_owner = gaps[is_pause], owner[:-1][is_pause]
+        pause_count = np.bincount(pause_owner, minlength=total)
+        pause_time = np.bincount(pause_owner, weights=pauses, minlength=total)
+        longest_pause = np.zeros(total)
+        np.maximum.at(longest_pause, pause_owner, pauses)
+        long_pauses = np.bincount(pause_owner[pauses > LONG_PAUSE_SECONDS], minlength=total)
+
+        bins = len(PAUSE_BIN_EDGES) + 1
+        pause_bin = np.searchsorted(np.array(PAUSE_BIN_EDGES), pauses, side="left")
+        histogram = np.bincount(pause_owner * bins + pause_bin, minlength=total * bins).reshape(total, bins)
+
+        # Continuity: share of the answer spent speaking, less half a point per long pause
+        spoken = segment_time + pause_time
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(spoken > 0, segment_time / spoken, 0.5)
+            average_pause = np.where(pause_count > 0, pause_time / pause_count, 0.0)
+            average_segment = np.where(lengths > 0, segment_time / np.maximum(lengths, 1), 0.0)
+        return {
+            "total_pauses": pause_count,
+            "average_pause_duration": average_pause,
+            "longest_pause": longest_pause,
+            "average_segment_duration": average_segment,
+            "speech_continuity_score": np.clip(ratio * 10 - long_pauses * 0.5, 0, 10),
+            "long_pauses": long_pauses,
+            "pause_histogram": histogram
+        }
+
+    def summarize(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Session totals of per-recording metrics: pauses, histogram, long pauses and fillers."""
+        analyzed = [entry for entry in metrics if entry]
+        if not analyzed:
+            return {}
+        histogram = np.sum([entry["pause_histogram"] for entry in analyzed], axis=0)
+        return {
+            "total_pauses": sum(entry["total_pauses"] for entry in analyzed),
+            "long_pauses": sum(entry["long_pauses"] for entry in analyzed),
+            "pause_histogram": [int(value) for value in histogram],
+            "filler_words": sum(entry["filler_words"] for entry in analyzed),
+            "average_continuity_score": round(float(np.mean([entry["speech_continuity_score"] for entry in analyzed])), 2)
+        }
+
+# Create singleton instance
+speech_metrics_engine = SpeechMetricsEngine()
@@ -0,0 +1,296 @@
+"""
+Usage Meter
+Persistent metering of LLM token usage: calls are buffered in memory and
+written in batches, together with daily per-tenant, per-model rollups
+"""
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, Set
+
+from sqlalchemy.exc import OperationalError, InterfaceError
+
+from app.core.config import settings
+from app.core.database.db import SessionLocal
+from app.core.database.models import LLMUsage, LLMUsageDaily
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Errors that mean the database could not be reached; the rows are kept for the next flush
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, ConnectionError)
+
+# Who an LLM call is made for; set around an analysis and inherited by the tasks it starts
+_usage_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("llm_usage_context", default={})
+
+@contextmanager
+def usage_context(**attribution):
+    """
+    Attribute LLM calls made inside the block.
+
+    Args:
+        **attribution: user_id (tenant), session_id and/or purpose
+    """
+    token = _usage_context.set({**_usage_context.get(), **attribution})
+    try:
+        yield
+    finally:
+        _usage_context.reset(token)
+
+class UsageMeter:
+    """
+    Buffered writer for the llm_usage and llm_usage_daily tables.
+
+    record() only appends to an in-memory buffer, so metering adds no
+    database work to the analysis path. The buffer is flushed every
+    USAGE_METER_FLUSH_SECONDS by a background task, or sooner once it holds
+    USAGE_METER_BATCH_SIZE calls. A flush inserts the raw rows in one batch
+    and adds their totals to the daily rollups with an upsert, so every
+    worker can flush into the same rollup rows. When the database cannot be
+    reached, the rows go back into the buffer; past USAGE_METER_MAX_BUFFER
+    the oldest are dropped and counted. When the batch is rejected for any
+    other reason (e.g. an integrity or data error), rows are written one by
+    one and those that still fail are dropped and counted as rejected.
+    """
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: Creates database sessions. Defaults to SessionLocal.
+        """
+        self._session_factory = session_factory or SessionLocal
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending_flushes: Set[asyncio.Task] = set()
+        self._stats = {
+            "recorded": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "flush_failures": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "last_flush_seconds": 0.0
+        }
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, cost: float,
+               user_id: Optional[int] = None, session_id: Optional[int] = None, purpose: Optional[str] = None) -> None:
+        """
+        Buffer one LLM call. Attribution not given is taken from usage_context().
+
+        Args:
+            model: Model that served the call
+            prompt_tokens: Prompt tokens billed
+            completion_tokens: Completion tokens billed
+            cost: Estimated cost in USD
+            user_id: Tenant (interviewer) the call was made for
+            session_id: Candidate session the call was made for
+            purpose: What the call was for
+        """
+        if not settings.USAGE_METER_ENABLED:
+            return
+
+        context = _usage_context.get()
+        row = {
+            "created_at": datetime.now(timezone.utc),
+            "user_id": user_id if user_id is not None else context.get("user_id"),
+            "session_id": session_id if session_id is not None else context.get("session_id"),
+            "model": model,
+            "purpose": purpose or context.get("purpose"),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "cost": cost
+        }
+        with self._lock:
+            self._buffer.append(row)
+            self._stats["recorded"] += 1
+            overflow = len(self._buffer) - settings.USAGE_METER_MAX_BUFFER
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._stats["dropped"] += overflow
+            full = len(self._buffer) >= settings.USAGE_METER_BATCH_SIZE
+
+        if full:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                # No loop in this thread; the periodic flush will pick the rows up
+                return
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
+
+    async def flush(self) -> int:
+        """
+        Write the buffered calls and update the rollups, off the event loop.
+
+        Concurrent flushes take disjoint rows from the buffer and the rollup
+        upsert is atomic, so they need no coordination.
+
+        Returns:
+            Number of calls written
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            return await asyncio.to_thread(self.write, rows)
+        except _TRANSIENT_ERRORS as e:
+            self._requeue(rows, e)
+            return 0
+        except Exception as e:
+            # Retrying the batch would fail the same way; find the bad rows instead
+            logger.warning(f"LLM usage batch of {len(rows)} rejected, writing records one by one: {str(e)}")
+            return await asyncio.to_thread(self._write_each, rows)
+
+    def _write_each(self, rows: List[Dict[str, Any]]) -> int:
+        """Write rows one at a time, dropping those the database rejects (blocking)."""
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                written += self.write([row])
+            except _TRANSIENT_ERRORS as e:
+                self._requeue(rows[index:], e)
+                break
+            except Exception as e:
+                with self._lock:
+                    self._stats["rejected"] += 1
+                logger.error(f"Dropped LLM usage record for {row.get('model')} at {row.get('created_at')}: {str(e)}")
+        return written
+
+    def _requeue(self, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Put rows back at the front of the buffer for the next flush."""
+        with self._lock:
+            self._buffer[:0] = rows
+            self._stats["flush_failures"] += 1
+        logger.error(f"Failed to flush {len(rows)} LLM usage record(s), will retry: {str(error)}")
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert usage rows and add them to the daily rollups in one transaction (blocking)."""
+        start_time = time.perf_counter()
+        db = self._session_factory()
+        try:
+            db.bulk_insert_mappings(LLMUsage, rows)
+            self._upsert_rollups(db, self._aggregate(rows))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._stats["flushed"] += len(rows)
+            self._stats["flushes"] += 1
+            self._stats["last_flush_seconds"] = time.perf_counter() - start_time
+        return len(rows)
+
+    def _aggregate(self, rows: List[Dict[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+        totals: Dict[Tuple, Dict[str, Any]] = {}
+        for row in rows:
+            key = (row["created_at"].date(), row["user_id"] or 0, row["model"])
+            total = totals.setdefault(key, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                            "total_tokens": 0, "cost": 0.0})
+            total["calls"] += 1
+            for column in ("prompt_tokens", "completion_tokens", "total_tokens", "cost"):
+                total[column] += row[column]
+        return totals
+
+    def _upsert_rollups(self, db, totals: Dict[Tuple, Dict[str, Any]]) -> None:
+        """Add totals to llm_usage_daily, inserting rows for new (day, tenant, model) keys."""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        now = datetime.now(timezone.utc)
+        for (day, user_id, model), total in totals.items():
+            if insert is not None:
+                statement = insert(LLMUsageDaily).values(day=day, user_id=user_id, model=model, updated_at=now, **total)
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=["day", "user_id", "model"],
+                    set_={**{column: getattr(LLMUsageDaily, column) + statement.excluded[column] for column in total},
+                          "updated_at": now}
+                ))
+                continue
+
+            rollup = db.query(LLMUsageDaily).filter_by(day=day, user_id=user_id, model=model).with_for_update().first()
+            if rollup is None:
+                db.add(LLMUsageDaily(day=day, user_id=user_id, model=model, updated_at=now, **total))
+            else:
+                for column, value in total.items():
+                    setattr(rollup, column, getattr(rollup, column) + value)
+                rollup.updated_at = now
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.USAGE_METER_FLUSH_SECONDS)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start periodic flushing on the running event loop."""
+        if settings.USAGE_METER_ENABLED and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("LLM usage meter started")
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and write what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def daily_rollups(self, db, start_day=None, end_day=None, user_id: Optional[int] = None,
+                      model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Read the pre-aggregated daily usage, newest day first.
+
+        Args:
+            db: Database session
+            start_day: First day included
+            end_day: Last day included
+            user_id: Only this tenant (0 for calls without one)
+            model: Only this model
+
+        Returns:
+            One row per day, tenant and model
+        """
+        query = db.query(LLMUsageDaily)
+        if start_day:
+            query = query.filter(LLMUsageDaily.day >= start_day)
+        if end_day:
+            query = query.filter(LLMUsageDaily.day <= end_day)
+        if user_id is not None:
+            query = query.filter(LLMUsageDaily.user_id == user_id)
+        if model:
+            query = query.filter(LLMUsageDaily.model == model)
+        return [{
+            "day": rollup.day.isoformat(),
+            "user_id": rollup.user_id or None,
+            "model": rollup.model,
+            "calls": rollup.calls,
+            "prompt_tokens": rollup.prompt_tokens,
+            "completion_tokens": rollup.completion_tokens,
+            "total_tokens": rollup.total_tokens,
+            "cost": round(rollup.cost, 6)
+        } for rollup in query.order_by(LLMUsageDaily.day.desc(), LLMUsageDaily.user_id, LLMUsageDaily.model)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer and flush counters."""
+        return {
+            "enabled": settings.USAGE_METER_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "buffered": len(self._buffer),
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in self._stats.items()}
+        }
+
+# Create singleton instance
+usage_meter = UsageMeter()
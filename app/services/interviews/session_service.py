@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 from fastapi import HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database.models import Token, CandidateSession, Recording, Question
 
 # Configure logging
@@ -129,6 +130,10 @@ class SessionService:
         """
         Trigger batch transcription and analysis for all recordings in a session.
         
+        With settings.TRANSCRIBE_ON_UPLOAD the recordings were queued for
+        transcription as they were uploaded, so only the session-level
+        analysis (plus any transcription still outstanding) is left to do.
+        
         Args:
             session_id: ID of the completed session
             background_tasks: FastAPI background tasks
@@ -136,10 +141,10 @@ class SessionService:
         """
         try:
             # Get all recordings for this session
-            recordings = db.query(Recording).filter(
-                Recording.session_id == session_id,
-                Recording.transcription_status == "pending"
-            ).all()
+            query = db.query(Recording).filter(Recording.session_id == session_id)
+            if not settings.TRANSCRIBE_ON_UPLOAD:
+                query = query.filter(Recording.transcription_status == "pending")
+            recordings = query.all()
             
             if not recordings:
                 logger.info(f"No pending recordings found for session {session_id}")
@@ -163,7 +168,7 @@ class SessionService:
         """        # Create a new database session for background processing
         from app.core.database.db import SessionLocal
         from app.services.analysis.analysis_service import AnalysisService
-        from app.services.transcription.transcription_service import TranscriptionService
+        from app.services.transcription.transcription_service import transcription_service
         
         db = SessionLocal()
         
@@ -171,72 +176,43 @@ class SessionService:
             logger.info(f"Starting batch processing for session {session_id} with {len(recording_ids)} recordings")
             
             # Initialize services for batch processing
-            transcription_service = TranscriptionService()
             analysis_service = AnalysisService()
             
-            transcripts = []
-            questions = []
+            pending_ids = recording_ids
+            if settings.TRANSCRIBE_ON_UPLOAD:
+                # Answers were transcribed during the interview, possibly by other workers;
+                # wait for the ones still running and redo the rest (failed, or left behind)
+                pending_ids = await transcription_service.wait_for_transcriptions(recording_ids, db)
+            
+            # Transcribe the recordings in the inference pool with bounded concurrency;
+            # each task stores the transcript JSON and status using its own DB session
+            transcription_results = await transcription_service.transcribe_recordings(pending_ids)
+            db.expire_all()
             
-            # Process each recording for transcription first
+            completed = 0
             for recording_id in recording_ids:
                 recording = db.query(Recording).filter(Recording.id == recording_id).first()
                 if not recording:
                     continue
-                  # Transcribe the recording
-                try:
-                    transcription_result = transcription_service.transcribe_file(recording.file_path)
-                    
-                    if "error" not in transcription_result:
-                        recording.transcript = transcription_result.get("text", "")
-                        recording.transcription_status = "completed"
-                        transcripts.append(recording.transcript)
-                        
-                        # Get question text for context
-                        question = db.query(Question).filter(Question.id == recording.question_id).first()
-                        questions.append(question.text if question else "")
-                        
-                    else:
-                        recording.transcription_status = "failed"
-                        recording.transcription_error = transcription_result.get("error", "Unknown error")
-                        
-                    db.add(recording)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to transcribe recording {recording_id}: {e}")
+                
+                result = transcription_results.get(recording_id)
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to transcribe recording {recording_id}: {result}")
                     recording.transcription_status = "failed"
-                    recording.transcription_error = str(e)[:500]
+                    recording.transcription_error = str(result)[:500]
                     db.add(recording)
+                elif recording.transcription_status == "completed":
+                    completed += 1
             
             db.commit()
-              # Perform comprehensive session analysis if we have transcripts
-            if transcripts:
+            
+            # Perform comprehensive session analysis over all completed transcripts
+            if completed:
                 try:
-                    # Prepare recordings data for comprehensive session analysis
-                    recordings_data = []
-                    for i, recording_id in enumerate(recording_ids):
-                        recording = db.query(Recording).filter(Recording.id == recording_id).first()
-                        if recording and recording.transcription_status == "completed":
-                            question = db.query(Question).filter(Question.id == recording.question_id).first()
-                            recordings_data.append({
-                                'file_path': recording.file_path,
-                                'question_text': question.text if question else f"Question {i+1}",
-                                'recording_id': recording.id                            })
+                    session_analysis = await analysis_service.analyze_session_transcripts(session_id, db)
                     
-                    if recordings_data:
-                        # Use analysis service for session processing
-                        session_context = {
-                            "session_id": session_id,
-                            "analysis_type": "session_completion_batch"
-                        }
-                        
-                        # Process session analysis using the analysis service
-                        session_analysis = analysis_service.analyze_session_batch(
-                            recordings_data=recordings_data,
-                            context=session_context
-                        )
-                        
-                        logger.info(f"Comprehensive session analysis completed for session {session_id}")
-                        logger.debug(f"Session analysis result: {session_analysis.get('status', 'unknown')}")
+                    logger.info(f"Comprehensive session analysis completed for session {session_id}")
+                    logger.debug(f"Session analysis result: {session_analysis.get('status', 'unknown')}")
                     
                 except Exception as e:
                     logger.error(f"Failed to perform comprehensive session analysis for session {session_id}: {e}")
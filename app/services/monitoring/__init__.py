@@ -3,5 +3,6 @@ Monitoring services package for system health checks and performance monitoring.
 """
 
 from app.services.monitoring.health_check_service import HealthCheckService
+from app.services.monitoring.loop_lag_monitor import LoopLagMonitor, loop_lag_monitor
 
-__all__ = ["HealthCheckService"]
\ No newline at end of file
+__all__ = ["HealthCheckService", "LoopLagMonitor", "loop_lag_monitor"]
\ No newline at end of file
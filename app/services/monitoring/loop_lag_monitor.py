@@ -0,0 +1,74 @@
+"""
+Event loop lag monitor.
+Measures how late the event loop wakes up a periodic timer, which shows whether
+blocking work (e.g. inline Whisper inference) is stalling the web path.
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class LoopLagMonitor:
+    """Periodically samples event loop scheduling lag."""
+
+    def __init__(self, interval: float = 0.5, window: int = 240, warn_threshold: float = 0.5):
+        """
+        Args:
+            interval: Seconds between samples
+            window: Number of recent samples kept for percentiles
+            warn_threshold: Lag in seconds above which a warning is logged
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._samples = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        """Sleep for the interval and record how late the wake-up was."""
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            if lag > self.warn_threshold:
+                logger.warning(f"Event loop lag of {lag:.3f}s detected")
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Event loop lag monitor started")
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lag statistics in milliseconds over the recent window."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"running": self._task is not None, "samples": 0}
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 2)
+
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1] * 1000, 2),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": round(samples[-1] * 1000, 2),
+            "max_since_start_ms": round(self._max_lag * 1000, 2)
+        }
+
+# Create singleton instance
+loop_lag_monitor = LoopLagMonitor()
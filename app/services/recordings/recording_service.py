@@ -10,9 +10,11 @@ from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database.models import Recording, CandidateSession, Question
+from app.core.database.models import Recording, CandidateSession, Question, Token, Interview
 from app.services.storage.storage_factory import get_storage
 from app.services.transcription import transcription_service
+from app.services.transcription.live_transcriber import live_transcriber, LiveStream
+from app.utils.file_utils import get_file_hash
 
 logger = logging.getLogger(__name__)
 
@@ -29,16 +31,22 @@ class RecordingService:
         question_id: int, 
         file_content: bytes, 
         file_extension: str, 
-        db: Session
+        db: Session,
+        stream_id: Optional[str] = None
     ) -> Recording:
-        """Upload recording to S3 and save metadata to database."""
+        """
+        Upload recording to S3 and save metadata to database.
+        
+        With a stream_id, the answer's live stream is claimed if this worker
+        holds it, and its transcript is stored on the recording when the
+        uploaded bytes match what was streamed. Otherwise the upload is
+        transcribed as usual (a finished stream's transcript is still found
+        in the transcript cache by content hash).
+        """
+        stream = None
         try:
             # Find session by token
-            session = db.query(CandidateSession).filter(
-                CandidateSession.session_token == token,
-                CandidateSession.is_active == True
-            ).first()
-            
+            session = self._get_active_session(token, db)
             if not session:
                 raise ValueError(f"No active session found for token: {token}")
             
@@ -46,7 +54,13 @@ class RecordingService:
             question = db.query(Question).filter(Question.id == question_id).first()
             if not question:
                 raise ValueError(f"Question {question_id} not found")
-              # Generate unique filename prefix
+            
+            if stream_id:
+                stream = await live_transcriber.claim(stream_id, session.id, question_id)
+                if stream is None:
+                    logger.info(f"Live stream {stream_id} is not held by this worker; transcribing the upload")
+            
+            # Generate unique filename prefix
             prefix = f"session_{session.id}_question_{question_id}"
             
             # Upload to storage using the storage adapter interface
@@ -57,9 +71,10 @@ class RecordingService:
                 session_id=session.id,
                 question_id=question_id,
                 file_path=file_path,
-                file_size=len(file_content),
+                content_hash=get_file_hash(file_content),
                 storage_type="s3" if settings.should_use_s3 else "local",
-                transcription_status="pending",
+                transcription_status="queued" if settings.TRANSCRIBE_ON_UPLOAD else "pending",
+                transcription_heartbeat_at=datetime.now(timezone.utc) if settings.TRANSCRIBE_ON_UPLOAD else None,
                 created_at=datetime.now(timezone.utc)
             )
             
@@ -68,12 +83,59 @@ class RecordingService:
             db.refresh(recording)
             
             logger.info(f"Recording saved successfully: {recording.id} for session {session.id}")
+            
+            if stream is not None and stream.transcript_data and stream.content_hash == recording.content_hash:
+                # Transcribed while the candidate was recording
+                transcription_service.store_transcript(recording, stream.transcript_data, db)
+                logger.info(f"Reused live transcript of stream {stream.stream_id} for recording {recording.id}")
+            elif settings.TRANSCRIBE_ON_UPLOAD:
+                # Transcribe while the candidate answers the remaining questions
+                transcription_service.enqueue_recording(recording.id)
             return recording
             
         except Exception as e:
             logger.error(f"Error saving recording for token {token}: {str(e)}")
             db.rollback()
             raise
+        finally:
+            if stream is not None:
+                live_transcriber.discard(stream)
+    
+    async def open_live_stream(self, token: str, question_id: int, file_extension: str, db: Session) -> LiveStream:
+        """
+        Start live transcription of an answer that is still being recorded.
+        
+        Args:
+            token: Token used to start the session
+            question_id: ID of the question being answered
+            file_extension: Container of the streamed audio (e.g. ".webm")
+            db: Database session
+            
+        Returns:
+            The live stream to append audio chunks to
+        """
+        session = self._get_active_session(token, db)
+        if not session:
+            raise ValueError(f"No active session found for token: {token}")
+        
+        question = db.query(Question).filter(
+            Question.id == question_id,
+            Question.interview_id == session.token.interview_id
+        ).first()
+        if not question:
+            raise ValueError(f"Question {question_id} not found")
+        
+        # A pinned interview language lets every pass skip language detection
+        interview = db.query(Interview).filter(Interview.id == session.token.interview_id).first()
+        return live_transcriber.open(session.id, question_id, file_extension,
+                                     interview.language if interview else None)
+    
+    def _get_active_session(self, token: str, db: Session) -> Optional[CandidateSession]:
+        """Latest unfinished session started with a token."""
+        return db.query(CandidateSession).join(Token, CandidateSession.token_id == Token.id).filter(
+            Token.token_value == token,
+            CandidateSession.end_time.is_(None)
+        ).order_by(CandidateSession.id.desc()).first()
     
     # SECTION 2: Transcription Operations  
     async def transcribe_recording(self, recording_id: int, db: Session) -> bool:
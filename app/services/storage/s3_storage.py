@@ -4,6 +4,8 @@ This module provides a complete S3 storage solution for the interview app.
 """
 from datetime import datetime
 from typing import BinaryIO, List, Optional, Tuple, Dict, Any
+import asyncio
+import hashlib
 import logging
 import uuid
 import boto3
@@ -173,6 +175,47 @@ class S3Storage(StorageAdapter):
             logger.error(f"Failed to download file from S3: {e}")
             raise
     
+    async def download_to_file(self, key: str, destination: BinaryIO, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stream a file from S3 into an open binary file.
+        
+        The body is read in fixed-size chunks (in a worker thread), so memory
+        use does not grow with the size of the file. The SHA-256 of the
+        content is computed on the way through.
+        
+        Args:
+            key: The S3 key (path) of the file
+            destination: Binary file object to write to
+            chunk_size: Bytes read per chunk. Defaults to settings.S3_DOWNLOAD_CHUNK_BYTES.
+            
+        Returns:
+            Dictionary with the number of bytes written and their sha256 hex digest
+        """
+        chunk_size = chunk_size or settings.S3_DOWNLOAD_CHUNK_BYTES
+        
+        def _stream() -> Dict[str, Any]:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=key
+            )
+            body = response['Body']
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                for chunk in body.iter_chunks(chunk_size):
+                    destination.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            finally:
+                body.close()
+            return {"bytes": size, "sha256": digest.hexdigest()}
+        
+        try:
+            return await asyncio.to_thread(_stream)
+        except ClientError as e:
+            logger.error(f"Failed to download file from S3: {e}")
+            raise
+    
     def get_file_info(self, key: str) -> Optional[Dict[str, Any]]:
         """
         Get file metadata from S3.
@@ -1,9 +1,21 @@
 """
 Transcription services for local Whisper processing and OpenAI analysis.
 """
-from app.services.transcription.transcription_service import TranscriptionService
+from app.services.transcription.transcription_service import TranscriptionService, transcription_service
+from app.services.transcription.model_registry import WhisperModelRegistry, whisper_model_registry
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory, get_transcription_backends
+from app.services.transcription.compact_transcript import CompactTranscript, encode_transcript, decode_transcript
 
-# Create singleton instance
-transcription_service = TranscriptionService()
-
-__all__ = ["TranscriptionService", "transcription_service"]
\ No newline at end of file
+__all__ = [
+    "TranscriptionService",
+    "transcription_service",
+    "WhisperModelRegistry",
+    "whisper_model_registry",
+    "TranscriptionBackend",
+    "TranscriptionBackendFactory",
+    "get_transcription_backends",
+    "CompactTranscript",
+    "encode_transcript",
+    "decode_transcript"
+]
@@ -0,0 +1,259 @@
+"""
+Audio Preprocessor
+Decodes each recording once into 16 kHz mono PCM and caches it on local disk by content hash
+"""
+import os
+import time
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.file_utils import get_file_hash_from_path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Whisper (and every other backend) expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+@dataclass
+class NormalizedAudio:
+    """A recording decoded to cached 16 kHz mono signed 16-bit PCM."""
+    pcm_path: str
+    content_hash: str
+    duration: float
+    decode_seconds: float
+    cache_hit: bool
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """Metadata stored alongside the transcript."""
+        return {
+            "content_hash": self.content_hash,
+            "audio_duration": round(self.duration, 3),
+            "decode_seconds": round(self.decode_seconds, 3),
+            "decode_cache_hit": self.cache_hit
+        }
+
+def load_pcm(pcm_path: str, start_sample: int = 0, end_sample: Optional[int] = None) -> np.ndarray:
+    """
+    Load cached PCM as the float32 array in [-1, 1] that Whisper accepts.
+
+    Args:
+        pcm_path: Path to a raw s16le mono 16 kHz file
+        start_sample: First sample to load
+        end_sample: Sample to stop at (exclusive). Defaults to the end of the file.
+
+    Returns:
+        Float32 audio samples
+    """
+    count = -1 if end_sample is None else max(0, end_sample - start_sample)
+    samples = np.fromfile(pcm_path, dtype=np.int16, count=count, offset=2 * start_sample)
+    return samples.astype(np.float32) / 32768.0
+
+class StreamDecoder:
+    """
+    One ffmpeg process decoding a recording while its bytes are still arriving.
+
+    Bytes written are piped to ffmpeg, which appends 16 kHz mono PCM to
+    pcm_path as it goes, so a growing recording is decoded once instead of
+    from the start on every read.
+    """
+
+    def __init__(self, pcm_path: str):
+        import ffmpeg
+
+        self.pcm_path = pcm_path
+        self._process = (
+            ffmpeg
+            .input("pipe:0")
+            .output(pcm_path, format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+            .global_args("-loglevel", "error")
+            .overwrite_output()
+            .run_async(pipe_stdin=True)
+        )
+
+    @property
+    def decoded_samples(self) -> int:
+        """Samples written to pcm_path so far."""
+        try:
+            return os.path.getsize(self.pcm_path) // 2
+        except FileNotFoundError:
+            return 0
+
+    def write(self, data: bytes) -> None:
+        """Feed received bytes to the decoder (blocks while ffmpeg catches up)."""
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+
+    def close(self, timeout: float = 120.0) -> None:
+        """
+        Signal the end of the recording and wait for the last PCM to be written.
+
+        Raises:
+            RuntimeError: If ffmpeg could not decode the stream
+        """
+        if not self._process.stdin.closed:
+            self._process.stdin.close()
+        returncode = self._process.wait(timeout=timeout)
+        if returncode != 0:
+            raise RuntimeError(f"Streaming audio decode failed with exit code {returncode}")
+
+    def abort(self) -> None:
+        """Stop the decoder without waiting for it."""
+        if self._process.poll() is None:
+            self._process.kill()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+
+class AudioPreprocessor:
+    """
+    Decode-once audio normalization stage.
+
+    The first request for a recording decodes it with ffmpeg; retries,
+    re-analysis and re-uploads of identical bytes reuse the cached PCM.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for cached PCM files. Defaults to settings.AUDIO_CACHE_DIR.
+        """
+        self.cache_dir = cache_dir or settings.AUDIO_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}.pcm")
+
+    def normalize(self, source_path: str, content_hash: Optional[str] = None) -> NormalizedAudio:
+        """
+        Get 16 kHz mono PCM for a recording, decoding it only on a cache miss.
+
+        Args:
+            source_path: Local path of the uploaded webm/mp4/audio file
+            content_hash: SHA-256 of the file, if the caller already computed it
+
+        Returns:
+            NormalizedAudio describing the cached PCM file
+        """
+        content_hash = content_hash or get_file_hash_from_path(source_path)
+        pcm_path = self._cache_path(content_hash)
+
+        if os.path.exists(pcm_path):
+            # Touch the file so age-based cleanup keeps recently used entries
+            os.utime(pcm_path, None)
+            return NormalizedAudio(
+                pcm_path=pcm_path,
+                content_hash=content_hash,
+                duration=self._duration(pcm_path),
+                decode_seconds=0.0,
+                cache_hit=True
+            )
+
+        start_time = time.perf_counter()
+        self._decode(source_path, pcm_path)
+        decode_seconds = time.perf_counter() - start_time
+
+        duration = self._duration(pcm_path)
+        logger.info(f"Decoded {os.path.basename(source_path)} to 16 kHz PCM in {decode_seconds:.2f}s "
+                    f"({duration:.1f}s of audio)")
+        return NormalizedAudio(
+            pcm_path=pcm_path,
+            content_hash=content_hash,
+            duration=duration,
+            decode_seconds=decode_seconds,
+            cache_hit=False
+        )
+
+    def _decode(self, source_path: str, pcm_path: str) -> None:
+        """Decode a media file to raw s16le PCM, publishing it atomically."""
+        import ffmpeg
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".pcm.part", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            (
+                ffmpeg
+                .input(source_path)
+                .output(tmp_path, format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+                .overwrite_output()
+                .run(quiet=True)
+            )
+            os.replace(tmp_path, pcm_path)
+        except ffmpeg.Error as e:
+            stderr = e.stderr.decode(errors="ignore")[-500:] if e.stderr else str(e)
+            raise RuntimeError(f"Audio decode failed: {stderr}") from e
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def stream_decoder(self, pcm_path: str) -> StreamDecoder:
+        """Start decoding a recording that is still being received into pcm_path."""
+        return StreamDecoder(pcm_path)
+
+    def adopt(self, pcm_path: str, content_hash: str, decode_seconds: float = 0.0) -> NormalizedAudio:
+        """
+        Move PCM decoded elsewhere (e.g. by a StreamDecoder) into the cache.
+
+        pcm_path must be in the cache directory so the move is atomic. If the
+        recording is already cached, pcm_path is removed and the cached copy used.
+
+        Args:
+            pcm_path: Raw s16le mono 16 kHz file of the complete recording
+            content_hash: SHA-256 of the recording's bytes
+            decode_seconds: Time spent decoding, for the metadata
+
+        Returns:
+            NormalizedAudio describing the cached PCM file
+        """
+        cache_path = self._cache_path(content_hash)
+        cache_hit = os.path.exists(cache_path)
+        if cache_hit:
+            os.unlink(pcm_path)
+            os.utime(cache_path, None)
+        else:
+            os.replace(pcm_path, cache_path)
+        return NormalizedAudio(
+            pcm_path=cache_path,
+            content_hash=content_hash,
+            duration=self._duration(cache_path),
+            decode_seconds=decode_seconds,
+            cache_hit=cache_hit
+        )
+
+    @staticmethod
+    def _duration(pcm_path: str) -> float:
+        """Duration in seconds of an s16le mono 16 kHz file."""
+        return os.path.getsize(pcm_path) / (2 * SAMPLE_RATE)
+
+    def cleanup(self, max_age_hours: Optional[float] = None) -> int:
+        """
+        Remove cached PCM files not used within max_age_hours.
+
+        Args:
+            max_age_hours: Age limit. Defaults to settings.AUDIO_CACHE_MAX_AGE_HOURS.
+
+        Returns:
+            Number of files removed
+        """
+        max_age_hours = max_age_hours if max_age_hours is not None else settings.AUDIO_CACHE_MAX_AGE_HOURS
+        cutoff = time.time() - max_age_hours * 3600
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Failed to remove cached audio {path}: {e}")
+        return removed
+
+# Create singleton instance
+audio_preprocessor = AudioPreprocessor()
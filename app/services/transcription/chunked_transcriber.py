@@ -0,0 +1,253 @@
+"""
+Chunked Transcriber
+Splits long recordings at silence boundaries, transcribes the chunks in parallel
+and records each finished chunk so a retry resumes where the last attempt stopped
+"""
+import io
+import wave
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import SAMPLE_RATE
+from app.services.transcription.vad import frame_levels_db, speech_threshold, _runs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# OpenAI's transcription endpoint rejects uploads larger than 25 MB
+OPENAI_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+WAV_HEADER_BYTES = 44
+
+@dataclass
+class AudioChunk:
+    """A [start, end) sample range of a cached PCM recording."""
+    index: int
+    start_sample: int
+    end_sample: int
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def start(self) -> float:
+        return self.start_sample / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end_sample - self.start_sample) / self.sample_rate
+
+def max_chunk_seconds_for_bytes(byte_limit: int, sample_rate: int = SAMPLE_RATE) -> float:
+    """Longest chunk whose 16-bit mono WAV encoding fits within byte_limit."""
+    return (byte_limit - WAV_HEADER_BYTES) / (2 * sample_rate)
+
+def encode_wav(pcm_path: str, chunk: AudioChunk) -> bytes:
+    """
+    Encode one chunk of cached PCM as WAV for upload to a remote transcription API.
+
+    Args:
+        pcm_path: Path to a raw s16le mono 16 kHz file
+        chunk: Sample range to encode
+
+    Returns:
+        WAV file bytes
+    """
+    samples = np.fromfile(pcm_path, dtype=np.int16, count=chunk.end_sample - chunk.start_sample,
+                          offset=2 * chunk.start_sample)
+    return encode_wav_samples(samples, chunk.sample_rate)
+
+def encode_wav_samples(samples: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Encode mono samples as 16-bit WAV.
+
+    Args:
+        samples: int16 samples, or float samples in [-1, 1] (e.g. from load_pcm)
+        sample_rate: Sample rate of the samples
+
+    Returns:
+        WAV file bytes
+    """
+    if samples.dtype != np.int16:
+        samples = np.clip(np.round(samples * 32768.0), -32768, 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def plan_chunks(pcm_path: str, target_seconds: Optional[float] = None, max_seconds: Optional[float] = None,
+                min_gap_seconds: float = 0.3, frame_ms: int = 30) -> List[AudioChunk]:
+    """
+    Split cached PCM into chunks, cutting in the middle of silent gaps.
+
+    Each cut is the silence midpoint closest to target_seconds into the chunk;
+    only when a stretch of max_seconds has no usable gap is the audio cut hard.
+    The file is memory-mapped, so planning an hour-long recording stays cheap.
+
+    Args:
+        pcm_path: Path to a raw s16le mono 16 kHz file
+        target_seconds: Preferred chunk length. Defaults to settings.TRANSCRIPTION_CHUNK_SECONDS.
+        max_seconds: Hard chunk length limit. Defaults to settings.TRANSCRIPTION_CHUNK_MAX_SECONDS.
+        min_gap_seconds: Shortest silence that may be cut in
+        frame_ms: Analysis frame length in milliseconds
+
+    Returns:
+        Chunks covering the whole recording in order
+    """
+    max_seconds = max_seconds or settings.TRANSCRIPTION_CHUNK_MAX_SECONDS
+    target_seconds = min(target_seconds or settings.TRANSCRIPTION_CHUNK_SECONDS, max_seconds)
+
+    samples = np.memmap(pcm_path, dtype=np.int16, mode="r")
+    total = len(samples)
+    max_len = int(max_seconds * SAMPLE_RATE)
+    if total <= max_len:
+        return [AudioChunk(0, 0, total)]
+
+    frame_len = int(SAMPLE_RATE * frame_ms / 1000)
+    levels = frame_levels_db(samples, SAMPLE_RATE, frame_ms)
+    # Long answers can be almost all speech, so take the noise floor from the quietest frames
+    silent_starts, silent_ends = _runs(levels <= speech_threshold(levels, noise_percentile=1.0))
+    usable = (silent_ends - silent_starts) * frame_len >= min_gap_seconds * SAMPLE_RATE
+    cut_points = ((silent_starts[usable] + silent_ends[usable]) // 2) * frame_len
+
+    target_len = int(target_seconds * SAMPLE_RATE)
+    min_len = target_len // 2
+    chunks = []
+    cursor = 0
+    while total - cursor > max_len:
+        lo = np.searchsorted(cut_points, cursor + min_len, side="right")
+        hi = np.searchsorted(cut_points, cursor + max_len, side="right")
+        candidates = cut_points[lo:hi]
+        if len(candidates):
+            cut = int(candidates[np.argmin(np.abs(candidates - (cursor + target_len)))])
+        else:
+            cut = cursor + max_len
+        chunks.append(AudioChunk(len(chunks), cursor, cut))
+        cursor = cut
+    chunks.append(AudioChunk(len(chunks), cursor, total))
+    return chunks
+
+def _shift_result(result: Dict[str, Any], chunk: AudioChunk) -> Dict[str, Any]:
+    """Keep what the merge needs from a chunk result, with timestamps on the recording timeline."""
+    offset = chunk.start
+    segments = result.get("segments", [])
+    for segment in segments:
+        for key in ("start", "end"):
+            if key in segment:
+                segment[key] = round(segment[key] + offset, 3)
+        for word in segment.get("words") or []:
+            for key in ("start", "end"):
+                if key in word:
+                    word[key] = round(word[key] + offset, 3)
+    return {
+        "text": result.get("text", ""),
+        "language": result.get("language"),
+        "segments": segments,
+        "inference_seconds": result.get("inference_seconds", 0.0),
+        "vad": result.get("vad")
+    }
+
+def merge_chunk_results(chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk results (in chunk order) into one transcription result.
+
+    Segment ids are renumbered, the language is the one most chunks detected,
+    and inference time and VAD statistics are summed across chunks.
+    """
+    segments = []
+    for chunk_result in chunk_results:
+        for segment in chunk_result["segments"]:
+            segment["id"] = len(segments)
+            segments.append(segment)
+
+    languages = Counter(r["language"] for r in chunk_results if r.get("language"))
+    vad_results = [r["vad"] for r in chunk_results if r.get("vad")]
+    vad = None
+    if vad_results:
+        original = sum(v["original_duration"] for v in vad_results)
+        trimmed = sum(v["trimmed_duration"] for v in vad_results)
+        vad = {
+            "original_duration": round(original, 3),
+            "trimmed_duration": round(trimmed, 3),
+            "skipped_percentage": round(100.0 * (1.0 - trimmed / original), 2) if original > 0 else 0.0,
+            "speech_regions": sum(v["speech_regions"] for v in vad_results)
+        }
+
+    return {
+        "text": " ".join(r["text"].strip() for r in chunk_results if r["text"].strip()),
+        "language": languages.most_common(1)[0][0] if languages else "unknown",
+        "segments": segments,
+        "inference_seconds": round(sum(r["inference_seconds"] or 0.0 for r in chunk_results), 3),
+        "vad": vad,
+        "chunks": len(chunk_results)
+    }
+
+class ChunkedTranscriber:
+    """
+    Transcribes long recordings chunk by chunk.
+
+    Chunks are submitted together, so the inference pool runs as many at once
+    as it allows. Progress is a JSON-serializable dict: the chunk plan, the key
+    it was made for, and the finished chunk results. It is handed to
+    on_progress after every chunk, so a crash loses at most the chunks that
+    were in flight, and a retry with the same key only runs the rest.
+    """
+
+    async def transcribe(self, pcm_path: str,
+                         transcribe_chunk: Callable[[AudioChunk], Awaitable[Dict[str, Any]]],
+                         plan_key: Dict[str, Any],
+                         progress: Optional[Dict[str, Any]] = None,
+                         on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                         max_chunk_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Transcribe cached PCM in chunks, resuming from earlier progress when it matches.
+
+        Args:
+            pcm_path: Path to a raw s16le mono 16 kHz file
+            transcribe_chunk: Coroutine function transcribing one chunk; timestamps relative to the chunk
+            plan_key: Identifies the audio and settings the plan belongs to (content hash, model, backend)
+            progress: Progress saved by an earlier attempt
+            on_progress: Coroutine function awaited with the updated progress after planning and after each
+                         finished chunk
+            max_chunk_seconds: Hard chunk length limit, e.g. from a backend's upload size cap
+
+        Returns:
+            Merged transcription result
+        """
+        if progress and progress.get("key") == plan_key:
+            chunks = [AudioChunk(i, start, end) for i, (start, end) in enumerate(progress["chunks"])]
+            logger.info(f"Resuming chunked transcription: {len(progress['completed'])}/{len(chunks)} chunks done")
+        else:
+            chunks = await asyncio.to_thread(plan_chunks, pcm_path, None, max_chunk_seconds)
+            progress = {
+                "key": plan_key,
+                "chunks": [[chunk.start_sample, chunk.end_sample] for chunk in chunks],
+                "completed": {}
+            }
+            if on_progress:
+                await on_progress(progress)
+            logger.info(f"Planned {len(chunks)} chunks of up to "
+                        f"{max(chunk.duration for chunk in chunks):.0f}s")
+
+        async def _run_chunk(chunk: AudioChunk) -> None:
+            result = await transcribe_chunk(chunk)
+            progress["completed"][str(chunk.index)] = _shift_result(result, chunk)
+            if on_progress:
+                await on_progress(progress)
+
+        pending = [chunk for chunk in chunks if str(chunk.index) not in progress["completed"]]
+        outcomes = await asyncio.gather(*[_run_chunk(chunk) for chunk in pending], return_exceptions=True)
+        # Every chunk that could finish has been recorded; now surface the first failure
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        return merge_chunk_results([progress["completed"][str(chunk.index)] for chunk in chunks])
+
+# Create singleton instance
+chunked_transcriber = ChunkedTranscriber()
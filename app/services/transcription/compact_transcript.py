@@ -0,0 +1,285 @@
+"""
+Compact Transcript
+Columnar encoding for stored transcripts: the text plus segment start/end
+times and text offsets in typed arrays (optionally word timestamps), instead
+of Whisper's full segment dicts with token IDs, temperatures and scores
+"""
+import sys
+import json
+import zlib
+import base64
+import struct
+import logging
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Marks a compact transcript in Recording.transcript; anything else is legacy JSON
+COMPACT_PREFIX = "ct1:"
+
+_HEADER_LENGTH = struct.Struct("<I")
+
+def _pack(values: array) -> bytes:
+    """Little-endian bytes of a typed array."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _unpack(typecode: str, buffer: memoryview, offset: int, count: int) -> Tuple[array, int]:
+    """Read count little-endian items at offset; returns the array and the next offset."""
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(buffer[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+def is_compact(raw: Optional[str]) -> bool:
+    """Whether a stored transcript uses the compact encoding."""
+    return bool(raw) and raw.startswith(COMPACT_PREFIX)
+
+class Word:
+    """A word timestamp."""
+    __slots__ = ("start", "end", "word")
+
+    def __init__(self, start: float, end: float, word: str):
+        self.start = start
+        self.end = end
+        self.word = word
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": round(self.start, 3), "end": round(self.end, 3), "word": self.word}
+
+class Segment:
+    """
+    A transcript segment.
+
+    Supports dict-style get() so code written against Whisper segment dicts
+    can read it unchanged.
+    """
+    __slots__ = ("id", "start", "end", "text", "words")
+
+    def __init__(self, id: int, start: float, end: float, text: str, words: Optional[List[Word]] = None):
+        self.id = id
+        self.start = start
+        self.end = end
+        self.text = text
+        self.words = words
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        segment = {"id": self.id, "start": round(self.start, 3), "end": round(self.end, 3), "text": self.text}
+        if self.words is not None:
+            segment["words"] = [word.to_dict() for word in self.words]
+        return segment
+
+class CompactTranscript:
+    """
+    A stored transcript, decoded lazily.
+
+    The header (text, language, duration, processing metadata) is read on
+    decode; the segment arrays are only unpacked when segments or timings
+    are first accessed.
+
+    Payload layout (little-endian, zlib-compressed, base64 in the Text column):
+        header length (uint32), header JSON,
+        segment starts (float32[n]), ends (float32[n]),
+        segment text offsets (uint32[n+1]) into the UTF-8 segment text,
+        and with word timestamps: word offsets per segment (uint32[n+1]),
+        word starts (float32[m]), ends (float32[m]),
+        word text offsets (uint32[m+1]) into the UTF-8 word text
+    """
+    __slots__ = ("text", "language", "duration", "processing", "_header", "_payload", "_segments", "_timings")
+
+    def __init__(self, text: str, language: str, duration: float, processing: Optional[Dict[str, Any]],
+                 header: Dict[str, Any], payload: bytes):
+        self.text = text
+        self.language = language
+        self.duration = duration
+        self.processing = processing
+        self._header = header
+        self._payload = memoryview(payload)
+        self._segments: Optional[List[Segment]] = None
+        self._timings: Optional[Tuple[array, array]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompactTranscript":
+        """
+        Build a compact transcript from a transcript dict.
+
+        Only start, end and text are kept per segment (plus start, end and
+        word per word timestamp when present); the rest of the Whisper
+        output is dropped.
+        """
+        segments = data.get("segments") or []
+        with_words = any(segment.get("words") for segment in segments)
+
+        starts, ends = array("f"), array("f")
+        text_offsets, segment_text = array("I", [0]), bytearray()
+        word_offsets, word_starts, word_ends = array("I", [0]), array("f"), array("f")
+        word_text_offsets, word_text = array("I", [0]), bytearray()
+        for segment in segments:
+            starts.append(segment.get("start", 0.0))
+            ends.append(segment.get("end", 0.0))
+            segment_text += (segment.get("text") or "").encode("utf-8")
+            text_offsets.append(len(segment_text))
+            if with_words:
+                for word in segment.get("words") or []:
+                    word_starts.append(word.get("start", 0.0))
+                    word_ends.append(word.get("end", 0.0))
+                    word_text += (word.get("word") or "").encode("utf-8")
+                    word_text_offsets.append(len(word_text))
+                word_offsets.append(len(word_starts))
+
+        parts = [_pack(starts), _pack(ends), _pack(text_offsets), bytes(segment_text)]
+        if with_words:
+            parts += [_pack(word_offsets), _pack(word_starts), _pack(word_ends), _pack(word_text_offsets), bytes(word_text)]
+
+        text = data.get("text") or ""
+        header = {
+            # The full text is usually just the joined segment text, so it is only stored when it differs
+            "text": None if text == segment_text.decode("utf-8").strip() else text,
+            "language": data.get("language", "unknown"),
+            "duration": data.get("duration", 0.0),
+            "processing": data.get("processing"),
+            "segments": len(segments),
+            "words": len(word_starts) if with_words else None,
+            "segment_text_bytes": len(segment_text),
+            "word_text_bytes": len(word_text)
+        }
+        return cls(text, header["language"], header["duration"], header["processing"], header, b"".join(parts))
+
+    @classmethod
+    def decode(cls, raw: str) -> "CompactTranscript":
+        """
+        Decode a stored transcript, compact, legacy JSON or legacy plain text.
+
+        Args:
+            raw: Value of Recording.transcript
+
+        Returns:
+            The transcript with its segment arrays not yet unpacked
+        """
+        if not is_compact(raw):
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            # Early session batches stored the bare transcript text, without segments
+            return cls.from_dict(data if isinstance(data, dict) else {"text": raw})
+
+        blob = zlib.decompress(base64.b64decode(raw[len(COMPACT_PREFIX):]))
+        (header_length,) = _HEADER_LENGTH.unpack_from(blob)
+        header_end = _HEADER_LENGTH.size + header_length
+        header = json.loads(blob[_HEADER_LENGTH.size:header_end].decode("utf-8"))
+        payload = memoryview(blob)[header_end:]
+
+        text = header["text"]
+        if text is None:
+            # Segment text sits right after the start/end/offset arrays
+            count = header["segments"]
+            text_start = 4 * (3 * count + 1)
+            text = bytes(payload[text_start:text_start + header["segment_text_bytes"]]).decode("utf-8").strip()
+        return cls(text, header["language"], header["duration"], header.get("processing"), header, payload)
+
+    def encode(self) -> str:
+        """Encode for storage in Recording.transcript."""
+        header = json.dumps(self._header, separators=(",", ":")).encode("utf-8")
+        blob = _HEADER_LENGTH.pack(len(header)) + header + bytes(self._payload)
+        return COMPACT_PREFIX + base64.b64encode(zlib.compress(blob, 9)).decode("ascii")
+
+    @property
+    def segment_count(self) -> int:
+        return self._header["segments"]
+
+    def timings(self) -> Tuple[array, array]:
+        """Segment start and end times as float32 arrays, without building segment objects."""
+        if self._timings is None:
+            count = self.segment_count
+            starts, offset = _unpack("f", self._payload, 0, count)
+            ends, _ = _unpack("f", self._payload, offset, count)
+            self._timings = (starts, ends)
+        return self._timings
+
+    def segment_text_buffer(self) -> Tuple[bytes, array]:
+        """UTF-8 text of all segments and the n+1 byte offsets where each starts and the last ends, undecoded."""
+        count = self.segment_count
+        text_offsets, offset = _unpack("I", self._payload, 8 * count, count + 1)
+        return bytes(self._payload[offset:offset + self._header["segment_text_bytes"]]), text_offsets
+
+    def segment_texts(self) -> List[str]:
+        """Text of each segment, without building segment objects or unpacking words."""
+        segment_text, text_offsets = self.segment_text_buffer()
+        return [segment_text[text_offsets[i]:text_offsets[i + 1]].decode("utf-8") for i in range(self.segment_count)]
+
+    @property
+    def segments(self) -> List[Segment]:
+        """Segments (with word timestamps if stored), unpacked on first access."""
+        if self._segments is None:
+            self._segments = self._unpack_segments()
+        return self._segments
+
+    def _unpack_segments(self) -> List[Segment]:
+        header, payload = self._header, self._payload
+        count = header["segments"]
+        starts, ends = self.timings()
+        offset = 8 * count
+        text_offsets, offset = _unpack("I", payload, offset, count + 1)
+        segment_text = bytes(payload[offset:offset + header["segment_text_bytes"]])
+        offset += header["segment_text_bytes"]
+
+        words = None
+        if header.get("words") is not None:
+            word_count = header["words"]
+            word_offsets, offset = _unpack("I", payload, offset, count + 1)
+            word_starts, offset = _unpack("f", payload, offset, word_count)
+            word_ends, offset = _unpack("f", payload, offset, word_count)
+            word_text_offsets, offset = _unpack("I", payload, offset, word_count + 1)
+            word_text = bytes(payload[offset:offset + header["word_text_bytes"]])
+            words = [
+                Word(word_starts[j], word_ends[j],
+                     word_text[word_text_offsets[j]:word_text_offsets[j + 1]].decode("utf-8"))
+                for j in range(word_count)
+            ]
+
+        segments = []
+        for i in range(count):
+            segment_words = words[word_offsets[i]:word_offsets[i + 1]] if words is not None else None
+            text = segment_text[text_offsets[i]:text_offsets[i + 1]].decode("utf-8")
+            segments.append(Segment(i, starts[i], ends[i], text, segment_words))
+        return segments
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The transcript in the JSON shape API clients and analysis results use."""
+        return {
+            "text": self.text,
+            "language": self.language,
+            "duration": self.duration,
+            "segments": [segment.to_dict() for segment in self.segments],
+            "processing": self.processing
+        }
+
+def encode_transcript(data: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+    """
+    Encode a transcript dict for storage and measure the bytes saved.
+
+    Args:
+        data: Transcript dict as built by the transcription service
+
+    Returns:
+        (encoded transcript, {"json_bytes", "compact_bytes", "saved_bytes"})
+    """
+    encoded = CompactTranscript.from_dict(data).encode()
+    json_bytes = len(json.dumps(data).encode("utf-8"))
+    compact_bytes = len(encoded)
+    return encoded, {"json_bytes": json_bytes, "compact_bytes": compact_bytes, "saved_bytes": json_bytes - compact_bytes}
+
+def decode_transcript(raw: Optional[str]) -> Optional[CompactTranscript]:
+    """Decode Recording.transcript (compact or legacy JSON); None if empty."""
+    return CompactTranscript.decode(raw) if raw else None
@@ -0,0 +1,246 @@
+"""
+Confidence Cascade
+Transcribes with a fast model first and re-transcribes only the low-confidence
+segments with the larger model, splicing the results back in
+"""
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import NormalizedAudio, SAMPLE_RATE
+from app.services.transcription.transcription_backend import TranscriptionBackend
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def find_low_confidence(segments: List[Dict[str, Any]], min_avg_logprob: Optional[float] = None,
+                        max_no_speech_prob: Optional[float] = None,
+                        max_compression_ratio: Optional[float] = None) -> List[int]:
+    """
+    Indices of segments the fast model is unsure about.
+
+    A segment is escalated when its average token log-probability is low, when
+    the model thinks it may be silence (likely a hallucination), or when its
+    text is suspiciously repetitive (high compression ratio). Segments without
+    the field in question are not judged on it.
+
+    Args:
+        segments: Whisper segments
+        min_avg_logprob: Lowest acceptable avg_logprob. Defaults to settings.CASCADE_MIN_AVG_LOGPROB.
+        max_no_speech_prob: Highest acceptable no_speech_prob. Defaults to settings.CASCADE_MAX_NO_SPEECH_PROB.
+        max_compression_ratio: Highest acceptable compression_ratio. Defaults to settings.CASCADE_MAX_COMPRESSION_RATIO.
+
+    Returns:
+        Indices into segments, in order
+    """
+    min_avg_logprob = settings.CASCADE_MIN_AVG_LOGPROB if min_avg_logprob is None else min_avg_logprob
+    max_no_speech_prob = settings.CASCADE_MAX_NO_SPEECH_PROB if max_no_speech_prob is None else max_no_speech_prob
+    max_compression_ratio = settings.CASCADE_MAX_COMPRESSION_RATIO if max_compression_ratio is None else max_compression_ratio
+
+    flagged = []
+    for i, segment in enumerate(segments):
+        if segment.get("avg_logprob", 0.0) < min_avg_logprob \
+                or segment.get("no_speech_prob", 0.0) > max_no_speech_prob \
+                or segment.get("compression_ratio", 0.0) > max_compression_ratio:
+            flagged.append(i)
+    return flagged
+
+def escalation_windows(segments: List[Dict[str, Any]], flagged: List[int], duration: float,
+                       padding: Optional[float] = None) -> List[Tuple[float, float, List[int]]]:
+    """
+    Group flagged segments into padded time windows to re-transcribe.
+
+    Padding never reaches into a neighbouring segment, so confident words are
+    not transcribed twice, and overlapping or touching windows are merged so
+    each stretch of audio is decoded by the larger model only once.
+
+    Args:
+        segments: Whisper segments on the recording timeline
+        flagged: Indices of low-confidence segments
+        duration: Recording duration in seconds
+        padding: Context (seconds) added on each side. Defaults to settings.CASCADE_PADDING_SECONDS.
+
+    Returns:
+        (start, end, segment indices) per window, in order
+    """
+    padding = settings.CASCADE_PADDING_SECONDS if padding is None else padding
+    windows = []
+    for i in flagged:
+        start = max(0.0, segments[i]["start"] - padding)
+        end = min(duration, segments[i]["end"] + padding)
+        if i > 0:
+            start = max(start, min(segments[i - 1]["end"], segments[i]["start"]))
+        if i + 1 < len(segments):
+            end = min(end, max(segments[i + 1]["start"], segments[i]["end"]))
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end), windows[-1][2] + [i])
+        else:
+            windows.append((start, end, [i]))
+    return windows
+
+def splice_segments(segments: List[Dict[str, Any]],
+                    replacements: List[Tuple[List[int], List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Replace low-confidence segments with the larger model's segments.
+
+    Args:
+        segments: Fast-model segments
+        replacements: (replaced segment indices, new segments on the recording timeline) per window
+
+    Returns:
+        Spliced segments with ids renumbered
+    """
+    replaced = {}
+    for indices, new_segments in replacements:
+        replaced[indices[0]] = new_segments
+        for i in indices[1:]:
+            replaced[i] = []
+
+    spliced = []
+    for i, segment in enumerate(segments):
+        for new_segment in replaced.get(i, [segment]):
+            new_segment["id"] = len(spliced)
+            spliced.append(new_segment)
+    return spliced
+
+class ConfidenceCascade:
+    """
+    Fast-model-first transcription with selective escalation.
+
+    Keeps process-wide counters so the escalation rate and the CPU time saved
+    against running the larger model on everything can be monitored.
+    """
+
+    def __init__(self):
+        self._stats = {
+            "recordings": 0,
+            "escalated_recordings": 0,
+            "segments": 0,
+            "escalated_segments": 0,
+            "failed_windows": 0,
+            "audio_seconds": 0.0,
+            "escalated_audio_seconds": 0.0,
+            "fast_inference_seconds": 0.0,
+            "escalation_inference_seconds": 0.0
+        }
+
+    async def escalate(self, backend: TranscriptionBackend, normalized: NormalizedAudio,
+                       result: Dict[str, Any], model_size: str) -> Dict[str, Any]:
+        """
+        Re-transcribe the low-confidence parts of a fast-model result with model_size.
+
+        Args:
+            backend: Backend that produced the fast result
+            normalized: Decoded recording
+            result: Fast-model result, timestamps on the recording timeline
+            model_size: Larger model used for escalation
+
+        Returns:
+            The result with low-confidence segments replaced and a "cascade" summary.
+            Windows whose re-transcription fails keep the fast segments and are
+            counted as failed_windows.
+        """
+        segments = result.get("segments", [])
+        fast_segment_count = len(segments)
+        fast_model = result.get("model")
+        flagged = find_low_confidence(segments)
+        windows = escalation_windows(segments, flagged, normalized.duration)
+
+        async def _rerun(window: Tuple[float, float, List[int]]) -> Tuple[List[int], List[Dict[str, Any]], float]:
+            start, end, indices = window
+            window_result = await backend.transcribe(
+                normalized.pcm_path, model_size,
+                window=(int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)),
+                language=result.get("language") if result.get("language") != "unknown" else None
+            )
+            new_segments = window_result.get("segments", [])
+            for segment in new_segments:
+                segment["start"] = round(segment["start"] + start, 3)
+                segment["end"] = round(segment["end"] + start, 3)
+                for word in segment.get("words") or []:
+                    word["start"] = round(word["start"] + start, 3)
+                    word["end"] = round(word["end"] + start, 3)
+                segment["escalated"] = True
+            return indices, new_segments, window_result.get("inference_seconds", 0.0) or 0.0
+
+        start_time = time.perf_counter()
+        outcomes = await asyncio.gather(*[_rerun(window) for window in windows], return_exceptions=True)
+
+        # A window that could not be re-transcribed keeps the fast model's segments
+        reruns, escalated_windows, failed_windows = [], [], 0
+        for window, outcome in zip(windows, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                failed_windows += 1
+                logger.warning(f"Cascade escalation of {window[0]:.2f}-{window[1]:.2f}s failed, "
+                               f"keeping the fast segments: {outcome}")
+                continue
+            reruns.append(outcome)
+            escalated_windows.append(window)
+        escalation_seconds = sum(seconds for _, _, seconds in reruns)
+        escalated_segments = sum(len(indices) for indices, _, _ in reruns)
+
+        if reruns:
+            segments = splice_segments(segments, [(indices, new_segments) for indices, new_segments, _ in reruns])
+            result["segments"] = segments
+            result["text"] = "".join(segment.get("text", "") for segment in segments).strip()
+            logger.info(f"Cascade re-transcribed {escalated_segments} low-confidence segment(s) in {len(reruns)} "
+                        f"window(s) with '{model_size}' in {time.perf_counter() - start_time:.2f}s")
+
+        escalated_audio = sum(end - start for start, end, _ in escalated_windows)
+        fast_seconds = result.get("inference_seconds", 0.0) or 0.0
+        result["inference_seconds"] = round(fast_seconds + escalation_seconds, 3)
+        result["model"] = f"{fast_model}-cascade-{backend.resolve_model(model_size)}"
+        result["cascade"] = {
+            "fast_model": fast_model,
+            "escalation_model": backend.resolve_model(model_size),
+            "segments": fast_segment_count,
+            "escalated_segments": escalated_segments,
+            "failed_windows": failed_windows,
+            "escalated_audio_seconds": round(escalated_audio, 3),
+            "fast_inference_seconds": round(fast_seconds, 3),
+            "escalation_inference_seconds": round(escalation_seconds, 3)
+        }
+
+        self._stats["recordings"] += 1
+        self._stats["escalated_recordings"] += 1 if reruns else 0
+        self._stats["segments"] += fast_segment_count
+        self._stats["escalated_segments"] += escalated_segments
+        self._stats["failed_windows"] += failed_windows
+        self._stats["audio_seconds"] += normalized.duration
+        self._stats["escalated_audio_seconds"] += escalated_audio
+        self._stats["fast_inference_seconds"] += fast_seconds
+        self._stats["escalation_inference_seconds"] += escalation_seconds
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get escalation rates and the estimated CPU time saved per recording.
+
+        The saving compares actual inference time with the larger model's
+        measured speed (escalation seconds per escalated audio second) applied
+        to all transcribed audio.
+        """
+        stats = self._stats
+        recordings = stats["recordings"]
+        large_cost_per_audio_second = (stats["escalation_inference_seconds"] / stats["escalated_audio_seconds"]
+                                       if stats["escalated_audio_seconds"] else None)
+        saved_per_recording = None
+        if large_cost_per_audio_second is not None and recordings:
+            large_only = large_cost_per_audio_second * stats["audio_seconds"]
+            actual = stats["fast_inference_seconds"] + stats["escalation_inference_seconds"]
+            saved_per_recording = round((large_only - actual) / recordings, 3)
+
+        return {
+            "enabled": settings.TRANSCRIPTION_CASCADE_ENABLED,
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()},
+            "recording_escalation_rate": round(stats["escalated_recordings"] / recordings, 4) if recordings else 0.0,
+            "segment_escalation_rate": round(stats["escalated_segments"] / stats["segments"], 4) if stats["segments"] else 0.0,
+            "estimated_cpu_seconds_saved_per_recording": saved_per_recording
+        }
+
+# Create singleton instance
+confidence_cascade = ConfidenceCascade()
@@ -0,0 +1,191 @@
+"""
+Inference Executor
+Runs Whisper inference outside the web event loop with a cap on concurrent decodes
+"""
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def _init_inference_worker(model_size: str) -> None:
+    """Set this process's thread budget, then load the Whisper model once when a pool process starts."""
+    from app.services.transcription.thread_budget import thread_budget
+    from app.services.transcription.model_registry import whisper_model_registry
+    thread_budget.apply("inference_pool")
+    whisper_model_registry.warm_up([model_size])
+
+def run_transcription(audio: Any, model_size: str, options: Dict[str, Any],
+                      trim_silence: bool = False, window: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """
+    Transcribe audio with this process's resident model.
+
+    Runs inside a pool process (or pool thread), never on the event loop.
+
+    Args:
+        audio: Path to cached 16 kHz PCM (.pcm), an audio/video file, or a float32 array
+        model_size: Whisper model size
+        options: Extra keyword arguments for model.transcribe()
+        trim_silence: Drop long silences before inference and map timestamps back
+        window: (start, end) sample range of cached PCM to transcribe; timestamps stay
+                relative to the window start
+
+    Returns:
+        Whisper result dict with "inference_seconds" (and "vad" when trimming)
+    """
+    from app.services.transcription.model_registry import whisper_model_registry
+    from app.services.transcription.audio_preprocessor import load_pcm, SAMPLE_RATE
+    from app.services.transcription.vad import trim_silence as vad_trim_silence
+
+    # Cached PCM is passed by path so large arrays are not pickled across processes
+    if isinstance(audio, str) and audio.endswith(".pcm"):
+        audio = load_pcm(audio, *window) if window else load_pcm(audio)
+
+    trimmed = None
+    if trim_silence and not isinstance(audio, str):
+        trimmed = vad_trim_silence(audio, SAMPLE_RATE)
+        audio = trimmed.audio
+
+    model = whisper_model_registry.get_model(model_size)
+    start_time = time.perf_counter()
+    result = model.transcribe(audio, **options)
+    result["inference_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    if trimmed is not None:
+        trimmed.remap_segments(result.get("segments", []))
+        result["vad"] = trimmed.to_metadata()
+    return result
+
+class InferenceExecutor:
+    """
+    Executor that offloads Whisper inference to a dedicated pool.
+
+    Modes:
+    - "process": a spawned process pool; each process keeps its own resident model
+    - "thread": a thread pool in the web process, sharing the process-wide model registry
+    """
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_concurrent: Optional[int] = None):
+        """
+        Initialize the executor. The pool itself is created on first use.
+
+        Args:
+            mode: "process" or "thread". Defaults to settings.INFERENCE_EXECUTOR_MODE.
+            max_workers: Pool size. Defaults to settings.INFERENCE_POOL_WORKERS.
+            max_concurrent: Maximum in-flight decodes. Defaults to settings.INFERENCE_MAX_CONCURRENT.
+        """
+        self.mode = mode or settings.INFERENCE_EXECUTOR_MODE
+        self.max_workers = max(1, max_workers or settings.INFERENCE_POOL_WORKERS)
+        self.max_concurrent = max(1, max_concurrent or settings.INFERENCE_MAX_CONCURRENT or self.max_workers)
+        self._pool: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "total_inference_seconds": 0.0,
+            "total_wait_seconds": 0.0
+        }
+
+    def _get_pool(self) -> Executor:
+        """Create the worker pool lazily so importing this module stays cheap."""
+        if self._pool is None:
+            if self.mode == "process":
+                # Spawn rather than fork: forking a process that already runs the
+                # event loop and torch threads can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_inference_worker,
+                    initargs=(settings.WHISPER_MODEL_SIZE,)
+                )
+            else:
+                # Decodes run in this process, so its torch thread pool is split across them
+                from app.services.transcription.thread_budget import thread_budget
+                thread_budget.apply("web_worker")
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="whisper-inference"
+                )
+            logger.info(f"Started {self.mode} inference pool with {self.max_workers} worker(s), "
+                        f"max {self.max_concurrent} concurrent decode(s)")
+        return self._pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Create the concurrency limiter on the running event loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def transcribe(self, audio: Any, model_size: Optional[str] = None,
+                         trim_silence: Optional[bool] = None, window: Optional[Tuple[int, int]] = None,
+                         **options) -> Dict[str, Any]:
+        """
+        Transcribe audio in the pool and return the Whisper result to the caller.
+
+        Args:
+            audio: Path to cached 16 kHz PCM (.pcm), an audio/video file, or a float32 array
+            model_size: Whisper model size. Defaults to settings.WHISPER_MODEL_SIZE.
+            trim_silence: Run VAD trimming first. Defaults to settings.VAD_ENABLED.
+            window: (start, end) sample range of cached PCM to transcribe
+            **options: Extra keyword arguments for model.transcribe()
+
+        Returns:
+            Whisper result dict with an added "inference_seconds" entry
+        """
+        model_size = model_size or settings.WHISPER_MODEL_SIZE
+        trim_silence = settings.VAD_ENABLED if trim_silence is None else trim_silence
+        semaphore = self._get_semaphore()
+
+        self._stats["submitted"] += 1
+        self._stats["waiting"] += 1
+        wait_start = time.perf_counter()
+        async with semaphore:
+            self._stats["waiting"] -= 1
+            self._stats["total_wait_seconds"] += time.perf_counter() - wait_start
+            self._stats["in_flight"] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._get_pool(), run_transcription, audio, model_size, options, trim_silence, window
+                )
+                self._stats["completed"] += 1
+                self._stats["total_inference_seconds"] += result.get("inference_seconds", 0.0)
+                return result
+            except Exception:
+                self._stats["failed"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration and decode counters."""
+        completed = self._stats["completed"]
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_concurrent": self.max_concurrent,
+            "pool_started": self._pool is not None,
+            **{key: round(value, 3) if isinstance(value, float) else value
+               for key, value in self._stats.items()},
+            "average_inference_seconds": round(self._stats["total_inference_seconds"] / completed, 3) if completed else 0.0
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+            logger.info("Inference pool shut down")
+
+# Create singleton instance
+inference_executor = InferenceExecutor()
@@ -0,0 +1,91 @@
+"""
+Int8-quantized CPU transcription backend.
+Runs Whisper through faster-whisper (CTranslate2) with int8 weights, which is
+several times faster than float32 openai-whisper on CPU at similar accuracy.
+"""
+import time
+import asyncio
+import logging
+import threading
+import importlib.util
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.transcription.transcription_backend import TranscriptionBackend
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class Int8TranscriptionBackend(TranscriptionBackend):
+    """Transcription backend using faster-whisper with int8 quantization on CPU."""
+
+    name = "faster_whisper_int8"
+
+    def __init__(self):
+        super().__init__(max_concurrent=settings.INT8_TRANSCRIPTION_CONCURRENCY)
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def resolve_model(self, model_size: str) -> str:
+        return f"{model_size}-int8"
+
+    def _get_model(self, model_size: str):
+        """Load each quantized model once per process."""
+        model = self._models.get(model_size)
+        if model is None:
+            with self._lock:
+                model = self._models.get(model_size)
+                if model is None:
+                    from faster_whisper import WhisperModel
+                    from app.services.transcription.thread_budget import thread_budget
+                    # 0 lets CTranslate2 pick its own default
+                    cpu_threads = thread_budget.threads_per_decode(settings.INT8_TRANSCRIPTION_CONCURRENCY) \
+                        if settings.INFERENCE_THREAD_BUDGET_ENABLED else 0
+                    start_time = time.perf_counter()
+                    model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+                    logger.info(f"Loaded int8 Whisper model '{model_size}' in {time.perf_counter() - start_time:.2f}s")
+                    self._models[model_size] = model
+        return model
+
+    def _run(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+             language: Optional[str]) -> Dict[str, Any]:
+        """Blocking inference; CTranslate2 releases the GIL, so a worker thread is enough."""
+        from app.services.transcription.audio_preprocessor import load_pcm, SAMPLE_RATE
+        from app.services.transcription.vad import trim_silence
+
+        audio = load_pcm(pcm_path, *window) if window else load_pcm(pcm_path)
+        trimmed = trim_silence(audio, SAMPLE_RATE) if settings.VAD_ENABLED else None
+        if trimmed is not None:
+            audio = trimmed.audio
+
+        start_time = time.perf_counter()
+        segments_iter, info = self._get_model(model_size).transcribe(audio, language=language)
+        segments = [
+            {
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "compression_ratio": segment.compression_ratio
+            }
+            for segment in segments_iter
+        ]
+        result = {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": info.language,
+            "segments": segments,
+            "inference_seconds": round(time.perf_counter() - start_time, 3)
+        }
+        if trimmed is not None:
+            trimmed.remap_segments(segments)
+            result["vad"] = trimmed.to_metadata()
+        return result
+
+    async def _transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+                          language: Optional[str]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._run, pcm_path, model_size, window, language)
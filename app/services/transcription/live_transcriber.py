@@ -0,0 +1,423 @@
+"""
+Live Transcriber
+Transcribes an answer incrementally while the candidate is still recording:
+audio chunks are appended to a growing file and fed to a streaming decoder,
+and every few seconds the audio up to the latest pause is transcribed, so
+only the last few seconds are left when the candidate finishes
+"""
+import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import (
+    audio_preprocessor, NormalizedAudio, StreamDecoder, SAMPLE_RATE
+)
+from app.services.transcription.chunked_transcriber import AudioChunk, _shift_result, merge_chunk_results
+from app.services.transcription.transcript_cache import transcript_cache
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.transcription_service import transcription_service
+from app.services.transcription.vad import frame_levels_db, speech_threshold, _runs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class RunningLevels:
+    """
+    Noise floor and speech level of a stream so far.
+
+    Each pass measures only the audio after the committed point. The lowest
+    noise and highest speech percentiles seen are kept, so pauses in new
+    audio are still judged against everything recorded.
+    """
+
+    def __init__(self):
+        self.noise_floor_db: Optional[float] = None
+        self.speech_level_db: Optional[float] = None
+
+    def threshold(self, levels_db: np.ndarray) -> float:
+        """Update the running levels with new frame levels and return the speech threshold."""
+        noise_floor = float(np.percentile(levels_db, 1.0))
+        speech_level = float(np.percentile(levels_db, 90))
+        if self.noise_floor_db is not None:
+            noise_floor = min(noise_floor, self.noise_floor_db)
+            speech_level = max(speech_level, self.speech_level_db)
+        self.noise_floor_db, self.speech_level_db = noise_floor, speech_level
+        # Pauses must also sit well below the speech level, so audio without any pause yet
+        # is not taken for one
+        return speech_threshold(levels_db, speech_range_db=12.0,
+                                noise_floor_db=noise_floor, speech_level_db=speech_level)
+
+def find_commit_point(pcm_path: str, start_sample: int, end_sample: int, max_seconds: float,
+                      min_seconds: float = 2.0, min_gap_seconds: float = 0.3, frame_ms: int = 30,
+                      levels: Optional[RunningLevels] = None) -> Optional[int]:
+    """
+    Where the next live window should end.
+
+    Picks the middle of the last pause between start_sample and end_sample,
+    so words are never split. Without a usable pause, the window is only cut
+    hard once it reaches max_seconds.
+
+    Args:
+        pcm_path: Raw s16le mono 16 kHz file decoded so far
+        start_sample: End of the audio already transcribed
+        end_sample: Latest sample that may be committed
+        max_seconds: Longest window to transcribe at once
+        min_seconds: Shortest window worth transcribing
+        min_gap_seconds: Shortest silence that may be cut in
+        frame_ms: Analysis frame length in milliseconds
+        levels: The stream's running levels, updated with this window. Defaults to
+                levels measured on this window alone.
+
+    Returns:
+        Sample to cut at, or None to wait for more audio
+    """
+    min_len = int(min_seconds * SAMPLE_RATE)
+    max_len = int(max_seconds * SAMPLE_RATE)
+    if end_sample - start_sample < min_len:
+        return None
+
+    # Only the uncommitted audio is measured, so a pass costs the same however long the answer is
+    samples = np.memmap(pcm_path, dtype=np.int16, mode="r")[start_sample:end_sample]
+    frame_len = int(SAMPLE_RATE * frame_ms / 1000)
+    frame_levels = frame_levels_db(samples, SAMPLE_RATE, frame_ms)
+    threshold = (levels or RunningLevels()).threshold(frame_levels)
+    silent_starts, silent_ends = _runs(frame_levels <= threshold)
+    usable = (silent_ends - silent_starts) * frame_len >= min_gap_seconds * SAMPLE_RATE
+    cut_points = start_sample + ((silent_starts[usable] + silent_ends[usable]) // 2) * frame_len
+
+    limit = min(end_sample, start_sample + max_len)
+    candidates = cut_points[(cut_points >= start_sample + min_len) & (cut_points <= limit)]
+    if len(candidates):
+        return int(candidates[-1])
+    if end_sample - start_sample >= max_len:
+        return start_sample + max_len
+    return None
+
+class LiveStream:
+    """One answer being streamed: the bytes received so far and the audio already transcribed."""
+
+    def __init__(self, session_id: int, question_id: int, file_extension: str,
+                 backend: TranscriptionBackend, model_size: str, language: Optional[str] = None):
+        self.stream_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.question_id = question_id
+        self.backend = backend
+        self.model_size = model_size
+        self.language = language
+
+        # The extension comes from the client, so only a plain ".ext" is used in the file name
+        if not re.fullmatch(r"\.[A-Za-z0-9]{1,5}", file_extension or ""):
+            file_extension = ".webm"
+        # Stream files live next to the PCM cache so decodes can be moved into place atomically
+        fd, self.file_path = tempfile.mkstemp(prefix=f"live_{self.stream_id}_", suffix=file_extension,
+                                              dir=audio_preprocessor.cache_dir)
+        os.close(fd)
+        self.pcm_path = f"{self.file_path}.pcm"
+        self.bytes_received = 0
+        self._digest = hashlib.sha256()
+
+        # Without a working decoder nothing is transcribed while recording; finish() decodes the whole file
+        self.decoder: Optional[StreamDecoder] = None
+        try:
+            self.decoder = audio_preprocessor.stream_decoder(self.pcm_path)
+        except Exception as e:
+            logger.warning(f"Live stream {self.stream_id} has no streaming decoder: {e}")
+
+        self.committed_sample = 0
+        self.levels = RunningLevels()
+        self.chunk_results: List[Dict[str, Any]] = []
+        self.passes = 0
+        self.pass_task: Optional[asyncio.Task] = None
+        self.last_pass_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+        self.finished = False
+        self.content_hash: Optional[str] = None
+        self.transcript_data: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.updated_at = time.time()
+
+    @property
+    def committed_seconds(self) -> float:
+        return self.committed_sample / SAMPLE_RATE
+
+    @property
+    def text(self) -> str:
+        """Transcript of the audio committed so far."""
+        return " ".join(r["text"].strip() for r in self.chunk_results if r["text"].strip())
+
+    def write(self, data: bytes) -> None:
+        """Append received audio to the stream file and feed it to the decoder."""
+        with open(self.file_path, "ab") as f:
+            f.write(data)
+        self._digest.update(data)
+        self.bytes_received += len(data)
+        self.updated_at = time.time()
+        if self.decoder is not None:
+            try:
+                self.decoder.write(data)
+            except OSError as e:
+                logger.warning(f"Streaming decoder of live stream {self.stream_id} stopped: {e}")
+                self.stop_decoder()
+
+    def stop_decoder(self) -> None:
+        """Stop the streaming decoder; finish() then decodes the whole file."""
+        if self.decoder is not None:
+            self.decoder.abort()
+            self.decoder = None
+
+    def remove_files(self) -> None:
+        self.stop_decoder()
+        for path in (self.file_path, self.pcm_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def to_status(self) -> Dict[str, Any]:
+        """Progress message sent back to the candidate portal."""
+        return {
+            "stream_id": self.stream_id,
+            "bytes_received": self.bytes_received,
+            "transcribed_seconds": round(self.committed_seconds, 2),
+            "text": self.text,
+            "finished": self.finished,
+            "error": self.error
+        }
+
+class LiveTranscriber:
+    """
+    Registry of live answer streams.
+
+    Streams live in the worker process that receives the audio. When the
+    answer is uploaded, the upload claims the stream and stores its transcript
+    on the new recording. The finished transcript is also put in the transcript
+    cache under the streamed bytes' hash, so an identical upload handled by
+    another worker on the same host still skips transcription.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, LiveStream] = {}
+        self._stats = {
+            "streams": 0,
+            "finished": 0,
+            "claimed": 0,
+            "failed": 0,
+            "expired": 0,
+            "streamed_audio_seconds": 0.0,
+            "finish_audio_seconds": 0.0,
+            "finish_seconds": 0.0
+        }
+
+    def open(self, session_id: int, question_id: int, file_extension: str = ".webm",
+             language: Optional[str] = None) -> LiveStream:
+        """
+        Start a live stream for one answer.
+
+        Args:
+            session_id: Candidate session ID
+            question_id: Question being answered
+            file_extension: Container of the streamed audio (e.g. ".webm")
+            language: Interview language, if pinned
+
+        Returns:
+            The new stream
+        """
+        self.cleanup_expired()
+        backends = transcription_service.get_backends()
+        if not backends:
+            raise RuntimeError("No transcription backend is available")
+
+        stream = LiveStream(session_id, question_id, file_extension, backends[0],
+                            transcription_service.model_size, language)
+        self._streams[stream.stream_id] = stream
+        self._stats["streams"] += 1
+        logger.info(f"Opened live stream {stream.stream_id} for session {session_id}, question {question_id}")
+        return stream
+
+    def get(self, stream_id: str) -> Optional[LiveStream]:
+        return self._streams.get(stream_id)
+
+    async def append(self, stream: LiveStream, data: bytes) -> None:
+        """
+        Add received audio and start a transcription pass when one is due.
+
+        Passes run in the background, one at a time per stream, at most every
+        settings.LIVE_TRANSCRIPTION_INTERVAL_SECONDS.
+        """
+        if stream.finished:
+            raise ValueError("Stream is already finished")
+        if stream.bytes_received + len(data) > settings.LIVE_TRANSCRIPTION_MAX_BYTES:
+            raise ValueError("Stream exceeds the maximum recording size")
+        await asyncio.to_thread(stream.write, data)
+
+        pass_running = stream.pass_task is not None and not stream.pass_task.done()
+        if not pass_running and time.monotonic() - stream.last_pass_at >= settings.LIVE_TRANSCRIPTION_INTERVAL_SECONDS:
+            stream.last_pass_at = time.monotonic()
+            stream.pass_task = asyncio.create_task(self._run_pass(stream))
+
+    async def _run_pass(self, stream: LiveStream) -> None:
+        """Transcribe what the decoder has produced up to the last pause before the live edge."""
+        try:
+            async with stream.lock:
+                if stream.decoder is None:
+                    return
+                total = stream.decoder.decoded_samples
+                # The newest audio may be cut mid-word or still be decoding, so it waits for the next pass
+                edge = total - int(settings.LIVE_TRANSCRIPTION_TAIL_SECONDS * SAMPLE_RATE)
+                await self._transcribe_until(stream, stream.pcm_path, edge, final=False)
+                stream.passes += 1
+        except Exception as e:
+            # The audio stays uncommitted; the next pass or finish() retries it
+            logger.warning(f"Live transcription pass failed for stream {stream.stream_id}: {e}")
+
+    async def _transcribe_until(self, stream: LiveStream, pcm_path: str, end_sample: int, final: bool) -> None:
+        """Transcribe and commit windows from the committed point up to end_sample."""
+        max_seconds = min(settings.TRANSCRIPTION_CHUNK_MAX_SECONDS, stream.backend.max_chunk_seconds or float("inf"))
+        while True:
+            start = stream.committed_sample
+            if final:
+                # Whatever remains is transcribed, split only when it is too long for one window
+                if end_sample - start <= int(0.1 * SAMPLE_RATE):
+                    return
+                cut = end_sample if end_sample - start <= max_seconds * SAMPLE_RATE else \
+                    await asyncio.to_thread(find_commit_point, pcm_path, start, end_sample, max_seconds,
+                                            levels=stream.levels)
+            else:
+                cut = await asyncio.to_thread(find_commit_point, pcm_path, start, end_sample, max_seconds,
+                                              levels=stream.levels)
+            if cut is None:
+                return
+
+            result = await stream.backend.transcribe(pcm_path, stream.model_size, window=(start, cut),
+                                                     language=stream.language)
+            stream.chunk_results.append(_shift_result(result, AudioChunk(len(stream.chunk_results), start, cut)))
+            stream.committed_sample = cut
+
+    async def finish(self, stream: LiveStream) -> LiveStream:
+        """
+        Transcribe the rest of a stream once recording has stopped.
+
+        Only the audio after the last committed pause is left to transcribe.
+        The finished transcript is put in the transcript cache under the hash
+        of the streamed bytes. A failure is recorded on the stream rather than
+        raised, and the uploaded file is then transcribed as usual.
+        """
+        if stream.finished:
+            return stream
+        if stream.pass_task is not None:
+            await asyncio.gather(stream.pass_task, return_exceptions=True)
+
+        start_time = time.perf_counter()
+        streamed_seconds = stream.committed_seconds
+        try:
+            async with stream.lock:
+                stream.content_hash = stream._digest.hexdigest()
+                normalized = await self._decoded_audio(stream)
+                total = int(round(normalized.duration * SAMPLE_RATE))
+                await self._transcribe_until(stream, normalized.pcm_path, total, final=True)
+
+                result = merge_chunk_results(stream.chunk_results)
+                result["backend"] = stream.backend.name
+                result["model"] = stream.backend.resolve_model(stream.model_size)
+                result["language_pinned"] = stream.language is not None
+                transcript_data = transcription_service.build_transcript_data(result, normalized)
+                finish_seconds = time.perf_counter() - start_time
+                transcript_data["processing"]["live"] = {
+                    "passes": stream.passes,
+                    "streamed_audio_seconds": round(streamed_seconds, 3),
+                    "finish_audio_seconds": round(normalized.duration - streamed_seconds, 3),
+                    "finish_seconds": round(finish_seconds, 3)
+                }
+                stream.transcript_data = transcript_data
+                # Cached under the key an upload of the same audio looks up, cascade or not
+                await asyncio.to_thread(
+                    transcript_cache.put, stream.content_hash, transcription_service.cache_model(stream.backend),
+                    result["backend"], transcript_data
+                )
+
+            self._stats["finished"] += 1
+            self._stats["streamed_audio_seconds"] += streamed_seconds
+            self._stats["finish_audio_seconds"] += normalized.duration - streamed_seconds
+            self._stats["finish_seconds"] += finish_seconds
+            logger.info(f"Finished live stream {stream.stream_id}: {streamed_seconds:.1f}s transcribed while "
+                        f"recording, {normalized.duration - streamed_seconds:.1f}s after in {finish_seconds:.2f}s")
+        except Exception as e:
+            stream.error = str(e)
+            self._stats["failed"] += 1
+            logger.warning(f"Live stream {stream.stream_id} could not be finished: {e}")
+        finally:
+            stream.finished = True
+        return stream
+
+    async def _decoded_audio(self, stream: LiveStream) -> NormalizedAudio:
+        """The stream's complete PCM: the streaming decoder's output, or a full decode if it failed."""
+        if stream.decoder is not None:
+            start_time = time.perf_counter()
+            try:
+                await asyncio.to_thread(stream.decoder.close)
+                stream.decoder = None
+                return await asyncio.to_thread(audio_preprocessor.adopt, stream.pcm_path, stream.content_hash,
+                                               time.perf_counter() - start_time)
+            except Exception as e:
+                logger.warning(f"Streaming decode of live stream {stream.stream_id} failed, decoding the file: {e}")
+                stream.stop_decoder()
+        return await asyncio.to_thread(audio_preprocessor.normalize, stream.file_path, stream.content_hash)
+
+    async def claim(self, stream_id: str, session_id: int, question_id: int) -> Optional[LiveStream]:
+        """
+        Hand a stream over to the upload of its answer.
+
+        The stream is finished first if the candidate portal did not do so.
+        The caller owns the returned stream and must call discard() when done.
+
+        Returns:
+            The finished stream, or None if it is unknown here or belongs to another answer
+        """
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.session_id != session_id or stream.question_id != question_id:
+            return None
+        await self.finish(stream)
+        self._streams.pop(stream_id, None)
+        self._stats["claimed"] += 1
+        return stream
+
+    def discard(self, stream: LiveStream) -> None:
+        """Forget a stream and delete its files."""
+        if stream.pass_task is not None and not stream.pass_task.done():
+            stream.pass_task.cancel()
+        self._streams.pop(stream.stream_id, None)
+        stream.remove_files()
+
+    def cleanup_expired(self) -> int:
+        """Discard streams that were not claimed within settings.LIVE_TRANSCRIPTION_STREAM_TTL_SECONDS."""
+        cutoff = time.time() - settings.LIVE_TRANSCRIPTION_STREAM_TTL_SECONDS
+        expired = [stream for stream in self._streams.values() if stream.updated_at < cutoff]
+        for stream in expired:
+            self.discard(stream)
+        self._stats["expired"] += len(expired)
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the share of audio already transcribed when recording stopped."""
+        stats = self._stats
+        total_audio = stats["streamed_audio_seconds"] + stats["finish_audio_seconds"]
+        return {
+            "active_streams": len(self._streams),
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()},
+            "transcribed_while_recording_percentage": round(100.0 * stats["streamed_audio_seconds"] / total_audio, 1)
+            if total_audio else 0.0,
+            "average_finish_seconds": round(stats["finish_seconds"] / stats["finished"], 3) if stats["finished"] else 0.0
+        }
+
+# Create singleton instance
+live_transcriber = LiveTranscriber()
@@ -0,0 +1,26 @@
+"""
+Local Whisper transcription backend.
+Runs openai-whisper in the inference pool with the model kept resident per process.
+"""
+import importlib.util
+from typing import Dict, Any, Optional, Tuple
+
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.inference_executor import inference_executor
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """Transcription backend running openai-whisper in the local inference pool."""
+
+    name = "local_whisper"
+
+    def __init__(self):
+        # The inference executor already caps concurrent decodes
+        super().__init__(max_concurrent=inference_executor.max_concurrent)
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("whisper") is not None
+
+    async def _transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+                          language: Optional[str]) -> Dict[str, Any]:
+        options = {"language": language} if language else {}
+        return await inference_executor.transcribe(pcm_path, model_size=model_size, window=window, **options)
@@ -0,0 +1,153 @@
+"""
+Whisper Model Registry
+Process-wide registry that loads each Whisper model size once per worker process
+"""
+import os
+import gc
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+import psutil
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class WhisperModelRegistry:
+    """
+    Registry of loaded Whisper models keyed by model size.
+
+    Every TranscriptionService instance in a worker shares the models held here,
+    so a model size is only loaded from disk the first time it is requested.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._models: Dict[str, Any] = {}
+        self._load_stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._preloaded_by: Optional[int] = None
+
+    def get_model(self, model_size: Optional[str] = None):
+        """
+        Get a Whisper model, loading it on first use.
+
+        Args:
+            model_size: Whisper model size (tiny, base, small, medium, large).
+                        Defaults to settings.WHISPER_MODEL_SIZE.
+
+        Returns:
+            Loaded Whisper model
+        """
+        model_size = model_size or settings.WHISPER_MODEL_SIZE
+
+        model = self._models.get(model_size)
+        if model is not None:
+            return model
+
+        # Only one thread loads a given model; the others wait and reuse it
+        with self._lock:
+            model = self._models.get(model_size)
+            if model is None:
+                model = self._load_model(model_size)
+                self._models[model_size] = model
+        return model
+
+    def _load_model(self, model_size: str):
+        """Load a Whisper model from disk and record load time and memory growth."""
+        import whisper
+
+        process = psutil.Process(os.getpid())
+        rss_before = process.memory_info().rss
+        start_time = time.perf_counter()
+
+        try:
+            model = whisper.load_model(model_size)
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model '{model_size}': {str(e)}")
+            raise
+
+        load_seconds = time.perf_counter() - start_time
+        rss_after = process.memory_info().rss
+
+        self._load_stats[model_size] = {
+            "load_time_seconds": round(load_seconds, 3),
+            "rss_increase_mb": round((rss_after - rss_before) / (1024 ** 2), 1),
+            "loaded_at": time.time(),
+            "pid": os.getpid()
+        }
+        logger.info(f"Whisper model '{model_size}' loaded in {load_seconds:.2f}s "
+                    f"(+{self._load_stats[model_size]['rss_increase_mb']} MB RSS)")
+        return model
+
+    def warm_up(self, model_sizes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Preload models so the first transcription request does not pay the load cost.
+
+        Args:
+            model_sizes: Model sizes to load. Defaults to the configured model size.
+
+        Returns:
+            Registry statistics after loading
+        """
+        for model_size in model_sizes or [settings.WHISPER_MODEL_SIZE]:
+            try:
+                self.get_model(model_size)
+            except Exception as e:
+                logger.warning(f"Whisper warm-up failed for model '{model_size}': {str(e)}")
+        return self.get_stats()
+
+    def preload_for_fork(self, model_sizes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Load models in a process that is about to fork workers (the gunicorn master).
+
+        Forked workers then share the weights through copy-on-write pages
+        instead of each loading its own copy. Inference never writes to the
+        weights, so the pages stay shared as long as nothing else touches them:
+        torch is limited to one thread here so no OpenMP pool exists to be
+        inherited in a broken state, and the loaded objects are moved to the
+        permanent GC generation so collections in the workers do not write to
+        their headers.
+
+        Args:
+            model_sizes: Model sizes to load. Defaults to the configured model size.
+
+        Returns:
+            Registry statistics after loading
+        """
+        try:
+            import torch
+            torch.set_num_threads(1)
+        except ImportError:
+            pass
+
+        stats = self.warm_up(model_sizes)
+        if self._models:
+            self._preloaded_by = os.getpid()
+            gc.collect()
+            gc.freeze()
+            logger.info(f"Preloaded Whisper model(s) {list(self._models)} in pid {self._preloaded_by} "
+                        f"for copy-on-write sharing")
+        return stats
+
+    def is_loaded(self, model_size: Optional[str] = None) -> bool:
+        """Check whether a model size is already resident in this process."""
+        return (model_size or settings.WHISPER_MODEL_SIZE) in self._models
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get load time and memory statistics for the models held by this process."""
+        return {
+            "pid": os.getpid(),
+            "default_model_size": settings.WHISPER_MODEL_SIZE,
+            "loaded_models": list(self._models.keys()),
+            "models": {size: dict(stats) for size, stats in self._load_stats.items()},
+            # Set in forked workers whose models came from the master rather than their own load
+            "shared_from_pid": self._preloaded_by if self._preloaded_by not in (None, os.getpid()) else None,
+            "process_rss_mb": round(psutil.Process(os.getpid()).memory_info().rss / (1024 ** 2), 1)
+        }
+
+# Create singleton instance
+whisper_model_registry = WhisperModelRegistry()
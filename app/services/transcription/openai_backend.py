@@ -0,0 +1,78 @@
+"""
+OpenAI API transcription backend.
+Uploads cached PCM as WAV to the hosted Whisper endpoint, with long silences
+trimmed first (VAD_ENABLED) since the API bills per minute of audio.
+"""
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.audio_preprocessor import load_pcm, SAMPLE_RATE
+from app.services.transcription.chunked_transcriber import (
+    encode_wav_samples, max_chunk_seconds_for_bytes, OPENAI_MAX_UPLOAD_BYTES
+)
+from app.services.transcription.vad import trim_silence, TrimmedAudio
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class OpenAITranscriptionBackend(TranscriptionBackend):
+    """Transcription backend using the OpenAI audio transcription API."""
+
+    name = "openai_api"
+
+    # Uploads over 25 MB are rejected, so longer audio is sent in chunks
+    max_chunk_seconds = max_chunk_seconds_for_bytes(OPENAI_MAX_UPLOAD_BYTES)
+
+    def __init__(self):
+        super().__init__(max_concurrent=settings.OPENAI_TRANSCRIPTION_CONCURRENCY)
+        self._client = None
+
+    def is_available(self) -> bool:
+        return bool(settings.OPENAI_API_KEY)
+
+    def resolve_model(self, model_size: str) -> str:
+        return settings.OPENAI_TRANSCRIPTION_MODEL
+
+    def _get_client(self):
+        """Create the async client on first use."""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        return self._client
+
+    def _encode(self, pcm_path: str, window: Optional[Tuple[int, int]]) -> Tuple[bytes, Optional[TrimmedAudio]]:
+        """Load the window, trim long silences and encode it as WAV (blocking)."""
+        audio = load_pcm(pcm_path, *window) if window else load_pcm(pcm_path)
+        trimmed = trim_silence(audio, SAMPLE_RATE) if settings.VAD_ENABLED else None
+        if trimmed is not None:
+            audio = trimmed.audio
+        return encode_wav_samples(audio, SAMPLE_RATE), trimmed
+
+    async def _transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+                          language: Optional[str]) -> Dict[str, Any]:
+        # Reading and encoding up to 25 MB of audio would block the event loop
+        wav_bytes, trimmed = await asyncio.to_thread(self._encode, pcm_path, window)
+
+        request = {
+            "file": ("audio.wav", wav_bytes, "audio/wav"),
+            "model": settings.OPENAI_TRANSCRIPTION_MODEL,
+            "response_format": "verbose_json",
+            "timestamp_granularities": ["segment"]
+        }
+        if language:
+            request["language"] = language
+
+        response = await self._get_client().audio.transcriptions.create(**request)
+        result = response.model_dump() if hasattr(response, "model_dump") else dict(response)
+        transcript = {
+            "text": result.get("text", ""),
+            "language": result.get("language") or "unknown",
+            "segments": result.get("segments") or []
+        }
+        if trimmed is not None:
+            trimmed.remap_segments(transcript["segments"])
+            transcript["vad"] = trimmed.to_metadata()
+        return transcript
@@ -0,0 +1,61 @@
+"""
+Stub transcription backend.
+Deterministic, dependency-free output for tests and benchmarks.
+"""
+import asyncio
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.audio_preprocessor import load_pcm, SAMPLE_RATE
+from app.services.transcription.vad import detect_speech
+
+class StubTranscriptionBackend(TranscriptionBackend):
+    """
+    Backend that emits one segment per detected speech region.
+
+    The same audio always yields the same transcript, so pipeline behaviour
+    (caching, chunking, fallback) can be tested without a model. An optional
+    delay per second of audio (settings.STUB_TRANSCRIPTION_SECONDS_PER_AUDIO_SECOND)
+    lets benchmarks simulate inference cost.
+    """
+
+    name = "stub"
+
+    def __init__(self):
+        super().__init__(max_concurrent=0)
+
+    def is_available(self) -> bool:
+        return True
+
+    def resolve_model(self, model_size: str) -> str:
+        return "stub"
+
+    async def _transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+                          language: Optional[str]) -> Dict[str, Any]:
+        # Reading and scanning the PCM are blocking work, kept off the event loop
+        audio = await asyncio.to_thread(load_pcm, pcm_path, *(window or ()))
+        duration = len(audio) / SAMPLE_RATE
+
+        delay = duration * settings.STUB_TRANSCRIPTION_SECONDS_PER_AUDIO_SECOND
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        regions = await asyncio.to_thread(detect_speech, audio, SAMPLE_RATE)
+        segments = [
+            {
+                "id": i,
+                "start": round(start / SAMPLE_RATE, 3),
+                "end": round(end / SAMPLE_RATE, 3),
+                "text": f" Speech segment {i + 1}.",
+                "avg_logprob": -0.2,
+                "no_speech_prob": 0.01
+            }
+            for i, (start, end) in enumerate(regions)
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments).strip(),
+            "language": language or "en",
+            "segments": segments,
+            "inference_seconds": round(delay, 3)
+        }
@@ -0,0 +1,150 @@
+"""
+Inference Thread Budget
+Divides the machine's CPU cores across web workers and inference processes so
+concurrent Whisper decodes do not each spin up one thread per core
+"""
+import os
+import math
+import logging
+import importlib.util
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Native thread pools read these when they initialise, so they must be set before torch/CTranslate2 load
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def available_cores() -> int:
+    """
+    CPU cores this process may actually use.
+
+    Takes the smallest of the host core count, the process CPU affinity and a
+    cgroup v2 CPU quota (as set on container dynos).
+    """
+    cores = os.cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        cores = min(cores, len(os.sched_getaffinity(0)))
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+class ThreadBudget:
+    """
+    Per-process thread counts for the inference runtime.
+
+    The available cores are split evenly across WEB_CONCURRENCY web workers;
+    each worker's share is then split across the decodes it runs at once
+    (pool processes in "process" mode, concurrent decodes in "thread" mode,
+    where all decodes share one torch thread pool). Explicit
+    INFERENCE_INTRA_OP_THREADS overrides the computed value.
+    """
+
+    def __init__(self):
+        """Initialize the budget; nothing is applied until apply() is called."""
+        self.applied_to: Optional[str] = None
+        self.torch_configured = False
+
+    @property
+    def cores(self) -> int:
+        return settings.INFERENCE_CPU_CORES or available_cores()
+
+    @property
+    def web_workers(self) -> int:
+        return max(1, settings.WEB_CONCURRENCY)
+
+    @property
+    def cores_per_worker(self) -> int:
+        return max(1, self.cores // self.web_workers)
+
+    @property
+    def decode_slots(self) -> int:
+        """Decodes a web worker runs at once, each of which gets its own share of the worker's cores."""
+        if settings.INFERENCE_EXECUTOR_MODE == "process":
+            return max(1, settings.INFERENCE_POOL_WORKERS)
+        return max(1, settings.INFERENCE_MAX_CONCURRENT or settings.INFERENCE_POOL_WORKERS)
+
+    @property
+    def intra_op_threads(self) -> int:
+        if settings.INFERENCE_INTRA_OP_THREADS:
+            return settings.INFERENCE_INTRA_OP_THREADS
+        return self.threads_per_decode(self.decode_slots)
+
+    @property
+    def inter_op_threads(self) -> int:
+        return max(1, settings.INFERENCE_INTER_OP_THREADS)
+
+    def threads_per_decode(self, concurrent_decodes: int) -> int:
+        """
+        Threads one decode may use when a worker runs concurrent_decodes at once.
+
+        Args:
+            concurrent_decodes: Decodes sharing this web worker's cores
+
+        Returns:
+            Thread count, at least 1
+        """
+        return max(1, self.cores_per_worker // max(1, concurrent_decodes))
+
+    def apply(self, role: str) -> Dict[str, Any]:
+        """
+        Set the thread counts for this process.
+
+        Sets the OpenMP/MKL environment variables (inherited by spawned pool
+        processes) and, when torch is installed, its intra-op and inter-op
+        thread counts. Does nothing unless INFERENCE_THREAD_BUDGET_ENABLED.
+
+        Args:
+            role: What this process is, for logging and status ("inference_pool" or "web_worker")
+
+        Returns:
+            The budget as reported by get_stats()
+        """
+        if not settings.INFERENCE_THREAD_BUDGET_ENABLED:
+            return self.get_stats()
+
+        intra_op, inter_op = self.intra_op_threads, self.inter_op_threads
+        for name in _THREAD_ENV_VARS:
+            os.environ[name] = str(intra_op)
+
+        if importlib.util.find_spec("torch") is not None:
+            import torch
+            torch.set_num_threads(intra_op)
+            try:
+                torch.set_num_interop_threads(inter_op)
+            except RuntimeError:
+                # Can only be set once, before any inter-op parallel work has started
+                logger.debug("torch inter-op thread count was already fixed for this process")
+            self.torch_configured = True
+
+        self.applied_to = role
+        logger.info(f"Inference thread budget for {role} (pid {os.getpid()}): {intra_op} intra-op / "
+                    f"{inter_op} inter-op thread(s) from {self.cores} core(s) over {self.web_workers} "
+                    f"web worker(s) x {self.decode_slots} decode slot(s)")
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the chosen budget and how it was derived."""
+        return {
+            "enabled": settings.INFERENCE_THREAD_BUDGET_ENABLED,
+            "cores": self.cores,
+            "web_workers": self.web_workers,
+            "cores_per_worker": self.cores_per_worker,
+            "executor_mode": settings.INFERENCE_EXECUTOR_MODE,
+            "decode_slots": self.decode_slots,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "int8_cpu_threads": self.threads_per_decode(settings.INT8_TRANSCRIPTION_CONCURRENCY),
+            "applied_to": self.applied_to,
+            "torch_configured": self.torch_configured
+        }
+
+# Create singleton instance
+thread_budget = ThreadBudget()
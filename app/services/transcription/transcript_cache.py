@@ -0,0 +1,89 @@
+"""
+Transcript Cache
+Disk cache of finished transcripts keyed by (audio SHA-256, model size, backend)
+"""
+import os
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.disk_cache import JsonDiskCache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TranscriptCache(JsonDiskCache):
+    """
+    Content-addressed transcript cache.
+
+    Byte-identical audio (re-uploads, forced reprocessing, scheduled retries)
+    is only transcribed once per model size and backend. Entries expire after
+    max_age_days and the least recently used entries are evicted once the
+    cache grows past max_size_mb.
+    """
+
+    label = "transcript cache"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 max_age_days: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Cache directory. Defaults to settings.TRANSCRIPT_CACHE_DIR.
+            max_size_mb: Size limit. Defaults to settings.TRANSCRIPT_CACHE_MAX_MB.
+            max_age_days: Age limit. Defaults to settings.TRANSCRIPT_CACHE_MAX_AGE_DAYS.
+        """
+        max_size_mb = max_size_mb if max_size_mb is not None else settings.TRANSCRIPT_CACHE_MAX_MB
+        max_age_days = max_age_days if max_age_days is not None else settings.TRANSCRIPT_CACHE_MAX_AGE_DAYS
+        super().__init__(cache_dir or settings.TRANSCRIPT_CACHE_DIR, int(max_size_mb * 1024 ** 2),
+                         max_age_days * 86400, {})
+
+    def _entry_path(self, content_hash: str, model_size: str, backend: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}_{model_size}_{backend}.json")
+
+    def get(self, content_hash: str, model_size: str, backend: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached transcript.
+
+        Args:
+            content_hash: SHA-256 of the recording bytes
+            model_size: Model size the transcript was produced with
+            backend: Transcription backend the transcript was produced with
+
+        Returns:
+            Cached transcript data, or None on a miss
+        """
+        return self._read(self._entry_path(content_hash, model_size, backend))
+
+    def get_any(self, content_hash: str, keys: List[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a transcript produced by any of several (model, backend) pairs, counted as one lookup.
+
+        Args:
+            content_hash: SHA-256 of the recording bytes
+            keys: (model_size, backend) pairs in order of preference
+
+        Returns:
+            The first cached transcript found, or None on a miss
+        """
+        for model_size, backend in keys:
+            # An expired or unreadable entry is skipped in favour of the remaining keys
+            transcript_data = self._read(self._entry_path(content_hash, model_size, backend), count=False)
+            if transcript_data is not None:
+                self._count("hits")
+                return transcript_data
+        self._count("misses")
+        return None
+
+    def put(self, content_hash: str, model_size: str, backend: str, transcript_data: Dict[str, Any]) -> None:
+        """Store a transcript, then evict old entries if the cache may be over its size limit."""
+        self._write(self._entry_path(content_hash, model_size, backend), transcript_data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate counters for this process."""
+        return {
+            **self._lookup_stats(),
+            "max_age_days": round(self.max_age_seconds / 86400, 2)
+        }
+
+# Create singleton instance
+transcript_cache = TranscriptCache()
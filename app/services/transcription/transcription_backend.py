@@ -0,0 +1,116 @@
+"""
+Transcription backend interface for abstracting speech-to-text engines.
+This allows switching between local Whisper, the OpenAI API and other engines
+without modifying the transcription service.
+"""
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+
+class TranscriptionBackend(ABC):
+    """
+    Abstract base class for transcription backends.
+
+    Implementations transcribe cached 16 kHz mono PCM (optionally a sample
+    window of it) and return a Whisper-style result dict with "text",
+    "language" and "segments". Calls go through transcribe(), which applies
+    the backend's own concurrency limit and keeps per-backend counters.
+    """
+
+    # Registry name, stored with each transcript
+    name: str = ""
+
+    # Longest audio (seconds) accepted in one request; None means no limit
+    max_chunk_seconds: Optional[float] = None
+
+    def __init__(self, max_concurrent: int = 0):
+        """
+        Args:
+            max_concurrent: Maximum concurrent requests to this backend (0 = unlimited)
+        """
+        self.max_concurrent = max_concurrent
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "requests": 0,
+            "failures": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0
+        }
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """
+        Check whether the backend can be used (dependencies installed, credentials configured).
+
+        Returns:
+            True if the backend can take requests
+        """
+        pass
+
+    @abstractmethod
+    async def _transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]],
+                          language: Optional[str]) -> Dict[str, Any]:
+        """
+        Transcribe cached PCM with this backend.
+
+        Args:
+            pcm_path: Path to a raw s16le mono 16 kHz file
+            model_size: Configured Whisper model size
+            window: (start, end) sample range to transcribe, or None for the whole file
+            language: ISO language code, or None to detect it
+
+        Returns:
+            Whisper-style result dict; timestamps relative to the window start
+        """
+        pass
+
+    def resolve_model(self, model_size: str) -> str:
+        """Model that actually runs for a configured model size (part of the transcript cache key)."""
+        return model_size
+
+    async def transcribe(self, pcm_path: str, model_size: str, window: Optional[Tuple[int, int]] = None,
+                         language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe cached PCM within this backend's concurrency limit.
+
+        Args:
+            pcm_path: Path to a raw s16le mono 16 kHz file
+            model_size: Configured Whisper model size
+            window: (start, end) sample range to transcribe, or None for the whole file
+            language: ISO language code, or None to detect it
+
+        Returns:
+            Whisper-style result dict tagged with the producing backend
+        """
+        if self.max_concurrent and self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        self._stats["requests"] += 1
+        start_time = time.perf_counter()
+        if self._semaphore:
+            await self._semaphore.acquire()
+        self._stats["in_flight"] += 1
+        try:
+            result = await self._transcribe(pcm_path, model_size, window, language)
+            result["backend"] = self.name
+            result["model"] = self.resolve_model(model_size)
+            return result
+        except Exception:
+            self._stats["failures"] += 1
+            raise
+        finally:
+            self._stats["in_flight"] -= 1
+            self._stats["total_seconds"] += time.perf_counter() - start_time
+            if self._semaphore:
+                self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get availability, limits and request counters."""
+        return {
+            "available": self.is_available(),
+            "max_concurrent": self.max_concurrent or None,
+            "max_chunk_seconds": self.max_chunk_seconds,
+            **{key: round(value, 3) if isinstance(value, float) else value
+               for key, value in self._stats.items()}
+        }
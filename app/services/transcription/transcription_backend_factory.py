@@ -0,0 +1,139 @@
+"""
+Transcription backend factory for creating and managing transcription backends.
+This allows the application to use different speech-to-text engines based on configuration.
+"""
+from typing import Dict, Type, List, Any
+import logging
+
+from app.core.config import settings
+from app.services.transcription.transcription_backend import TranscriptionBackend
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TranscriptionBackendFactory:
+    """Factory for creating and managing transcription backends."""
+    # Registry will be populated dynamically
+    _backends: Dict[str, Type[TranscriptionBackend]] = {}
+
+    # One shared instance per backend, so concurrency limits and counters are process-wide
+    _instances: Dict[str, TranscriptionBackend] = {}
+
+    # Transcriptions that had to move on to a later backend in the chain
+    _fallbacks: int = 0
+
+    @classmethod
+    def _ensure_backends_loaded(cls):
+        """Ensure backends are loaded into the registry."""
+        if not cls._backends:
+            # Import here to avoid circular imports
+            from app.services.transcription.local_whisper_backend import LocalWhisperBackend
+            from app.services.transcription.openai_backend import OpenAITranscriptionBackend
+            from app.services.transcription.int8_backend import Int8TranscriptionBackend
+            from app.services.transcription.stub_backend import StubTranscriptionBackend
+
+            cls._backends = {
+                "local_whisper": LocalWhisperBackend,
+                "openai_api": OpenAITranscriptionBackend,
+                "faster_whisper_int8": Int8TranscriptionBackend,
+                "stub": StubTranscriptionBackend,
+            }
+
+    @classmethod
+    def get_backend(cls, backend_name: str = None) -> TranscriptionBackend:
+        """
+        Get a transcription backend instance.
+
+        Args:
+            backend_name: Name of the backend to use. If None, uses the configured primary backend.
+
+        Returns:
+            Instance of a TranscriptionBackend
+        """
+        cls._ensure_backends_loaded()
+        backend_name = backend_name or cls.get_primary_backend_name()
+
+        if backend_name not in cls._backends:
+            logger.warning(f"Transcription backend '{backend_name}' not found. Using 'local_whisper' instead.")
+            backend_name = "local_whisper"
+
+        if backend_name not in cls._instances:
+            cls._instances[backend_name] = cls._backends[backend_name]()
+        return cls._instances[backend_name]
+
+    @classmethod
+    def get_primary_backend_name(cls) -> str:
+        """
+        Name of the configured primary backend.
+
+        USE_OPENAI_WHISPER=true is the older switch for the hosted API and
+        still forces "openai_api"; otherwise TRANSCRIPTION_BACKEND decides.
+        """
+        if settings.USE_OPENAI_WHISPER:
+            return "openai_api"
+        return settings.TRANSCRIPTION_BACKEND
+
+    @classmethod
+    def get_backend_chain(cls, backend_name: str = None) -> List[TranscriptionBackend]:
+        """
+        Backends to try in order: the primary, then the fallback if enabled.
+
+        Backends that are not available (missing dependency or credentials)
+        are left out, so a missing API key falls straight through to the fallback.
+
+        Args:
+            backend_name: Primary backend. If None, uses the configured primary backend.
+
+        Returns:
+            Available backends in the order they should be tried
+        """
+        names = [backend_name or cls.get_primary_backend_name()]
+        if settings.USE_FALLBACK_TRANSCRIPTION and settings.TRANSCRIPTION_FALLBACK_BACKEND not in names:
+            names.append(settings.TRANSCRIPTION_FALLBACK_BACKEND)
+
+        chain = []
+        for name in names:
+            backend = cls.get_backend(name)
+            if backend.is_available() and backend not in chain:
+                chain.append(backend)
+            elif not backend.is_available():
+                logger.debug(f"Transcription backend '{backend.name}' is not available")
+        return chain
+
+    @classmethod
+    def register_backend(cls, name: str, backend_class: Type[TranscriptionBackend]):
+        """
+        Register a new transcription backend.
+
+        Args:
+            name: Name of the backend
+            backend_class: Class of the backend (must extend TranscriptionBackend)
+        """
+        if not issubclass(backend_class, TranscriptionBackend):
+            raise ValueError(f"Backend class must inherit from TranscriptionBackend")
+
+        cls._ensure_backends_loaded()
+        cls._backends[name] = backend_class
+        cls._instances.pop(name, None)
+        logger.info(f"Registered transcription backend: {name}")
+
+    @classmethod
+    def record_fallback(cls, failed_backend: str, error: Exception):
+        """Count a transcription that moves on from a failed backend."""
+        cls._fallbacks += 1
+        logger.warning(f"Transcription backend '{failed_backend}' failed ({error}); trying the next backend")
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Get the configured chain and counters for every backend used so far."""
+        return {
+            "primary": cls.get_primary_backend_name(),
+            "fallback": settings.TRANSCRIPTION_FALLBACK_BACKEND if settings.USE_FALLBACK_TRANSCRIPTION else None,
+            "fallbacks": cls._fallbacks,
+            "backends": {name: backend.get_stats() for name, backend in cls._instances.items()}
+        }
+
+# Create a convenience function for getting the backend chain
+def get_transcription_backends() -> List[TranscriptionBackend]:
+    """Get the configured backends in fallback order."""
+    return TranscriptionBackendFactory.get_backend_chain()
@@ -1,56 +1,107 @@
 """
 Transcription Service
-Handles audio transcription using OpenAI Whisper with local model support
+Handles audio transcription through the configured transcription backends
 """
 import json
 import logging
 import asyncio
-import whisper
-import openai
 import os
+import tempfile
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database.models import Recording, CandidateSession
+from app.core.database.db import create_task_session
+from app.core.database.models import Recording, CandidateSession, Interview, Token
 from app.services.storage.storage_factory import get_storage
+from app.services.transcription.model_registry import whisper_model_registry
+from app.services.transcription.audio_preprocessor import audio_preprocessor, NormalizedAudio
+from app.services.transcription.transcript_cache import transcript_cache
+from app.services.transcription.chunked_transcriber import chunked_transcriber, AudioChunk
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory
+from app.services.transcription.confidence_cascade import confidence_cascade
+from app.services.transcription.compact_transcript import encode_transcript, decode_transcript
+from app.services.transcription.languages import TO_LANGUAGE_CODE
+from app.utils.file_utils import get_file_hash_from_path
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 class TranscriptionService:
     """
-    Service for transcribing audio recordings using OpenAI Whisper.
+    Service for transcribing audio recordings through pluggable backends
+    (local Whisper, OpenAI API, int8 faster-whisper, stub) with fallback.
     Delegates analysis to the dedicated analysis service.
     """
     
-    def __init__(self):
-        """Initialize the transcription service."""
-        self.model = None
+    def __init__(self, model_size: Optional[str] = None, backend_name: Optional[str] = None):
+        """
+        Initialize the transcription service.
+
+        Args:
+            model_size: Whisper model size to use. Defaults to settings.WHISPER_MODEL_SIZE.
+            backend_name: Primary transcription backend. Defaults to the configured backend.
+        """
+        self.model_size = model_size or settings.WHISPER_MODEL_SIZE
+        self.backend_name = backend_name
+        # Transcriptions started at upload time, keyed by recording ID
+        self._upload_tasks: Dict[int, asyncio.Task] = {}
+        self._upload_semaphore: Optional[asyncio.Semaphore] = None
         
     def _get_whisper_model(self):
-        """Get Whisper model (lazy loading)."""
-        if self.model is None:
-            try:
-                self.model = whisper.load_model("base")
-                logger.info("Whisper model loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load Whisper model: {str(e)}")
-                raise
-        return self.model
+        """Get the shared Whisper model for this service's model size."""
+        return whisper_model_registry.get_model(self.model_size)
+
+    def get_backends(self) -> List[TranscriptionBackend]:
+        """Available backends in fallback order."""
+        return TranscriptionBackendFactory.get_backend_chain(self.backend_name)
+
+    def _first_pass_model_size(self, backend: TranscriptionBackend) -> str:
+        """
+        Model size for the first pass on a backend.
+        
+        In cascade mode this is the fast model, with self.model_size kept for
+        escalations; backends with a single model (e.g. the API) skip the cascade.
+        """
+        if settings.TRANSCRIPTION_CASCADE_ENABLED and \
+                backend.resolve_model(settings.CASCADE_FAST_MODEL_SIZE) != backend.resolve_model(self.model_size):
+            return settings.CASCADE_FAST_MODEL_SIZE
+        return self.model_size
 
-    async def transcribe_recording(self, recording_id: int, db: Session) -> bool:
+    def cache_model(self, backend: TranscriptionBackend) -> str:
+        """
+        Model name this service's transcripts from a backend are cached under.
+        
+        Transcripts made elsewhere for this service (e.g. by the live
+        transcriber) must be cached under it too, or uploads won't find them.
+        """
+        first_pass = self._first_pass_model_size(backend)
+        if first_pass != self.model_size:
+            return f"{backend.resolve_model(first_pass)}-cascade-{backend.resolve_model(self.model_size)}"
+        return backend.resolve_model(self.model_size)
+
+    def _get_cached_transcript(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Cached transcript of this audio from any backend in the chain, in chain order."""
+        keys = [(self.cache_model(backend), backend.name) for backend in self.get_backends()]
+        cached = transcript_cache.get_any(content_hash, keys)
+        return self._mark_cache_hit(cached) if cached else None
+
+    async def transcribe_recording(self, recording_id: int, db: Session, use_cache: bool = True) -> bool:
         """
         Transcribe a single recording.
         
         Args:
             recording_id: Recording ID
             db: Database session
+            use_cache: Reuse a cached transcript of byte-identical audio
             
         Returns:
             Success status
         """
+        heartbeat = None
         try:
             # Get recording from database
             recording = db.query(Recording).filter(Recording.id == recording_id).first()
@@ -65,14 +116,24 @@ class TranscriptionService:
                 db.commit()
                 return False
             
-            # Update status to processing
+            # Update status to processing; the heartbeat tells other workers this one still holds it
             recording.transcription_status = "processing"
-            recording.transcription_started_at = datetime.now(timezone.utc)
+            recording.transcription_started_at = recording.transcription_heartbeat_at = datetime.now(timezone.utc)
             db.commit()
+            heartbeat = self._start_heartbeat(recording_id)
             
             logger.info(f"Starting transcription for recording {recording_id}")
             
-            # Download file for transcription
+            # Hash known from upload: a cache hit skips download, decode and inference
+            if use_cache and recording.content_hash:
+                cached = self._get_cached_transcript(recording.content_hash)
+                if cached:
+                    self.store_transcript(recording, cached, db)
+                    logger.info(f"Transcript cache hit for recording {recording_id}")
+                    return True
+            
+            # Download file for transcription (S3 downloads also fill in a missing content hash)
+            hashed_at_upload = bool(recording.content_hash)
             local_file_path = await self._download_recording_for_transcription(recording)
             if not local_file_path:
                 recording.transcription_status = "failed"
@@ -80,30 +141,40 @@ class TranscriptionService:
                 db.commit()
                 return False
             
-            # Perform transcription using local Whisper
+            # Perform transcription with the configured backends
             try:
-                model = self._get_whisper_model()
-                result = model.transcribe(local_file_path)
-                  # Prepare transcript data with detailed segments
-                segments = result.get("segments", [])
-                if segments:
-                    duration = segments[-1].get("end", 0.0)
-                else:
-                    duration = 0.0
-                    
-                transcript_data = {
-                    "text": result["text"],
-                    "language": result.get("language", "unknown"),
-                    "duration": duration,
-                    "segments": segments
-                }
+                # Recordings uploaded before hashing was added are hashed here once
+                if not hashed_at_upload:
+                    if not recording.content_hash:
+                        recording.content_hash = await asyncio.to_thread(get_file_hash_from_path, local_file_path)
+                    if use_cache:
+                        cached = self._get_cached_transcript(recording.content_hash)
+                        if cached:
+                            self.store_transcript(recording, cached, db)
+                            logger.info(f"Transcript cache hit for recording {recording_id}")
+                            return True
+                
+                # Decode once to cached 16 kHz mono PCM (ffmpeg runs in a thread)
+                normalized = await asyncio.to_thread(
+                    audio_preprocessor.normalize, local_file_path, recording.content_hash
+                )
+                
+                # A known interview language lets every backend skip language detection
+                interview = self._get_interview(recording, db)
+                language = interview.language if interview else None
+                result = await self._transcribe_normalized(normalized, recording, db, language)
+                
+                if result.get("vad"):
+                    logger.info(f"VAD skipped {result['vad']['skipped_percentage']}% of recording {recording_id}")
+                
+                # Prepare transcript data with detailed segments
+                transcript_data = self.build_transcript_data(result, normalized)
+                await asyncio.to_thread(
+                    transcript_cache.put, normalized.content_hash, result["model"], result["backend"], transcript_data
+                )
                 
                 # Store transcript in database
-                recording.transcript = json.dumps(transcript_data)
-                recording.transcription_status = "completed"
-                recording.transcription_completed_at = datetime.now(timezone.utc)
-                recording.transcription_error = None
-                db.commit()
+                self.store_transcript(recording, transcript_data, db)
                 logger.info(f"Transcription completed for recording {recording_id}")
                 return True
             except Exception as e:
@@ -127,6 +198,241 @@ class TranscriptionService:
         except Exception as e:
             logger.error(f"Unexpected error in transcription for recording {recording_id}: {str(e)}")
             return False
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+    def _start_heartbeat(self, recording_id: int) -> asyncio.Task:
+        """
+        Refresh a recording's heartbeat every settings.TRANSCRIPTION_HEARTBEAT_SECONDS until cancelled.
+        
+        Workers waiting on the recording only reclaim it once the heartbeat
+        is older than settings.TRANSCRIPTION_STALE_SECONDS.
+        """
+        async def _beat() -> None:
+            while True:
+                await asyncio.sleep(settings.TRANSCRIPTION_HEARTBEAT_SECONDS)
+                try:
+                    await asyncio.to_thread(self._touch_heartbeat, recording_id)
+                except Exception as e:
+                    logger.warning(f"Failed to refresh the heartbeat of recording {recording_id}: {e}")
+        
+        return asyncio.create_task(_beat())
+
+    def _touch_heartbeat(self, recording_id: int) -> None:
+        """Set the heartbeat of a queued or processing recording to now, in its own DB session."""
+        heartbeat_db = create_task_session()
+        try:
+            heartbeat_db.query(Recording).filter(
+                Recording.id == recording_id,
+                Recording.transcription_status.in_(["queued", "processing"])
+            ).update({Recording.transcription_heartbeat_at: datetime.now(timezone.utc)}, synchronize_session=False)
+            heartbeat_db.commit()
+        finally:
+            heartbeat_db.close()
+
+    def store_transcript(self, recording: Recording, transcript_data: Dict[str, Any], db: Session) -> None:
+        """
+        Save a finished transcript on the recording and mark it completed.
+        
+        Args:
+            recording: Recording the transcript belongs to
+            transcript_data: Transcript dict as built by the transcription pipeline
+            db: Database session (committed)
+        """
+        if settings.COMPACT_TRANSCRIPT_STORAGE:
+            recording.transcript, sizes = encode_transcript(transcript_data)
+            logger.info(f"Stored compact transcript for recording {recording.id}: {sizes['compact_bytes']} bytes "
+                        f"instead of {sizes['json_bytes']} ({sizes['saved_bytes']} bytes saved)")
+        else:
+            recording.transcript = json.dumps(transcript_data)
+        recording.transcript_chunks = None
+        recording.transcription_status = "completed"
+        recording.transcription_completed_at = datetime.now(timezone.utc)
+        recording.transcription_error = None
+        db.commit()
+        
+        try:
+            self._learn_interview_language(recording, db)
+        except Exception as e:
+            logger.warning(f"Could not update interview language from recording {recording.id}: {e}")
+
+    def _get_interview(self, recording: Recording, db: Session) -> Optional[Interview]:
+        """Interview a recording belongs to (recording -> session -> token -> interview)."""
+        return db.query(Interview).join(Token, Token.interview_id == Interview.id).join(
+            CandidateSession, CandidateSession.token_id == Token.id
+        ).filter(CandidateSession.id == recording.session_id).first()
+
+    def _learn_interview_language(self, recording: Recording, db: Session) -> None:
+        """
+        Pin an interview's language once its first transcripts agree on it.
+        
+        Only interviews without a language are updated; after
+        settings.INTERVIEW_LANGUAGE_LEARN_SAMPLES completed transcripts all
+        report the same language code, later recordings skip detection.
+        """
+        samples = settings.INTERVIEW_LANGUAGE_LEARN_SAMPLES
+        if samples <= 0:
+            return
+        interview = self._get_interview(recording, db)
+        if interview is None or interview.language:
+            return
+        
+        transcripts = db.query(Recording.transcript).join(
+            CandidateSession, CandidateSession.id == Recording.session_id
+        ).join(Token, Token.id == CandidateSession.token_id).filter(
+            Token.interview_id == interview.id,
+            Recording.transcription_status == "completed",
+            Recording.transcript.isnot(None)
+        ).order_by(Recording.id).limit(samples).all()
+        if len(transcripts) < samples:
+            return
+        
+        languages = {self._language_code(decode_transcript(transcript).language) for (transcript,) in transcripts}
+        language = languages.pop() if len(languages) == 1 else None
+        if language:
+            interview.language = language
+            interview.language_source = "detected"
+            db.commit()
+            logger.info(f"Pinned language '{interview.language}' for interview {interview.id} "
+                        f"after {samples} transcripts")
+
+    def _language_code(self, language: Optional[str]) -> Optional[str]:
+        """
+        ISO code of a detected language, or None if it cannot be mapped.
+
+        The hosted API reports full names ("english"); these are mapped with
+        Whisper's language table.
+        """
+        if not language:
+            return None
+        language = language.strip().lower()
+        language = TO_LANGUAGE_CODE.get(language, language)
+        if language.isalpha() and 2 <= len(language) <= 3:
+            return language
+        return None
+
+    async def _transcribe_normalized(self, normalized: NormalizedAudio, recording: Optional[Recording] = None,
+                                     db: Optional[Session] = None, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe normalized audio with the first backend in the chain that succeeds.
+        
+        Args:
+            normalized: Decoded recording
+            recording: Recording to save chunk progress on, if any
+            db: Database session for chunk progress
+            language: Known ISO-639-1 language; skips language detection
+            
+        Returns:
+            Result tagged with the backend and model that produced it
+        """
+        backends = self.get_backends()
+        if not backends:
+            raise RuntimeError("No transcription backend is available")
+        
+        last_error = None
+        for backend in backends:
+            try:
+                # Long recordings (or ones over the backend's request cap) are chunked
+                # so finished work survives a crash
+                model_size = self._first_pass_model_size(backend)
+                chunk_limit = min(settings.TRANSCRIPTION_CHUNK_MIN_SECONDS, backend.max_chunk_seconds or float("inf"))
+                if normalized.duration > chunk_limit:
+                    result = await self._transcribe_chunked(backend, normalized, recording, db, model_size, language)
+                else:
+                    result = await backend.transcribe(normalized.pcm_path, model_size, language=language)
+                result["language_pinned"] = language is not None
+                
+                # Cascade: only the segments the fast model is unsure about go to the larger model
+                if model_size != self.model_size:
+                    result = await confidence_cascade.escalate(backend, normalized, result, self.model_size)
+                return result
+            except Exception as e:
+                last_error = e
+                if backend is not backends[-1]:
+                    TranscriptionBackendFactory.record_fallback(backend.name, e)
+        raise last_error
+
+    async def _transcribe_chunked(self, backend: TranscriptionBackend, normalized: NormalizedAudio,
+                                  recording: Optional[Recording], db: Optional[Session],
+                                  model_size: Optional[str] = None, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe a long recording in parallel chunks, saving each finished chunk on the recording.
+        
+        A retry of a failed attempt resumes from the saved chunks as long as the
+        audio, model size and backend are unchanged.
+        """
+        model_size = model_size or self.model_size
+        progress = None
+        if recording is not None and recording.transcript_chunks:
+            progress = json.loads(recording.transcript_chunks)
+        plan_key = {
+            "content_hash": normalized.content_hash,
+            "model_size": model_size,
+            "backend": backend.name,
+            "vad": settings.VAD_ENABLED
+        }
+        
+        progress_lock = asyncio.Lock()
+        
+        async def save_progress(chunk_progress: Dict[str, Any]) -> None:
+            if recording is None:
+                return
+            # Chunks finish on the event loop, so the progress is copied here; serializing the
+            # growing JSON and committing it run in a thread, one save at a time
+            snapshot = {**chunk_progress, "completed": dict(chunk_progress["completed"])}
+            async with progress_lock:
+                recording.transcript_chunks = await asyncio.to_thread(json.dumps, snapshot)
+                await asyncio.to_thread(db.commit)
+        
+        async def transcribe_chunk(chunk: AudioChunk) -> Dict[str, Any]:
+            return await backend.transcribe(
+                normalized.pcm_path, model_size, window=(chunk.start_sample, chunk.end_sample), language=language
+            )
+        
+        max_chunk_seconds = min(settings.TRANSCRIPTION_CHUNK_MAX_SECONDS, backend.max_chunk_seconds or float("inf"))
+        result = await chunked_transcriber.transcribe(
+            normalized.pcm_path, transcribe_chunk, plan_key, progress, save_progress, max_chunk_seconds
+        )
+        result["backend"] = backend.name
+        result["model"] = backend.resolve_model(model_size)
+        return result
+
+    @staticmethod
+    def _mark_cache_hit(transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Flag a transcript served from the transcript cache."""
+        processing = dict(transcript_data.get("processing") or {})
+        processing["transcript_cache_hit"] = True
+        return {**transcript_data, "processing": processing}
+
+    def build_transcript_data(self, result: Dict[str, Any], normalized: NormalizedAudio) -> Dict[str, Any]:
+        """
+        Build the stored transcript payload from a Whisper result.
+        
+        Decode and inference time are recorded separately so decode cost
+        (zero on a cache hit) can be told apart from model cost.
+        """
+        segments = result.get("segments", [])
+        # Use the end time of the last segment as total duration
+        duration = segments[-1].get("end", 0.0) if segments else 0.0
+        
+        return {
+            "text": result["text"],
+            "language": result.get("language", "unknown"),
+            "duration": duration,
+            "segments": segments,
+            "processing": {
+                **normalized.to_metadata(),
+                "inference_seconds": result.get("inference_seconds"),
+                "model_size": self.model_size,
+                "backend": result.get("backend"),
+                "model": result.get("model"),
+                "vad": result.get("vad"),
+                "chunks": result.get("chunks", 1),
+                "language_pinned": result.get("language_pinned", False),
+                "cascade": result.get("cascade")
+            }
+        }
 
     async def _download_recording_for_transcription(self, recording: Recording) -> Optional[str]:
         """
@@ -142,15 +448,29 @@ class TranscriptionService:
             if recording.storage_type == "s3":
                 # Download from S3 storage
                 storage = get_storage()
-                if hasattr(storage, 'download_bytes'):
+                file_extension = os.path.splitext(recording.file_path)[1] or '.wav'
+                if hasattr(storage, 'download_to_file'):
+                    # Stream the object to a temporary file in chunks, so memory stays
+                    # flat however large the video is (ffmpeg needs a seekable input for MP4)
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
+                        try:
+                            download = await storage.download_to_file(recording.file_path, temp_file)
+                        except Exception:
+                            temp_file.close()
+                            os.unlink(temp_file.name)
+                            raise
+                        temp_file_path = temp_file.name
+                    
+                    # The hash comes for free while streaming
+                    if not recording.content_hash:
+                        recording.content_hash = download["sha256"]
+                    logger.info(f"Streamed {download['bytes']} bytes from S3 to temporary location: {temp_file_path}")
+                    return temp_file_path
+                elif hasattr(storage, 'download_bytes'):
                     # Download file bytes from S3
                     file_bytes = await storage.download_bytes(recording.file_path)
                     
                     # Create temporary local file for transcription
-                    import tempfile
-                    import os
-                    file_extension = os.path.splitext(recording.file_path)[1] or '.wav'
-                    
                     with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
                         temp_file.write(file_bytes)
                         temp_file_path = temp_file.name
@@ -172,16 +492,157 @@ class TranscriptionService:
             logger.error(f"Failed to download recording {recording.id}: {str(e)}")
             return None
 
-    async def transcribe_session_recordings(self, session_id: int, db: Session) -> List[Dict[str, Any]]:
+    async def transcribe_recordings(self, recording_ids: List[int],
+                                    max_concurrency: Optional[int] = None) -> Dict[int, Any]:
         """
-        Transcribe all recordings for a session.
+        Transcribe recordings concurrently, each task with its own short-lived DB session.
         
         Args:
-            session_id: Session ID
+            recording_ids: IDs of the recordings to transcribe
+            max_concurrency: Concurrent transcriptions. Defaults to settings.SESSION_TRANSCRIPTION_CONCURRENCY.
+            
+        Returns:
+            Mapping of recording ID to success flag (or the exception raised for it)
+        """
+        if not recording_ids:
+            return {}
+        
+        limit = max(1, max_concurrency or settings.SESSION_TRANSCRIPTION_CONCURRENCY)
+        logger.info(f"Transcribing {len(recording_ids)} recordings with concurrency {limit}")
+        semaphore = asyncio.Semaphore(limit)
+        
+        async def _transcribe_with_own_session(recording_id: int) -> bool:
+            async with semaphore:
+                task_db = create_task_session()
+                try:
+                    return await self.transcribe_recording(recording_id, task_db)
+                finally:
+                    task_db.close()
+        
+        results = await asyncio.gather(
+            *[_transcribe_with_own_session(recording_id) for recording_id in recording_ids],
+            return_exceptions=True
+        )
+        return dict(zip(recording_ids, results))
+
+    def enqueue_recording(self, recording_id: int) -> asyncio.Task:
+        """
+        Start transcribing a just-uploaded recording in the background.
+        
+        Must be called from the event loop. Upload transcriptions share one
+        concurrency limit (settings.SESSION_TRANSCRIPTION_CONCURRENCY) and each
+        uses its own short-lived DB session.
+        
+        Args:
+            recording_id: Recording ID
+            
+        Returns:
+            The task transcribing the recording
+        """
+        task = self._upload_tasks.get(recording_id)
+        if task and not task.done():
+            return task
+        
+        if self._upload_semaphore is None:
+            self._upload_semaphore = asyncio.Semaphore(max(1, settings.SESSION_TRANSCRIPTION_CONCURRENCY))
+        
+        async def _transcribe_upload() -> bool:
+            # Queued rows keep a heartbeat too, so a long queue isn't taken for a dead worker
+            heartbeat = self._start_heartbeat(recording_id)
+            try:
+                await self._upload_semaphore.acquire()
+            finally:
+                heartbeat.cancel()
+            try:
+                task_db = create_task_session()
+                try:
+                    return await self.transcribe_recording(recording_id, task_db)
+                finally:
+                    task_db.close()
+            finally:
+                self._upload_semaphore.release()
+        
+        def _on_done(done_task: asyncio.Task) -> None:
+            if self._upload_tasks.get(recording_id) is done_task:
+                del self._upload_tasks[recording_id]
+            if not done_task.cancelled() and done_task.exception():
+                logger.error(f"Upload transcription failed for recording {recording_id}: {done_task.exception()}")
+        
+        task = asyncio.create_task(_transcribe_upload())
+        self._upload_tasks[recording_id] = task
+        task.add_done_callback(_on_done)
+        logger.info(f"Queued transcription for uploaded recording {recording_id}")
+        return task
+
+    async def wait_for_transcriptions(self, recording_ids: List[int], db: Session,
+                                      timeout_seconds: Optional[float] = None) -> List[int]:
+        """
+        Wait until none of these recordings is queued or processing, in any worker.
+        
+        Upload transcriptions may run in another worker process, so progress is
+        read from the database. Rows whose heartbeat is older than
+        settings.TRANSCRIPTION_STALE_SECONDS (their worker went away) and, once
+        the timeout has passed, all rows still in flight are reclaimed: set back
+        to pending so the caller transcribes them.
+        
+        Args:
+            recording_ids: IDs of the recordings to wait for
             db: Database session
+            timeout_seconds: Longest wait. Defaults to settings.TRANSCRIPTION_WAIT_TIMEOUT_SECONDS.
+            
+        Returns:
+            IDs of the recordings that are not completed
+        """
+        if not recording_ids:
+            return []
+        
+        timeout = settings.TRANSCRIPTION_WAIT_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        in_flight = ["queued", "processing"]
+        
+        while True:
+            timed_out = loop.time() >= deadline
+            reclaim = db.query(Recording).filter(
+                Recording.id.in_(recording_ids),
+                Recording.transcription_status.in_(in_flight)
+            )
+            if not timed_out:
+                stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.TRANSCRIPTION_STALE_SECONDS)
+                reclaim = reclaim.filter(
+                    func.coalesce(Recording.transcription_heartbeat_at, Recording.transcription_started_at,
+                                  Recording.created_at) < stale_before
+                )
+            reclaimed = reclaim.update({Recording.transcription_status: "pending"}, synchronize_session=False)
+            db.commit()
+            if reclaimed:
+                logger.warning(f"Reclaimed {reclaimed} transcription(s) "
+                               f"{'still running at the timeout' if timed_out else 'left behind by another worker'}")
+            
+            statuses = db.query(Recording.id, Recording.transcription_status).filter(
+                Recording.id.in_(recording_ids)
+            ).all()
+            if not any(status in in_flight for _, status in statuses):
+                return [recording_id for recording_id, status in statuses if status != "completed"]
+            
+            logger.info(f"Waiting for {sum(status in in_flight for _, status in statuses)} upload transcription(s) still in progress")
+            await asyncio.sleep(settings.TRANSCRIPTION_WAIT_POLL_SECONDS)
+
+    async def transcribe_session_recordings(self, session_id: int, db: Session,
+                                            max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe all recordings for a session with bounded concurrency.
+        
+        Each recording is transcribed in its own task with its own short-lived
+        database session, and at most max_concurrency tasks run at once.
+        
+        Args:
+            session_id: Session ID
+            db: Database session (used for the initial lookup and the final status read)
+            max_concurrency: Concurrent transcriptions. Defaults to settings.SESSION_TRANSCRIPTION_CONCURRENCY.
             
         Returns:
-            List of transcription results
+            List of transcription results, one per recording in the session
         """
         # Get all recordings for the session
         recordings = db.query(Recording).filter(Recording.session_id == session_id).all()
@@ -190,35 +651,37 @@ class TranscriptionService:
             logger.warning(f"No recordings found for session {session_id}")
             return []
         
-        logger.info(f"Starting transcription for {len(recordings)} recordings in session {session_id}")
-        
-        # Create transcription tasks
-        tasks = []
+        pending_ids = []
         for recording in recordings:
             if recording.transcription_status in ["completed", "processing"]:
                 logger.info(f"Skipping recording {recording.id} - already {recording.transcription_status}")
                 continue
-            tasks.append(self.transcribe_recording(recording.id, db))
+            pending_ids.append(recording.id)
         
-        # Execute transcriptions in parallel (with limit)
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-        else:
-            results = []
+        # Key results by recording ID so skipped recordings cannot shift the mapping
+        results_by_id = await self.transcribe_recordings(pending_ids, max_concurrency)
+        
+        # Task sessions committed the new statuses; reload them into the caller's session
+        db.expire_all()
         
         # Prepare results summary
         transcription_results = []
-        for recording, result in zip(recordings, results):
+        for recording in recordings:
+            skipped = recording.id not in results_by_id
+            result = results_by_id.get(recording.id)
             if isinstance(result, Exception):
                 logger.error(f"Exception in transcription for recording {recording.id}: {result}")
                 success = False
+            elif skipped:
+                success = recording.transcription_status == "completed"
             else:
-                success = result
+                success = bool(result)
             
             transcription_results.append({
                 "recording_id": recording.id,
                 "question_id": recording.question_id,
                 "success": success,
+                "skipped": skipped,
                 "status": recording.transcription_status
             })
         logger.info(f"Transcription completed for session {session_id}. "
@@ -293,12 +756,13 @@ class TranscriptionService:
             "completed_percentage": (status_counts.get("completed", 0) / len(recordings)) * 100,            "ready_for_analysis": status_counts.get("completed", 0) == len(recordings)
         }
 
-    def transcribe_file(self, file_path: str) -> Dict[str, Any]:
+    def transcribe_file(self, file_path: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Transcribe a file directly (for testing purposes).
         
         Args:
             file_path: Path to the audio/video file
+            use_cache: Reuse a cached transcript of byte-identical audio
             
         Returns:
             Dict with transcription results
@@ -306,24 +770,19 @@ class TranscriptionService:
         try:
             if not os.path.exists(file_path):
                 return {"error": f"File not found: {file_path}"}
-              # Load and transcribe using local Whisper model
-            model = self._get_whisper_model()
-            result = model.transcribe(file_path)
+            content_hash = get_file_hash_from_path(file_path)
+            if use_cache:
+                cached = self._get_cached_transcript(content_hash)
+                if cached:
+                    return cached
             
-            # Calculate duration from segments if available
-            segments = result.get("segments", [])
-            if segments:
-                # Use the end time of the last segment as total duration
-                duration = segments[-1].get("end", 0.0)
-            else:
-                duration = 0.0
+            # Decode once to cached PCM, then transcribe with the configured backends
+            normalized = audio_preprocessor.normalize(file_path, content_hash)
+            result = asyncio.run(self._transcribe_normalized(normalized))
             
-            return {
-                "text": result["text"],
-                "language": result.get("language", "unknown"),
-                "duration": duration,
-                "segments": segments
-            }
+            transcript_data = self.build_transcript_data(result, normalized)
+            transcript_cache.put(content_hash, result["model"], result["backend"], transcript_data)
+            return transcript_data
             
         except Exception as e:
             logger.error(f"Direct transcription failed for {file_path}: {str(e)}")
@@ -0,0 +1,227 @@
+"""
+Voice Activity Detection
+NumPy-vectorized energy VAD that trims long silences before inference and maps
+segment timestamps back to the original recording timeline
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TrimmedAudio:
+    """Audio with long silences removed, plus the mapping back to the original timeline."""
+    audio: np.ndarray
+    sample_rate: int
+    original_starts: np.ndarray  # Start of each kept region in the original audio (seconds)
+    trimmed_starts: np.ndarray   # Start of each kept region in the trimmed audio (seconds)
+    original_duration: float
+
+    @property
+    def trimmed_duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def skipped_percentage(self) -> float:
+        if self.original_duration <= 0:
+            return 0.0
+        return round(100.0 * (1.0 - self.trimmed_duration / self.original_duration), 2)
+
+    def to_original_time(self, t: float, at_region_end: bool = False) -> float:
+        """
+        Map a time in the trimmed audio back to the original recording.
+
+        Args:
+            t: Time in seconds in the trimmed audio
+            at_region_end: Resolve a time exactly on a region boundary to the end of the
+                           earlier region (used for segment end times) rather than the
+                           start of the later one
+
+        Returns:
+            Time in seconds in the original audio
+        """
+        side = "left" if at_region_end else "right"
+        index = max(0, int(np.searchsorted(self.trimmed_starts, t, side=side)) - 1)
+        return float(self.original_starts[index] + (t - self.trimmed_starts[index]))
+
+    def remap_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rewrite segment (and word) timestamps onto the original timeline in place.
+
+        Pauses removed by trimming reappear as gaps between segments, so pause
+        metrics computed from the segments still describe the real recording.
+        """
+        for segment in segments:
+            if "start" in segment:
+                segment["start"] = round(self.to_original_time(segment["start"]), 3)
+            if "end" in segment:
+                segment["end"] = round(self.to_original_time(segment["end"], at_region_end=True), 3)
+            for word in segment.get("words") or []:
+                if "start" in word:
+                    word["start"] = round(self.to_original_time(word["start"]), 3)
+                if "end" in word:
+                    word["end"] = round(self.to_original_time(word["end"], at_region_end=True), 3)
+        return segments
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """VAD statistics stored alongside the transcript."""
+        return {
+            "original_duration": round(self.original_duration, 3),
+            "trimmed_duration": round(self.trimmed_duration, 3),
+            "skipped_percentage": self.skipped_percentage,
+            "speech_regions": len(self.original_starts)
+        }
+
+def _runs(mask: np.ndarray):
+    """Start (inclusive) and end (exclusive) indices of the True runs in a boolean mask."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def frame_levels_db(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30,
+                    block_seconds: float = 60.0) -> np.ndarray:
+    """
+    Per-frame RMS level in dBFS, computed block by block.
+
+    Working in blocks keeps peak memory flat, so an hour-long recording can be
+    scanned straight from a memory-mapped PCM file.
+
+    Args:
+        audio: Float32 samples in [-1, 1] or raw int16 PCM samples
+        sample_rate: Sample rate of the audio
+        frame_ms: Analysis frame length in milliseconds
+        block_seconds: Audio processed per block
+
+    Returns:
+        Array with one level per full frame
+    """
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame_len
+    scale = 1.0 / 32768.0 if audio.dtype == np.int16 else 1.0
+    block_frames = max(1, int(block_seconds * 1000 / frame_ms))
+
+    levels = np.empty(n_frames, dtype=np.float64)
+    for first in range(0, n_frames, block_frames):
+        last = min(n_frames, first + block_frames)
+        frames = np.asarray(audio[first * frame_len:last * frame_len], dtype=np.float64).reshape(last - first, frame_len)
+        rms = np.sqrt(np.mean(np.square(frames * scale), axis=1)) + 1e-10
+        levels[first:last] = 20.0 * np.log10(rms)
+    return levels
+
+def speech_threshold(levels_db: np.ndarray, threshold_margin_db: float = 12.0,
+                     absolute_floor_db: float = -55.0, noise_percentile: float = 10.0,
+                     speech_range_db: float = 24.0, noise_floor_db: Optional[float] = None,
+                     speech_level_db: Optional[float] = None) -> float:
+    """
+    Level above which a frame counts as speech.
+
+    The noise floor (a low percentile frame level) plus a margin, but never
+    closer than speech_range_db to the speech level (90th percentile): when a
+    recording has no real silence, the low percentile lands on quiet speech,
+    and only frames far below the loud ones may be taken for background.
+    Never below the absolute floor. Callers that track the noise floor and
+    speech level across calls pass them in instead of the percentiles.
+    """
+    if noise_floor_db is None:
+        noise_floor_db = float(np.percentile(levels_db, noise_percentile))
+    if speech_level_db is None:
+        speech_level_db = float(np.percentile(levels_db, 90))
+    return max(min(noise_floor_db + threshold_margin_db, speech_level_db - speech_range_db), absolute_floor_db)
+
+def detect_speech(audio: np.ndarray, sample_rate: int = 16000, frame_ms: int = 30,
+                  min_silence: Optional[float] = None, padding: Optional[float] = None,
+                  threshold_margin_db: float = 12.0, absolute_floor_db: float = -55.0) -> np.ndarray:
+    """
+    Find speech regions by frame energy.
+
+    A frame counts as speech when its level is threshold_margin_db above the
+    recording's noise floor (10th percentile frame level) or within 24 dB of
+    its speech level, and above an absolute floor.
+    Silences shorter than min_silence are kept, and every region is padded so
+    word onsets and trailing consonants are not clipped.
+
+    Args:
+        audio: Float32 mono samples in [-1, 1]
+        sample_rate: Sample rate of the audio
+        frame_ms: Analysis frame length in milliseconds
+        min_silence: Shortest silence (seconds) that is removed. Defaults to settings.VAD_MIN_SILENCE_SECONDS.
+        padding: Seconds of context kept around speech. Defaults to settings.VAD_PADDING_SECONDS.
+        threshold_margin_db: Level above the noise floor treated as speech
+        absolute_floor_db: Level (dBFS) below which a frame is never speech
+
+    Returns:
+        Array of shape (n, 2) with [start, end) sample indices of speech regions
+    """
+    min_silence = settings.VAD_MIN_SILENCE_SECONDS if min_silence is None else min_silence
+    padding = settings.VAD_PADDING_SECONDS if padding is None else padding
+
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.array([[0, len(audio)]], dtype=np.int64)
+
+    level_db = frame_levels_db(audio, sample_rate, frame_ms)
+    speech = level_db > speech_threshold(level_db, threshold_margin_db, absolute_floor_db)
+    if not speech.any():
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Keep short pauses: fill interior silent runs shorter than min_silence
+    silent_starts, silent_ends = _runs(~speech)
+    interior = (silent_starts > 0) & (silent_ends < n_frames)
+    short = (silent_ends - silent_starts) * frame_len < min_silence * sample_rate
+    fill = np.zeros(n_frames + 1, dtype=np.int64)
+    np.add.at(fill, silent_starts[interior & short], 1)
+    np.add.at(fill, silent_ends[interior & short], -1)
+    speech |= np.cumsum(fill[:-1]) > 0
+
+    # Pad speech regions on both sides
+    pad_frames = int(round(padding * sample_rate / frame_len))
+    if pad_frames > 0:
+        speech = np.convolve(speech, np.ones(2 * pad_frames + 1), mode="same") > 0
+
+    starts, ends = _runs(speech)
+    regions = np.stack([starts * frame_len, ends * frame_len], axis=1).astype(np.int64)
+    # A region that reaches the last full frame also keeps the partial tail frame
+    if ends[-1] == n_frames:
+        regions[-1, 1] = len(audio)
+    return regions
+
+def trim_silence(audio: np.ndarray, sample_rate: int = 16000, **kwargs) -> TrimmedAudio:
+    """
+    Drop long silences from audio before inference.
+
+    If no speech is detected the audio is returned untouched, so the model
+    still makes the final call on near-silent recordings.
+
+    Args:
+        audio: Float32 mono samples in [-1, 1]
+        sample_rate: Sample rate of the audio
+        **kwargs: Overrides passed to detect_speech()
+
+    Returns:
+        TrimmedAudio with the kept samples and the timeline mapping
+    """
+    original_duration = len(audio) / sample_rate
+    regions = detect_speech(audio, sample_rate, **kwargs)
+
+    if len(regions) == 0:
+        regions = np.array([[0, len(audio)]], dtype=np.int64)
+
+    lengths = regions[:, 1] - regions[:, 0]
+    trimmed = np.concatenate([audio[start:end] for start, end in regions]) if len(regions) > 1 \
+        else audio[regions[0, 0]:regions[0, 1]]
+    trimmed_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / sample_rate
+
+    return TrimmedAudio(
+        audio=trimmed,
+        sample_rate=sample_rate,
+        original_starts=regions[:, 0] / sample_rate,
+        trimmed_starts=trimmed_starts,
+        original_duration=original_duration
+    )
@@ -0,0 +1,157 @@
+"""
+Disk cache base class: JSON entries in one directory, with an age limit and
+least-recently-used eviction past a size limit.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class JsonDiskCache:
+    """
+    One JSON file per entry, written atomically.
+
+    Reads touch the entry so size eviction drops the least recently used
+    first. Writes only scan the directory when the bytes written since the
+    last scan may have pushed the cache over its size limit, or when
+    evict_interval_seconds have passed (which also catches expired entries
+    and other processes' writes). The methods do blocking file I/O; async
+    callers run them with asyncio.to_thread. Subclasses name their entries
+    and add their own counters and statistics.
+    """
+
+    # Name used in log messages
+    label = "cache"
+    # Longest time between directory scans while entries are being written
+    evict_interval_seconds = 600.0
+
+    def __init__(self, cache_dir: str, max_size_bytes: int, max_age_seconds: float, counters: Dict[str, Any]):
+        """
+        Args:
+            cache_dir: Cache directory, created if missing
+            max_size_bytes: Size limit
+            max_age_seconds: Age limit
+            counters: Initial counters; hits, misses, stores, evictions and expired are always kept
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, **counters}
+        # Cache size as of the last scan plus everything written since; None until the first scan
+        self._size_estimate: Optional[int] = None
+        self._last_evict = time.monotonic()
+
+    def _read(self, path: str, count: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Read an entry; expired and unreadable entries are removed.
+
+        Args:
+            path: Entry file
+            count: Count the hit or miss (callers trying several entries count the lookup themselves)
+        """
+        entry = None
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.unlink(path)
+                self._count("expired")
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                # Touch the entry so size eviction drops the least recently used first
+                os.utime(path, None)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable {self.label} entry {path}: {e}")
+            self._discard(path)
+
+        if count:
+            self._count("hits" if entry is not None else "misses")
+        return entry
+
+    def _write(self, path: str, entry: Dict[str, Any]) -> None:
+        """Store an entry, then evict old entries if the cache may be over its size limit."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(suffix=".json.part", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write {self.label} entry {path}: {e}")
+            return
+
+        with self._lock:
+            self._counters["stores"] += 1
+            if self._size_estimate is not None:
+                # Overwrites are counted in full, so a scan may come early but never late
+                self._size_estimate += written
+            due = self._size_estimate is None or self._size_estimate > self.max_size_bytes or \
+                time.monotonic() - self._last_evict >= self.evict_interval_seconds
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries and, if still over the size limit, the least recently used ones.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    removed += self._discard(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                removed += self._discard(path)
+                total_size -= size
+
+            self._counters["evictions"] += removed
+            self._size_estimate = total_size
+            self._last_evict = time.monotonic()
+        return removed
+
+    def _discard(self, path: str) -> int:
+        try:
+            os.unlink(path)
+            return 1
+        except OSError:
+            return 0
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _lookup_stats(self) -> Dict[str, Any]:
+        """Counters plus lookups, hit rate and the size limit."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **{key: round(value, 6) if isinstance(value, float) else value for key, value in self._counters.items()},
+            "lookups": lookups,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            "max_size_mb": round(self.max_size_bytes / 1024 ** 2, 1)
+        }
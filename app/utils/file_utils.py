@@ -112,6 +112,25 @@ def get_file_hash(file_content: bytes, algorithm: str = 'sha256') -> str:
     return hash_obj.hexdigest()
 
 
+def get_file_hash_from_path(file_path: str, algorithm: str = 'sha256', chunk_size: int = 1024 * 1024) -> str:
+    """
+    Generate a hash of a file on disk without loading it into memory.
+    
+    Args:
+        file_path: Path to the file
+        algorithm: Hash algorithm to use ('sha256', 'md5', etc.)
+        chunk_size: Number of bytes read per iteration
+        
+    Returns:
+        Hexadecimal hash string
+    """
+    hash_obj = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hash_obj.update(chunk)
+    return hash_obj.hexdigest()
+
+
 def validate_file_size(file_content: bytes, max_size_mb: int = 100) -> bool:
     """
     Validate that file size is within limits.
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration, picked up automatically from the working directory.
+
+Worker count comes from WEB_CONCURRENCY, which gunicorn reads on its own.
+With WHISPER_PRELOAD_IN_MASTER the Whisper model is loaded once in the master
+before workers are forked, so all workers share its weights copy-on-write
+instead of each holding a private copy. Only the model is preloaded, not the
+app: importing app.main opens database connections that must not be shared
+across forks.
+"""
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger("gunicorn.error")
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    """Load the shared model in the master, before any worker is forked."""
+    if not settings.WHISPER_PRELOAD_IN_MASTER:
+        return
+    if settings.INFERENCE_EXECUTOR_MODE != "thread":
+        # Process-mode pools are spawned and load their own models, so nothing would be shared
+        logger.warning("WHISPER_PRELOAD_IN_MASTER needs INFERENCE_EXECUTOR_MODE=thread; skipping preload")
+        return
+
+    from app.services.transcription.model_registry import whisper_model_registry
+    stats = whisper_model_registry.preload_for_fork()
+    logger.info(f"Preloaded Whisper model(s) for workers: {stats['loaded_models']}")
+
+
+def post_fork(server, worker):
+    """Give each worker its share of the cores (the master ran single-threaded)."""
+    if settings.WHISPER_PRELOAD_IN_MASTER and settings.INFERENCE_EXECUTOR_MODE == "thread":
+        from app.services.transcription.thread_budget import thread_budget
+        thread_budget.apply("web_worker")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for pinned-language transcription.
+
+Transcribes each answer video in tests/test_video/ with the local Whisper model,
+once with language detection and once with the language pinned (as happens
+once an interview has a language), and reports the per-recording latency saved.
+
+Usage:
+    python tests/benchmark_language_pinning.py --model base --language en --repeats 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import audio_preprocessor
+from app.services.transcription.inference_executor import run_transcription
+from app.services.transcription.model_registry import whisper_model_registry
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+
+
+def _time_transcription(pcm_path: str, model_size: str, language: str, repeats: int) -> float:
+    """Median wall time of a full transcription."""
+    options = {"language": language} if language else {}
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        run_transcription(pcm_path, model_size, options, trim_silence=settings.VAD_ENABLED)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings)
+
+
+def run_benchmark(files, model_size: str, language: str, repeats: int):
+    """Benchmark detected vs pinned language for each file."""
+    # Load the model up front so the first measurement does not include it
+    whisper_model_registry.warm_up([model_size])
+
+    recordings = []
+    for file_path in files:
+        normalized = audio_preprocessor.normalize(str(file_path))
+        detected = _time_transcription(normalized.pcm_path, model_size, None, repeats)
+        pinned = _time_transcription(normalized.pcm_path, model_size, language, repeats)
+        recordings.append({
+            "file": Path(file_path).name,
+            "audio_seconds": round(normalized.duration, 2),
+            "detected_language_seconds": round(detected, 3),
+            "pinned_language_seconds": round(pinned, 3),
+            "saved_seconds": round(detected - pinned, 3),
+            "saved_percentage": round(100.0 * (detected - pinned) / detected, 1) if detected else 0.0
+        })
+        print(f"{recordings[-1]['file']}: {detected:.2f}s detected, {pinned:.2f}s pinned")
+
+    return {
+        "model_size": model_size,
+        "language": language,
+        "repeats": repeats,
+        "recordings": recordings,
+        "mean_saved_seconds_per_recording": round(
+            statistics.mean(r["saved_seconds"] for r in recordings), 3) if recordings else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pinned-language transcription")
+    parser.add_argument("files", nargs="*", help="Audio/video files (default: tests/test_video/*)")
+    parser.add_argument("--model", default=settings.WHISPER_MODEL_SIZE, help="Whisper model size")
+    parser.add_argument("--language", default="en", help="Language code to pin")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per configuration (median is reported)")
+    args = parser.parse_args()
+
+    files = args.files
+    if not files:
+        video_dir = Path(__file__).parent / "test_video"
+        files = sorted(f for ext in VIDEO_EXTENSIONS for f in video_dir.glob(f"*{ext}"))
+    if not files:
+        print("No input files found")
+        return 1
+
+    results = run_benchmark(files, args.model, args.language, args.repeats)
+
+    results_dir = Path(__file__).parent / "test_results"
+    results_dir.mkdir(exist_ok=True)
+    output_file = results_dir / f"language_pinning_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for sharing the Whisper model across forked workers.
+
+For each worker count, forks N workers the way gunicorn does and measures total
+memory once every worker has loaded the model and run one decode:
+- per_worker: each worker loads its own copy (the default)
+- preloaded: the parent loads the model first (WHISPER_PRELOAD_IN_MASTER) and
+  workers share the weights through copy-on-write pages
+
+RSS counts shared pages once per process, so it overstates the preloaded case;
+PSS (shared pages split between the processes mapping them) and USS (private
+pages) show the real footprint. Linux only.
+
+--synthetic-model-mb replaces Whisper with a read-only array of that size,
+which checks the fork/sharing mechanics on machines without Whisper installed.
+
+Usage:
+    python tests/benchmark_model_sharing.py --model base --workers 1 2 4
+    python tests/benchmark_model_sharing.py --synthetic-model-mb 300 --workers 1 2 4 8
+"""
+import os
+import gc
+import sys
+import json
+import argparse
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List
+
+import numpy as np
+import psutil
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.transcription.inference_executor import run_transcription
+from app.services.transcription.model_registry import whisper_model_registry
+from benchmark_transcription_throughput import synthetic_speech
+
+# Synthetic weights held by the parent in preloaded mode
+_synthetic_model = None
+
+
+def _load_synthetic_model(size_mb: int) -> np.ndarray:
+    # Random bytes, so every page is really allocated rather than mapped to the zero page
+    return np.random.default_rng(0).integers(0, 255, size_mb * 1024 * 1024, dtype=np.uint8)
+
+
+def _worker(mode: str, model_size: str, synthetic_mb: int, ready, release) -> None:
+    """Load (unless preloaded), decode once, then wait to be measured."""
+    if synthetic_mb:
+        model = _synthetic_model if mode == "preloaded" else _load_synthetic_model(synthetic_mb)
+        int(model.sum())  # Read every weight, as a forward pass would
+    else:
+        if mode == "per_worker":
+            whisper_model_registry.warm_up([model_size])
+        audio = synthetic_speech(5.0).astype(np.float32) / 32768.0
+        run_transcription(audio, model_size, {"language": "en"})
+    ready.put(os.getpid())
+    release.wait()
+
+
+def _memory(pids: List[int]) -> Dict[str, float]:
+    """Summed RSS, PSS and USS of the given processes, in MB."""
+    totals = {"rss": 0, "pss": 0, "uss": 0}
+    for pid in pids:
+        info = psutil.Process(pid).memory_full_info()
+        for key in totals:
+            totals[key] += getattr(info, key, 0)
+    return {f"total_{key}_mb": round(value / (1024 * 1024), 1) for key, value in totals.items()}
+
+
+def measure(mode: str, workers: int, model_size: str, synthetic_mb: int) -> Dict[str, Any]:
+    """Fork workers, wait until all have decoded, and measure the parent plus workers."""
+    context = multiprocessing.get_context("fork")
+    ready, release = context.Queue(), context.Event()
+    processes = [context.Process(target=_worker, args=(mode, model_size, synthetic_mb, ready, release))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        pids = [ready.get(timeout=600) for _ in processes]
+        memory = _memory([os.getpid()] + pids)
+    finally:
+        release.set()
+        for process in processes:
+            process.join()
+
+    result = {"mode": mode, "workers": workers, **memory}
+    print(f"{mode:<11} workers={workers:<3} RSS {memory['total_rss_mb']:>8} MB  "
+          f"PSS {memory['total_pss_mb']:>8} MB  USS {memory['total_uss_mb']:>8} MB")
+    return result
+
+
+def main():
+    global _synthetic_model
+
+    parser = argparse.ArgumentParser(description="Benchmark copy-on-write model sharing across workers")
+    parser.add_argument("--model", default=settings.WHISPER_MODEL_SIZE, help="Whisper model size")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="Worker counts")
+    parser.add_argument("--synthetic-model-mb", type=int, default=0, help="Use a synthetic model of this size")
+    args = parser.parse_args()
+
+    # Per-worker runs go first, while the parent holds no model
+    results = [measure("per_worker", n, args.model, args.synthetic_model_mb) for n in args.workers]
+
+    if args.synthetic_model_mb:
+        _synthetic_model = _load_synthetic_model(args.synthetic_model_mb)
+        gc.collect()
+        gc.freeze()
+    else:
+        whisper_model_registry.preload_for_fork([args.model])
+    results += [measure("preloaded", n, args.model, args.synthetic_model_mb) for n in args.workers]
+
+    comparison = []
+    for n in args.workers:
+        per_worker, preloaded = [next(r for r in results if r["mode"] == mode and r["workers"] == n)
+                                 for mode in ("per_worker", "preloaded")]
+        comparison.append({
+            "workers": n,
+            "pss_saved_mb": round(per_worker["total_pss_mb"] - preloaded["total_pss_mb"], 1),
+            "pss_saved_percentage": round(100.0 * (per_worker["total_pss_mb"] - preloaded["total_pss_mb"])
+                                          / per_worker["total_pss_mb"], 1) if per_worker["total_pss_mb"] else 0.0
+        })
+
+    report = {
+        "model": f"synthetic-{args.synthetic_model_mb}mb" if args.synthetic_model_mb else args.model,
+        "created_at": datetime.now().isoformat(),
+        "results": results,
+        "comparison": comparison
+    }
+    output_file = Path(__file__).parent / "test_results" / \
+        f"model_sharing_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(comparison, indent=2))
+    print(f"Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
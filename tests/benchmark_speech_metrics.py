@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the vectorized speech metrics engine.
+
+For synthetic sessions of growing size, stored as compact transcripts, compares:
+- time, starting from the stored transcripts: AnalysisService._analyze_speech_timing
+  called per recording on its segment dicts (the previous path) against the
+  engine reading the stored arrays: pause_statistics, which computes the same figures, and the full
+  analyze_session (pause histograms, speaking rate over time and filler
+  counts on top). The filler count shares its scan with the prompt's
+  hesitation trimming (strip_filler), so it is also reported on its own;
+  its cache is cleared before every run.
+- prompt size: the session analysis prompt with verbatim answers and the
+  legacy metrics lines against hesitation-free answers with the compact
+  delivery line (SPEECH_METRICS_IN_PROMPT)
+
+Token counts use tiktoken when its encoding is available and a
+4-characters-per-token estimate otherwise.
+
+Usage:
+    python tests/benchmark_speech_metrics.py
+    python tests/benchmark_speech_metrics.py --questions 10 50 --segments 100 1000 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.analysis.analysis_service import AnalysisService
+from app.services.analysis.prompt_builder import token_counter, strip_filler
+from app.services.analysis.speech_metrics import speech_metrics_engine, buffer_timings, count_filler
+from app.services.transcription.compact_transcript import encode_transcript, decode_transcript
+
+_WORDS = "the cache layer we built reduced latency because requests were batched and retried with backoff".split()
+_FILLERS = ["um,", "uh,", "you know,", "I I"]
+
+
+def synthetic_session(questions: int, segments: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """transcript_data entries with segment dicts shaped like Whisper's, about one filler per 20 words."""
+    rng = random.Random(seed)
+    transcript_data = []
+    for q in range(questions):
+        recording_segments, t = [], 0.0
+        for i in range(segments):
+            words = [rng.choice(_FILLERS) if rng.random() < 0.05 else rng.choice(_WORDS)
+                     for _ in range(rng.randint(4, 14))]
+            length = len(words) * rng.uniform(0.3, 0.5)
+            recording_segments.append({"id": i, "start": round(t, 3), "end": round(t + length, 3),
+                                       "text": " " + " ".join(words)})
+            t += length + rng.choice([0.0, 0.05, 0.2, 0.6, 1.2, 2.5, 4.0])
+        text = "".join(segment["text"] for segment in recording_segments).strip()
+        transcript_data.append({
+            "question_id": q + 1,
+            "question_text": f"Describe a system you improved ({q + 1})?",
+            "question_category": "technical",
+            "transcript": text,
+            "word_count": len(text.split()),
+            "duration": t,
+            "speaking_rate": len(text.split()) / (t / 60) if t else 0,
+            "segments": recording_segments
+        })
+    return transcript_data
+
+
+def _best_of(repeat: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _prompt_tokens(service: AnalysisService, transcript_data: List[Dict], compact: bool) -> int:
+    """Predicted prompt tokens of the session analysis prompt, with an unlimited budget."""
+    settings.SPEECH_METRICS_IN_PROMPT = compact
+    metrics = {
+        "total_questions": len(transcript_data),
+        "total_words": sum(data["word_count"] for data in transcript_data),
+        "total_duration": sum(data["duration"] for data in transcript_data),
+        "average_speaking_rate": 0.0,
+        "average_response_length": 0.0,
+        "speech_summary": speech_metrics_engine.summarize([data["pause_analysis"] for data in transcript_data])
+                          if compact else {}
+    }
+    session = SimpleNamespace(id=1, token_id=1)
+    return service._build_comprehensive_analysis_prompt(transcript_data, session, metrics).prompt_tokens
+
+
+def _engine_input(stored: str) -> Dict[str, Any]:
+    transcript = decode_transcript(stored)
+    starts, ends = transcript.timings()
+    return buffer_timings(starts, ends, *transcript.segment_text_buffer(), transcript.text)
+
+
+def measure(service: AnalysisService, questions: int, segments: int, repeat: int) -> Dict[str, Any]:
+    transcript_data = synthetic_session(questions, segments)
+    all_segments = [data["segments"] for data in transcript_data]
+    texts = [data["transcript"] for data in transcript_data]
+    stored = [encode_transcript({"text": text, "segments": s})[0] for text, s in zip(texts, all_segments)]
+
+    def pause_statistics():
+        timings = [decode_transcript(raw).timings() for raw in stored]
+        speech_metrics_engine.pause_statistics(
+            np.concatenate([np.asarray(starts, dtype=np.float64) for starts, _ in timings]),
+            np.concatenate([np.asarray(ends, dtype=np.float64) for _, ends in timings]),
+            np.array([len(starts) for starts, _ in timings]))
+
+    def fillers():
+        strip_filler.cache_clear()
+        [count_filler(text) for text in texts]
+
+    def full_metrics():
+        strip_filler.cache_clear()
+        speech_metrics_engine.analyze_session([_engine_input(raw) for raw in stored])
+
+    def loop():
+        for raw in stored:
+            service._analyze_speech_timing([segment.to_dict() for segment in decode_transcript(raw).segments])
+
+    loop_seconds = _best_of(repeat, loop)
+    pause_seconds = _best_of(repeat, pause_statistics)
+    filler_seconds = _best_of(repeat, fillers)
+    engine_seconds = _best_of(repeat, full_metrics)
+
+    legacy_metrics = [service._analyze_speech_timing(s) for s in all_segments]
+    engine_metrics = speech_metrics_engine.analyze_session([_engine_input(raw) for raw in stored])
+
+    for data, metrics in zip(transcript_data, legacy_metrics):
+        data["pause_analysis"] = metrics
+    legacy_tokens = _prompt_tokens(service, transcript_data, compact=False)
+    for data, metrics in zip(transcript_data, engine_metrics):
+        data["pause_analysis"] = metrics
+    compact_tokens = _prompt_tokens(service, transcript_data, compact=True)
+
+    saved = round(100.0 * (legacy_tokens - compact_tokens) / legacy_tokens, 1)
+    result = {
+        "questions": questions,
+        "segments_per_question": segments,
+        "loop_ms": round(loop_seconds * 1000, 2),
+        "pause_statistics_ms": round(pause_seconds * 1000, 2),
+        "pause_speedup": round(loop_seconds / pause_seconds, 2) if pause_seconds else None,
+        "filler_scan_ms": round(filler_seconds * 1000, 2),
+        "full_metrics_ms": round(engine_seconds * 1000, 2),
+        "legacy_prompt_tokens": legacy_tokens,
+        "compact_prompt_tokens": compact_tokens,
+        "prompt_tokens_saved_percentage": saved
+    }
+    print(f"{questions:>4} questions x {segments:>5} segments  loop {result['loop_ms']:>8} ms  "
+          f"pauses {result['pause_statistics_ms']:>7} ms ({result['pause_speedup']}x)  "
+          f"all metrics {result['full_metrics_ms']:>8} ms (fillers {result['filler_scan_ms']} ms)  prompt "
+          f"{legacy_tokens} -> {compact_tokens} tokens ({-saved:+}%)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized speech metrics against the per-segment loop")
+    parser.add_argument("--questions", nargs="+", type=int, default=[5, 20, 50], help="Recordings per session")
+    parser.add_argument("--segments", nargs="+", type=int, default=[50, 500, 2000], help="Segments per recording")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    # Whole answers are sent, so the comparison is not affected by budget compression
+    settings.ANALYSIS_PROMPT_TOKEN_BUDGET = 10 ** 9
+    settings.ANALYSIS_CONTEXT_WINDOW_TOKENS = 10 ** 9
+    service = AnalysisService()
+    results = [measure(service, questions, segments, args.repeat)
+               for questions in args.questions for segments in args.segments]
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "exact_token_counts": token_counter.is_exact(settings.ANALYSIS_MODEL),
+        "results": results
+    }
+    output_file = Path(__file__).parent / "test_results" / \
+        f"speech_metrics_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
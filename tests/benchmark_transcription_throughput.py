@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Transcription throughput benchmark.
+
+Runs synthetic speech-like audio of configurable length (plus the sample
+answers in tests/test_video/, when ffmpeg is available) through each
+transcription backend and model size at several concurrency levels, and
+reports throughput (recording-minutes per wall-clock and per CPU minute),
+p50/p95 latency and peak RSS as JSON. Pass an earlier result with
+--baseline to compare versions.
+
+Synthetic audio is voiced-syllable noise, not language, so model output is
+meaningless; it exercises decode cost and pause structure like a real answer.
+
+Usage:
+    python tests/benchmark_transcription_throughput.py --backends stub local_whisper \\
+        --models tiny base --concurrency 1 2 4 --lengths 30 120
+    python tests/benchmark_transcription_throughput.py --baseline tests/test_results/<earlier>.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import psutil
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import audio_preprocessor, NormalizedAudio, SAMPLE_RATE
+from app.services.transcription.inference_executor import inference_executor
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory
+from app.services.transcription.transcription_service import TranscriptionService
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+
+# (F1, F2) formant pairs of a few vowels, in Hz
+VOWEL_FORMANTS = [(730, 1090), (270, 2290), (300, 870), (530, 1840), (640, 1190)]
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    Speech-like 16 kHz int16 audio: phrases of voiced syllables separated by pauses.
+
+    Each syllable is a glottal harmonic series shaped by two vowel formants,
+    with a rising-falling envelope and pitch drift; phrases last 2-8 s and
+    pauses 0.3-1.5 s, over a -55 dBFS noise floor.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0.0, 10 ** (-55 / 20), total)
+
+    cursor = int(rng.uniform(0.2, 0.6) * SAMPLE_RATE)
+    while cursor < total:
+        phrase_end = min(total, cursor + int(rng.uniform(2.0, 8.0) * SAMPLE_RATE))
+        base_f0 = rng.uniform(100, 220)
+        while cursor < phrase_end:
+            length = min(int(rng.uniform(0.12, 0.3) * SAMPLE_RATE), total - cursor)
+            t = np.arange(length) / SAMPLE_RATE
+            f0 = base_f0 * (1.0 + 0.08 * np.sin(2 * np.pi * rng.uniform(1, 4) * t))
+            phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+            f1, f2 = VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))]
+            syllable = np.zeros(length)
+            for harmonic in range(1, 25):
+                frequency = harmonic * base_f0
+                if frequency > SAMPLE_RATE / 2:
+                    break
+                gain = np.exp(-((frequency - f1) / 150) ** 2) + 0.6 * np.exp(-((frequency - f2) / 200) ** 2) + 0.05
+                syllable += gain / harmonic ** 0.5 * np.sin(harmonic * phase)
+            audio[cursor:cursor + length] += 0.25 * np.hanning(length) * syllable / np.abs(syllable).max()
+            cursor += length + int(rng.uniform(0.0, 0.08) * SAMPLE_RATE)
+        cursor = phrase_end + int(rng.uniform(0.3, 1.5) * SAMPLE_RATE)
+
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def load_inputs(lengths: List[float], directory: str, include_videos: bool) -> List[Dict[str, Any]]:
+    """Synthetic recordings (written straight to PCM) plus the decoded sample answers."""
+    inputs = []
+    for i, seconds in enumerate(lengths):
+        pcm_path = os.path.join(directory, f"synthetic_{int(seconds)}s_{i}.pcm")
+        synthetic_speech(seconds, seed=i).tofile(pcm_path)
+        inputs.append({
+            "name": f"synthetic_{int(seconds)}s",
+            "audio": NormalizedAudio(pcm_path=pcm_path, content_hash=f"synthetic-{i}", duration=seconds,
+                                     decode_seconds=0.0, cache_hit=True)
+        })
+
+    if include_videos:
+        video_dir = Path(__file__).parent / "test_video"
+        for video in sorted(f for ext in VIDEO_EXTENSIONS for f in video_dir.glob(f"*{ext}")):
+            try:
+                inputs.append({"name": video.name, "audio": audio_preprocessor.normalize(str(video))})
+            except Exception as e:
+                print(f"Skipping {video.name}: {e}")
+    return inputs
+
+
+class ResourceSampler:
+    """Samples RSS of this process and its children (the inference pool) in a background thread."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _processes(self) -> List[psutil.Process]:
+        return [self.process] + self.process.children(recursive=True)
+
+    def rss(self) -> int:
+        total = 0
+        for process in self._processes():
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def cpu_seconds(self) -> float:
+        """User + system CPU time of this process and its live children."""
+        total = 0.0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self.rss())
+
+    def __enter__(self) -> "ResourceSampler":
+        self.peak_rss = self.rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.rss())
+
+
+async def run_config(backend_name: str, model_size: str, concurrency: int, inputs: List[Dict[str, Any]],
+                     jobs: int) -> Dict[str, Any]:
+    """Transcribe jobs recordings (cycling through inputs) with at most concurrency in flight."""
+    service = TranscriptionService(model_size=model_size, backend_name=backend_name)
+
+    # Warm-up: model loading is reported separately, not counted as throughput
+    warm_start = time.perf_counter()
+    await service._transcribe_normalized(inputs[0]["audio"])
+    warm_up_seconds = time.perf_counter() - warm_start
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = []
+
+    async def _job(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await service._transcribe_normalized(item["audio"])
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                failures.append(f"{item['name']}: {e}")
+
+    batch = [inputs[i % len(inputs)] for i in range(jobs)]
+    audio_seconds = sum(item["audio"].duration for item in batch)
+    with ResourceSampler() as sampler:
+        cpu_start = sampler.cpu_seconds()
+        wall_start = time.perf_counter()
+        await asyncio.gather(*[_job(item) for item in batch])
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = sampler.cpu_seconds() - cpu_start
+
+    return {
+        "backend": backend_name,
+        "model": TranscriptionBackendFactory.get_backend(backend_name).resolve_model(model_size),
+        "concurrency": concurrency,
+        "jobs": jobs,
+        "failures": failures,
+        "audio_minutes": round(audio_seconds / 60, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "warm_up_seconds": round(warm_up_seconds, 3),
+        "recording_minutes_per_wall_minute": round(audio_seconds / wall_seconds, 3) if wall_seconds else None,
+        "recording_minutes_per_cpu_minute": round(audio_seconds / cpu_seconds, 3) if cpu_seconds > 0 else None,
+        "latency_p50_seconds": round(float(np.percentile(latencies, 50)), 3) if latencies else None,
+        "latency_p95_seconds": round(float(np.percentile(latencies, 95)), 3) if latencies else None,
+        "peak_rss_mb": round(sampler.peak_rss / (1024 * 1024), 1)
+    }
+
+
+async def run_benchmark(args, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Every available backend x distinct model x concurrency level."""
+    results = []
+    for backend_name in args.backends:
+        backend = TranscriptionBackendFactory.get_backend(backend_name)
+        if backend.name != backend_name or not backend.is_available():
+            print(f"Skipping backend '{backend_name}': not available")
+            continue
+
+        # Backends with a single model (API, stub) are only run once
+        models = list(dict.fromkeys(args.models))
+        models = [m for i, m in enumerate(models)
+                  if backend.resolve_model(m) not in {backend.resolve_model(n) for n in models[:i]}]
+        for model_size in models:
+            for concurrency in args.concurrency:
+                jobs = args.jobs or max(len(inputs), 2 * concurrency)
+                result = await run_config(backend_name, model_size, concurrency, inputs, jobs)
+                results.append(result)
+                print(f"{backend_name:<20} {result['model']:<16} c={concurrency:<3} "
+                      f"{result['recording_minutes_per_wall_minute']} rec-min/wall-min, "
+                      f"{result['recording_minutes_per_cpu_minute']} rec-min/CPU-min, "
+                      f"p50 {result['latency_p50_seconds']}s, p95 {result['latency_p95_seconds']}s, "
+                      f"peak RSS {result['peak_rss_mb']} MB")
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> List[Dict[str, Any]]:
+    """Relative change of throughput and p95 latency against an earlier run of the same configs."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["backend"], r["model"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    def change(new, old):
+        return round(100.0 * (new - old) / old, 1) if new is not None and old else None
+
+    changes = []
+    for result in results:
+        old = baseline.get((result["backend"], result["model"], result["concurrency"]))
+        if old:
+            changes.append({
+                "backend": result["backend"],
+                "model": result["model"],
+                "concurrency": result["concurrency"],
+                "cpu_throughput_change_percent": change(result["recording_minutes_per_cpu_minute"],
+                                                        old["recording_minutes_per_cpu_minute"]),
+                "wall_throughput_change_percent": change(result["recording_minutes_per_wall_minute"],
+                                                         old["recording_minutes_per_wall_minute"]),
+                "p95_latency_change_percent": change(result["latency_p95_seconds"], old["latency_p95_seconds"]),
+                "peak_rss_change_percent": change(result["peak_rss_mb"], old["peak_rss_mb"])
+            })
+    return changes
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription throughput")
+    parser.add_argument("--backends", nargs="+", default=["local_whisper", "faster_whisper_int8", "openai_api", "stub"])
+    parser.add_argument("--models", nargs="+", default=[settings.WHISPER_MODEL_SIZE], help="Whisper model sizes")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4], help="Recordings in flight")
+    parser.add_argument("--lengths", nargs="+", type=float, default=[30, 120], help="Synthetic recording lengths (s)")
+    parser.add_argument("--jobs", type=int, default=0, help="Recordings per config (default: 2 x concurrency, and at least one per input)")
+    parser.add_argument("--no-videos", action="store_true", help="Skip the sample answers in tests/test_video")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--output", help="Result file (default: tests/test_results/transcription_benchmark_<time>.json)")
+    args = parser.parse_args()
+
+    # A failing backend should show up as failures, not as the fallback's numbers
+    settings.USE_FALLBACK_TRANSCRIPTION = False
+
+    with tempfile.TemporaryDirectory(prefix="transcription_benchmark_") as directory:
+        inputs = load_inputs(args.lengths, directory, not args.no_videos)
+        results = asyncio.run(run_benchmark(args, inputs))
+        inference_executor.shutdown()
+
+    report = {
+        "revision": _git_revision(),
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": psutil.cpu_count(),
+            "inference_executor": {
+                "mode": settings.INFERENCE_EXECUTOR_MODE,
+                "pool_workers": settings.INFERENCE_POOL_WORKERS,
+                "max_concurrent": settings.INFERENCE_MAX_CONCURRENT
+            },
+            "vad_enabled": settings.VAD_ENABLED
+        },
+        "inputs": [{"name": item["name"], "seconds": round(item["audio"].duration, 2)} for item in inputs],
+        "results": results
+    }
+    if args.baseline:
+        report["comparison"] = {"baseline": args.baseline, "changes": compare(results, args.baseline)}
+
+    output_file = Path(args.output) if args.output else \
+        Path(__file__).parent / "test_results" / f"transcription_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if args.baseline:
+        print(json.dumps(report["comparison"], indent=2))
+    print(f"Results saved to {output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Shared pytest fixtures."""
+import os
+import sys
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.analysis.analysis_cache import AnalysisCache
+from app.services.analysis.llm_client import llm_client
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory
+
+# Modules that imported the analysis cache singleton by name
+_CACHE_MODULES = ("app.services.analysis.analysis_service", "app.services.analysis.batch_analysis")
+
+
+@pytest.fixture
+def register_backend(monkeypatch):
+    """Register transcription backends for one test; the factory's registry is restored afterwards."""
+    TranscriptionBackendFactory._ensure_backends_loaded()
+
+    def register(name, backend_class):
+        monkeypatch.setitem(TranscriptionBackendFactory._backends, name, backend_class)
+        monkeypatch.setitem(TranscriptionBackendFactory._instances, name, backend_class())
+
+    return register
+
+
+@pytest.fixture
+def analysis_cache(tmp_path, monkeypatch):
+    """An empty analysis cache under tmp_path, swapped in for the shared one."""
+    cache = AnalysisCache(cache_dir=str(tmp_path / "analysis_cache"))
+    for module in _CACHE_MODULES:
+        monkeypatch.setattr(importlib.import_module(module), "analysis_cache", cache)
+    return cache
+
+
+class FakeChatCompletions:
+    """
+    Stands in for llm_client.chat_completion.
+
+    Records every request in calls and tracks how many were in flight at once.
+    Responses come from reply(request) when it is set, otherwise content.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.content = '{"overall_score": 7}'
+        self.reply = None
+        self.usage = (3000, 500)
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, **request):
+        self.calls.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        content = self.reply(request) if self.reply else self.content
+        prompt_tokens, completion_tokens = self.usage
+        return SimpleNamespace(
+            model=request["model"],
+            choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                  total_tokens=prompt_tokens + completion_tokens)
+        )
+
+
+@pytest.fixture
+def fake_llm(analysis_cache, monkeypatch):
+    """Fake OpenAI chat completions over an isolated analysis cache."""
+    fake = FakeChatCompletions()
+    monkeypatch.setattr(llm_client, "chat_completion", fake)
+    return fake
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests for the fingerprint-keyed analysis completion cache."""
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.analysis.analysis_service import AnalysisService
+
+
+@pytest.fixture(autouse=True)
+def _cache_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_ENABLED", True)
+
+
+def test_identical_requests_are_served_from_the_cache(fake_llm, monkeypatch):
+    """A repeat costs nothing and reports what it saved; bypass forces a call."""
+    calls = fake_llm.calls
+    service = AnalysisService()
+    request = dict(model="gpt-4o-mini", system_prompt="system", user_prompt="answers", temperature=0.2)
+
+    first = asyncio.run(service._cached_completion(**request))
+    second = asyncio.run(service._cached_completion(**request))
+    assert len(calls) == 1
+    assert first["cache"]["hit"] is False and second["cache"]["hit"] is True
+    assert second["content"] == first["content"] and second["cache"]["saved_tokens"] == 3500
+    assert second["cache"]["saved_cost"] > 0
+
+    asyncio.run(service._cached_completion(bypass_cache=True, **request))
+    asyncio.run(service._cached_completion(**{**request, "user_prompt": "other answers"}))
+    assert len(calls) == 3
+
+
+def test_version_bump_invalidates_entries(fake_llm, monkeypatch):
+    """Entries written under another ANALYSIS_VERSION are never hit."""
+    calls = fake_llm.calls
+    service = AnalysisService()
+    request = dict(model="gpt-4o-mini", system_prompt="system", user_prompt="answers", temperature=0.2)
+
+    asyncio.run(service._cached_completion(**request))
+    monkeypatch.setattr(sys.modules["app.services.analysis.analysis_service"], "ANALYSIS_VERSION", "next")
+    assert asyncio.run(service._cached_completion(**request))["cache"]["hit"] is False
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests for the decode-once audio normalization cache."""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.transcription.audio_preprocessor import AudioPreprocessor, load_pcm, SAMPLE_RATE
+from app.utils.file_utils import get_file_hash_from_path
+
+
+def _write_source(path, payload=b"fake-webm-bytes"):
+    with open(path, "wb") as f:
+        f.write(payload)
+    return str(path)
+
+
+def test_cache_hit_skips_decode(tmp_path):
+    """A recording whose hash is already cached is not decoded again."""
+    preprocessor = AudioPreprocessor(cache_dir=str(tmp_path / "cache"))
+    source = _write_source(tmp_path / "answer.webm")
+    content_hash = get_file_hash_from_path(source)
+
+    # Two seconds of cached PCM for this content hash
+    samples = (np.sin(np.linspace(0, 100, 2 * SAMPLE_RATE)) * 10000).astype(np.int16)
+    samples.tofile(os.path.join(preprocessor.cache_dir, f"{content_hash}.pcm"))
+
+    def fail_decode(*args):
+        raise AssertionError("decode should not run on a cache hit")
+    preprocessor._decode = fail_decode
+
+    normalized = preprocessor.normalize(source)
+    assert normalized.cache_hit is True
+    assert normalized.decode_seconds == 0.0
+    assert normalized.content_hash == content_hash
+    assert abs(normalized.duration - 2.0) < 1e-6
+
+    audio = load_pcm(normalized.pcm_path)
+    assert audio.dtype == np.float32
+    assert len(audio) == 2 * SAMPLE_RATE
+    assert np.abs(audio).max() <= 1.0
+
+
+def test_cache_miss_decodes_once(tmp_path):
+    """The first request decodes; identical bytes afterwards reuse the cache."""
+    preprocessor = AudioPreprocessor(cache_dir=str(tmp_path / "cache"))
+    source = _write_source(tmp_path / "answer.webm")
+    calls = []
+
+    def fake_decode(source_path, pcm_path):
+        calls.append(source_path)
+        np.zeros(SAMPLE_RATE, dtype=np.int16).tofile(pcm_path)
+    preprocessor._decode = fake_decode
+
+    first = preprocessor.normalize(source)
+    copy = _write_source(tmp_path / "reupload.webm")
+    second = preprocessor.normalize(copy)
+
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert first.pcm_path == second.pcm_path
+    assert len(calls) == 1
+
+
+def test_cleanup_removes_stale_entries(tmp_path):
+    """Entries older than the age limit are removed."""
+    preprocessor = AudioPreprocessor(cache_dir=str(tmp_path / "cache"))
+    stale = os.path.join(preprocessor.cache_dir, "stale.pcm")
+    fresh = os.path.join(preprocessor.cache_dir, "fresh.pcm")
+    for path in (stale, fresh):
+        np.zeros(10, dtype=np.int16).tofile(path)
+    old = time.time() - 10 * 3600
+    os.utime(stale, (old, old))
+
+    assert preprocessor.cleanup(max_age_hours=1) == 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
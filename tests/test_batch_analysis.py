@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for the offline batch analysis pipeline with the local stub backend."""
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database.models import Base, CandidateSession, Recording, Question
+from app.services.analysis.batch_analysis import BatchAnalysisPipeline
+from app.services.analysis.batch_backends import get_batch_backend
+
+# The package exports the instance under the module's name
+batch_module = sys.modules["app.services.analysis.batch_analysis"]
+
+
+def _database():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Question(id=1, text="Tell us about a project you led."))
+    ended = datetime.now(timezone.utc)
+    for session_id in (1, 2, 3, 4):
+        db.add(CandidateSession(id=session_id, token_id=session_id, end_time=ended))
+    db.add(CandidateSession(id=5, token_id=5))
+    transcript = json.dumps({"text": "I led the migration of our billing system.", "language": "en", "duration": 4.0,
+                             "segments": [{"start": 0.0, "end": 4.0, "text": "I led the migration of our billing system."}]})
+    # Session 3 has nothing transcribed yet and must be left alone
+    db.add(Recording(session_id=1, question_id=1, transcript=transcript, transcription_status="completed"))
+    db.add(Recording(session_id=2, question_id=1, transcript=transcript, transcription_status="completed"))
+    db.add(Recording(session_id=3, question_id=1, transcription_status="pending"))
+    # Session 4 still has an answer being transcribed and session 5 has not ended
+    db.add(Recording(session_id=4, question_id=1, transcript=transcript, transcription_status="completed"))
+    db.add(Recording(session_id=4, question_id=1, transcription_status="processing"))
+    db.add(Recording(session_id=5, question_id=1, transcript=transcript, transcription_status="completed"))
+    db.commit()
+    return db
+
+
+def test_batch_round_trip_ingests_results_in_bulk(tmp_path, analysis_cache):
+    """Pending sessions go out in one request file and come back as completed analyses."""
+    db = _database()
+    pipeline = BatchAnalysisPipeline(backend=get_batch_backend("stub"), batch_dir=str(tmp_path / "batches"))
+
+    assert pipeline.pending_session_ids(db) == [1, 2]
+    summary = asyncio.run(pipeline.run(db, poll_seconds=0))
+    assert summary["completed"] == 2 and summary["failed"] == 0
+
+    with open(pipeline.find_job(summary["batch_id"]).request_file, encoding="utf-8") as f:
+        requests = [json.loads(line) for line in f]
+    assert [request["custom_id"] for request in requests] == ["session-1", "session-2"]
+
+    db.expire_all()
+    session = db.get(CandidateSession, 1)
+    assert session.analysis_status == "completed" and session.analysis_batch_id == summary["batch_id"]
+    result = json.loads(session.analysis_result)
+    assert result["analysis_metadata"]["analysis_mode"] == "batch"
+    assert 4 <= session.analysis_score <= 9
+    assert db.get(CandidateSession, 3).analysis_status == "pending"
+    assert pipeline.pending_session_ids(db) == []
+    assert analysis_cache.get_stats()["stores"] == 2
+
+
+def test_missing_results_mark_sessions_failed(tmp_path):
+    """A session without a result line is failed with the reason instead of staying queued."""
+    db = _database()
+    pipeline = BatchAnalysisPipeline(backend=get_batch_backend("stub"), batch_dir=str(tmp_path))
+    job = pipeline.prepare(db, [1])
+    asyncio.run(pipeline.submit(db, job))
+
+    status = asyncio.run(pipeline.backend.retrieve(job.batch_id, str(tmp_path)))
+    open(status.output_file, "w").close()
+    summary = pipeline.ingest(db, job, status)
+    assert summary["failed"] == 1
+    db.expire_all()
+    session = db.get(CandidateSession, 1)
+    assert session.analysis_status == "failed" and "No result" in session.analysis_error
+
+
+def test_sessions_are_claimed_by_one_pipeline(tmp_path):
+    """A second scheduler preparing the same sessions gets nothing; skipped sessions are released."""
+    db = _database()
+    first = BatchAnalysisPipeline(backend=get_batch_backend("stub"), batch_dir=str(tmp_path / "first"))
+    second = BatchAnalysisPipeline(backend=get_batch_backend("stub"), batch_dir=str(tmp_path / "second"))
+
+    job = first.prepare(db, [1, 2, 3])
+    assert job.session_ids == [1, 2]
+    assert second.prepare(db, [1, 2, 3]) is None
+
+    db.expire_all()
+    assert db.get(CandidateSession, 1).analysis_status == "batch_preparing"
+    assert db.get(CandidateSession, 3).analysis_status == "pending"
+
+
+def test_finished_batch_is_ingested_once(tmp_path, analysis_cache, monkeypatch):
+    """Workers that find the same finished batch write its results and usage only once."""
+    recorded = []
+    monkeypatch.setattr(batch_module.usage_meter, "record", lambda *args, **kwargs: recorded.append(kwargs))
+    db = _database()
+    pipeline = BatchAnalysisPipeline(backend=get_batch_backend("stub"), batch_dir=str(tmp_path))
+    job = pipeline.prepare(db, [1, 2])
+    asyncio.run(pipeline.submit(db, job))
+    status = asyncio.run(pipeline.backend.retrieve(job.batch_id, str(tmp_path)))
+
+    assert pipeline.ingest(db, job, status)["completed"] == 2
+    assert pipeline.ingest(db, job, status)["sessions"] == 0
+    assert asyncio.run(pipeline.ingest_finished_batches(db)) == []
+    assert sorted(entry["session_id"] for entry in recorded) == [1, 2]
+
+
+def test_expired_openai_batch_keeps_finished_lines(tmp_path, monkeypatch):
+    """Results written before a batch expired are downloaded like those of a completed batch."""
+    from types import SimpleNamespace
+    from app.services.analysis.llm_client import llm_client
+
+    batch = SimpleNamespace(status="expired", request_counts=None, errors=None,
+                            output_file_id="file-out", error_file_id=None)
+
+    async def retrieve(batch_id):
+        return batch
+
+    async def content(file_id):
+        return SimpleNamespace(content=b'{"custom_id": "session-1"}\n')
+
+    client = SimpleNamespace(batches=SimpleNamespace(retrieve=retrieve), files=SimpleNamespace(content=content))
+    monkeypatch.setattr(llm_client, "get_client", lambda: client)
+
+    status = asyncio.run(get_batch_backend("openai").retrieve("batch_1", str(tmp_path)))
+    with open(status.output_file, encoding="utf-8") as f:
+        assert json.loads(f.readline())["custom_id"] == "session-1"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Tests for chunked long-audio transcription."""
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.transcription.audio_preprocessor import SAMPLE_RATE
+from app.services.transcription.chunked_transcriber import (
+    ChunkedTranscriber, plan_chunks, encode_wav, max_chunk_seconds_for_bytes
+)
+
+
+def _write_speech_with_pauses(path, speech_seconds=25.0, pause_seconds=2.0, repeats=6):
+    """Tone bursts separated by near-silent pauses, as raw s16le PCM."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(speech_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    speech = 0.3 * np.sin(2 * np.pi * 220 * t)
+    pause = 0.001 * rng.standard_normal(int(pause_seconds * SAMPLE_RATE))
+    audio = np.concatenate([np.concatenate([speech, pause]) for _ in range(repeats)])
+    (audio * 32767).astype(np.int16).tofile(path)
+    return str(path), len(audio)
+
+
+def test_plan_cuts_inside_pauses(tmp_path):
+    """Chunks cover the recording and every cut lands in a pause."""
+    pcm_path, total = _write_speech_with_pauses(tmp_path / "long.pcm")
+    chunks = plan_chunks(pcm_path, target_seconds=50, max_seconds=80)
+
+    assert chunks[0].start_sample == 0
+    assert chunks[-1].end_sample == total
+    assert all(a.end_sample == b.start_sample for a, b in zip(chunks, chunks[1:]))
+    assert all(chunk.duration <= 80 for chunk in chunks)
+    period = 27.0 * SAMPLE_RATE
+    for chunk in chunks[1:]:
+        assert chunk.start_sample % period >= 25.0 * SAMPLE_RATE
+
+
+def test_resume_skips_finished_chunks(tmp_path):
+    """A retry only transcribes the chunks the failed attempt did not finish."""
+    pcm_path, _ = _write_speech_with_pauses(tmp_path / "long.pcm")
+    transcriber = ChunkedTranscriber()
+    plan_key = {"content_hash": "abc", "model_size": "base", "backend": "local_whisper"}
+    saved = {}
+    calls = []
+
+    async def flaky_chunk(chunk):
+        calls.append(chunk.index)
+        if chunk.index == 1:
+            raise RuntimeError("worker crashed")
+        return {"text": f" chunk {chunk.index}", "language": "en", "inference_seconds": 1.0,
+                "segments": [{"id": 0, "start": 1.0, "end": 2.0, "text": f" chunk {chunk.index}"}]}
+
+    async def save(progress):
+        saved["progress"] = progress
+
+    try:
+        asyncio.run(transcriber.transcribe(pcm_path, flaky_chunk, plan_key, None, save, max_chunk_seconds=80))
+        raise AssertionError("the failed chunk should surface")
+    except RuntimeError:
+        pass
+    n_chunks = len(saved["progress"]["chunks"])
+    assert n_chunks > 2
+    assert "1" not in saved["progress"]["completed"]
+    assert len(saved["progress"]["completed"]) == n_chunks - 1
+
+    calls.clear()
+
+    async def good_chunk(chunk):
+        calls.append(chunk.index)
+        return {"text": " retried", "language": "en", "inference_seconds": 1.0,
+                "segments": [{"id": 0, "start": 0.5, "end": 1.5, "text": " retried"}]}
+
+    result = asyncio.run(transcriber.transcribe(pcm_path, good_chunk, plan_key, saved["progress"], save))
+    assert calls == [1]
+    assert result["chunks"] == n_chunks
+    assert [segment["id"] for segment in result["segments"]] == list(range(n_chunks))
+    starts = [segment["start"] for segment in result["segments"]]
+    assert starts == sorted(starts)
+    assert result["text"].startswith("chunk 0 retried")
+
+
+def test_wav_chunks_fit_upload_cap(tmp_path):
+    """Chunks sized for a byte cap encode to WAV files within that cap."""
+    pcm_path, _ = _write_speech_with_pauses(tmp_path / "long.pcm")
+    byte_cap = 2 * 1024 * 1024
+    chunks = plan_chunks(pcm_path, max_seconds=max_chunk_seconds_for_bytes(byte_cap))
+    assert len(chunks) > 1
+    assert all(len(encode_wav(pcm_path, chunk)) <= byte_cap for chunk in chunks)
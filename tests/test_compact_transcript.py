@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the compact columnar transcript encoding."""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.transcription.compact_transcript import CompactTranscript, decode_transcript, encode_transcript
+
+
+def _transcript(with_words=True):
+    """A Whisper-shaped transcript with the fields the compact format drops."""
+    segments = []
+    for i in range(20):
+        segment = {"id": i, "seek": 0, "start": i * 2.0, "end": i * 2.0 + 1.5, "text": f" réponse {i}",
+                   "tokens": list(range(40)), "temperature": 0.0, "avg_logprob": -0.3,
+                   "compression_ratio": 1.1, "no_speech_prob": 0.02}
+        if with_words:
+            segment["words"] = [{"word": " réponse", "start": i * 2.0, "end": i * 2.0 + 0.7, "probability": 0.9},
+                                {"word": f" {i}", "start": i * 2.0 + 0.8, "end": i * 2.0 + 1.5, "probability": 0.8}]
+        segments.append(segment)
+    return {"text": "".join(s["text"] for s in segments).strip(), "language": "fr", "duration": 39.5,
+            "segments": segments, "processing": {"backend": "stub", "model": "stub"}}
+
+
+def test_round_trip_keeps_times_text_and_words():
+    """Segments, word timestamps and metadata survive encoding; token arrays do not."""
+    data = _transcript()
+    encoded, sizes = encode_transcript(data)
+    transcript = decode_transcript(encoded)
+
+    assert transcript.text == data["text"]
+    assert transcript.language == "fr" and transcript.processing == data["processing"]
+    assert sizes["saved_bytes"] > 0 and sizes["compact_bytes"] == len(encoded)
+    segment = transcript.to_dict()["segments"][7]
+    assert segment == {"id": 7, "start": 14.0, "end": 15.5, "text": " réponse 7",
+                       "words": [{"start": 14.0, "end": 14.7, "word": " réponse"},
+                                 {"start": 14.8, "end": 15.5, "word": " 7"}]}
+
+
+def test_segments_are_decoded_lazily():
+    """Decoding reads the header only; segments are unpacked on first access."""
+    transcript = CompactTranscript.decode(CompactTranscript.from_dict(_transcript(with_words=False)).encode())
+
+    assert transcript._segments is None
+    starts, ends = transcript.timings()
+    assert transcript._segments is None and list(starts[:2]) == [0.0, 2.0]
+    assert transcript.segment_texts()[3] == " réponse 3" and transcript._segments is None
+    assert transcript.segments[1].get("words", []) == [] and transcript.segments[1].get("end") == 3.5
+
+
+def test_legacy_json_is_still_read():
+    """Rows written before the compact format decode the same way."""
+    data = _transcript(with_words=False)
+    transcript = decode_transcript(json.dumps(data))
+
+    assert transcript.text == data["text"]
+    assert [s["start"] for s in transcript.to_dict()["segments"]] == [s["start"] for s in data["segments"]]
+
+    # Plain-text rows carry no segments
+    transcript = decode_transcript("Plain transcript text from an early batch.")
+    assert transcript.text == "Plain transcript text from an early batch."
+    assert transcript.segments == [] and transcript.segment_count == 0
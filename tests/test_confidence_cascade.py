@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for the fast-model-first confidence cascade."""
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import NormalizedAudio, SAMPLE_RATE
+from app.services.transcription.confidence_cascade import ConfidenceCascade, escalation_windows, find_low_confidence
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.transcription_service import TranscriptionService
+
+
+class TwoModelBackend(TranscriptionBackend):
+    """Fast model is unsure about its middle segment; the large model is not."""
+    name = "two_model"
+    calls = []
+
+    def is_available(self):
+        return True
+
+    async def _transcribe(self, pcm_path, model_size, window, language):
+        self.calls.append((model_size, window))
+        if model_size == "tiny":
+            return {"text": " one two three", "language": "en", "inference_seconds": 1.0, "segments": [
+                {"id": 0, "start": 0.0, "end": 2.0, "text": " one", "avg_logprob": -0.2, "no_speech_prob": 0.01},
+                {"id": 1, "start": 2.0, "end": 4.0, "text": " tw", "avg_logprob": -1.5, "no_speech_prob": 0.01},
+                {"id": 2, "start": 4.0, "end": 6.0, "text": " three", "avg_logprob": -0.1, "no_speech_prob": 0.01},
+            ]}
+        return {"text": " two", "language": "en", "inference_seconds": 2.0, "segments": [
+            {"id": 0, "start": 0.0, "end": 2.0, "text": " two", "avg_logprob": -0.1, "no_speech_prob": 0.01}
+        ]}
+
+
+def test_windows_stay_inside_neighbours():
+    """Padding around an unsure segment stops at the confident segments next to it."""
+    segments = [{"start": 0.0, "end": 2.0}, {"start": 2.0, "end": 4.0}, {"start": 4.5, "end": 6.0}]
+    assert escalation_windows(segments, [1], duration=6.0, padding=1.0) == [(2.0, 4.5, [1])]
+    assert escalation_windows(segments, [0, 1], duration=6.0, padding=1.0) == [(0.0, 4.5, [0, 1])]
+    assert find_low_confidence([{"avg_logprob": -0.1}, {"no_speech_prob": 0.9}, {"compression_ratio": 3.0}]) == [1, 2]
+
+
+def test_only_unsure_segments_are_escalated(tmp_path, monkeypatch, register_backend):
+    """The large model re-transcribes only the unsure window and is spliced back in."""
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CASCADE_ENABLED", True)
+    monkeypatch.setattr(settings, "CASCADE_FAST_MODEL_SIZE", "tiny")
+    monkeypatch.setattr(settings, "CASCADE_PADDING_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "USE_FALLBACK_TRANSCRIPTION", False)
+    register_backend("two_model", TwoModelBackend)
+    TwoModelBackend.calls.clear()
+
+    pcm_path = str(tmp_path / "answer.pcm")
+    np.zeros(6 * SAMPLE_RATE, dtype=np.int16).tofile(pcm_path)
+    normalized = NormalizedAudio(pcm_path=pcm_path, content_hash="abc", duration=6.0,
+                                 decode_seconds=0.0, cache_hit=True)
+    service = TranscriptionService(model_size="small", backend_name="two_model")
+
+    result = asyncio.run(service._transcribe_normalized(normalized))
+
+    assert TwoModelBackend.calls == [("tiny", None), ("small", (2 * SAMPLE_RATE, 4 * SAMPLE_RATE))]
+    assert result["text"] == "one two three"
+    assert [segment["start"] for segment in result["segments"]] == [0.0, 2.0, 4.0]
+    assert result["segments"][1]["escalated"] is True
+    assert result["cascade"]["escalated_segments"] == 1
+    assert result["model"] == "tiny-cascade-small" == service.cache_model(TwoModelBackend())
+
+
+def test_failed_window_keeps_fast_segments(tmp_path):
+    """An escalation error leaves the fast result in place and is counted, not raised."""
+    class FailingLargeModel(TwoModelBackend):
+        async def _transcribe(self, pcm_path, model_size, window, language):
+            raise RuntimeError("out of memory")
+
+    pcm_path = str(tmp_path / "answer.pcm")
+    np.zeros(6 * SAMPLE_RATE, dtype=np.int16).tofile(pcm_path)
+    normalized = NormalizedAudio(pcm_path=pcm_path, content_hash="abc", duration=6.0,
+                                 decode_seconds=0.0, cache_hit=True)
+    fast = asyncio.run(TwoModelBackend()._transcribe(pcm_path, "tiny", None, "en"))
+    cascade = ConfidenceCascade()
+
+    result = asyncio.run(cascade.escalate(FailingLargeModel(), normalized, fast, "small"))
+
+    assert [segment["text"] for segment in result["segments"]] == [" one", " tw", " three"]
+    assert result["cascade"]["failed_windows"] == 1 and result["cascade"]["escalated_segments"] == 0
+    assert cascade.get_stats()["failed_windows"] == 1
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Tests for live transcription of answers streamed while recording."""
+import os
+import sys
+import json
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.endpoints.candidates.recordings import stream_recording
+from app.core.config import settings
+from app.core.database.models import Base, Recording
+from app.services.transcription.audio_preprocessor import AudioPreprocessor, SAMPLE_RATE
+from app.services.transcription import live_transcriber as live_module
+from app.services.transcription.live_transcriber import LiveTranscriber, find_commit_point
+from app.services.transcription.stub_backend import StubTranscriptionBackend
+from app.services.transcription.transcript_cache import TranscriptCache
+
+
+class CopyDecoder:
+    """Streams raw PCM, so decoding is appending the bytes."""
+
+    def __init__(self, pcm_path):
+        self.pcm_path = pcm_path
+        open(pcm_path, "wb").close()
+
+    @property
+    def decoded_samples(self):
+        return os.path.getsize(self.pcm_path) // 2
+
+    def write(self, data):
+        with open(self.pcm_path, "ab") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class TwoSizeBackend(StubTranscriptionBackend):
+    """Stub backend whose model sizes are distinct models, so the cascade applies."""
+    name = "two_size"
+
+    def resolve_model(self, model_size):
+        return model_size
+
+
+class FakeWebSocket:
+    """Plays the candidate portal: sends the queued messages and records the replies."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        if not self.messages:
+            return {"type": "websocket.disconnect"}
+        return self.messages.pop(0)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000, reason=None):
+        self.closed = True
+
+
+class LiveRecordingService:
+    """Opens streams for any token, without a database."""
+
+    async def open_live_stream(self, token, question_id, file_extension, db):
+        return live_module.live_transcriber.open(1, question_id, file_extension, "en")
+
+
+def _live_setup(tmp_path, monkeypatch, backend="stub"):
+    """Stream raw PCM through the shared live transcriber with an isolated transcript cache."""
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", backend)
+    monkeypatch.setattr(settings, "USE_OPENAI_WHISPER", False)
+    monkeypatch.setattr(settings, "USE_FALLBACK_TRANSCRIPTION", False)
+    monkeypatch.setattr(settings, "LIVE_TRANSCRIPTION_INTERVAL_SECONDS", 0)
+    preprocessor = AudioPreprocessor(cache_dir=str(tmp_path / "pcm"))
+    monkeypatch.setattr(preprocessor, "stream_decoder", CopyDecoder)
+    monkeypatch.setattr(live_module, "audio_preprocessor", preprocessor)
+    cache = TranscriptCache(cache_dir=str(tmp_path / "transcripts"))
+    monkeypatch.setattr(live_module, "transcript_cache", cache)
+    monkeypatch.setattr(importlib.import_module("app.services.transcription.transcription_service"),
+                        "transcript_cache", cache)
+    return cache
+
+
+def _speech_pcm(seconds):
+    """3 s tone bursts separated by 1 s pauses, as raw s16le bytes."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t)
+    audio[(t % 4) > 3] = 0.0
+    return (audio * 32767).astype(np.int16).tobytes()
+
+
+def test_commit_point_is_the_last_pause(tmp_path):
+    """Windows end in the middle of the latest pause, or wait for one."""
+    pcm_path = str(tmp_path / "answer.pcm")
+    with open(pcm_path, "wb") as f:
+        f.write(_speech_pcm(10))
+
+    cut = find_commit_point(pcm_path, 0, 10 * SAMPLE_RATE, max_seconds=60)
+    assert 7.0 * SAMPLE_RATE < cut < 8.0 * SAMPLE_RATE
+    # Only the uncommitted audio is measured; cut points stay on the recording's timeline
+    later_cut = find_commit_point(pcm_path, 4 * SAMPLE_RATE, 10 * SAMPLE_RATE, max_seconds=60)
+    assert 7.0 * SAMPLE_RATE < later_cut < 8.0 * SAMPLE_RATE
+    assert find_commit_point(pcm_path, 0, int(2.5 * SAMPLE_RATE), max_seconds=60) is None
+    assert find_commit_point(pcm_path, 0, int(2.5 * SAMPLE_RATE), max_seconds=2, min_seconds=1) == 2 * SAMPLE_RATE
+
+
+def test_stream_is_mostly_transcribed_before_finish(tmp_path, monkeypatch):
+    """Passes during streaming leave only the tail for finish()."""
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", "stub")
+    monkeypatch.setattr(settings, "USE_OPENAI_WHISPER", False)
+    monkeypatch.setattr(settings, "LIVE_TRANSCRIPTION_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(settings, "TRANSCRIPT_CACHE_DIR", str(tmp_path / "transcripts"))
+    # Stream raw PCM so the decoder only appends it
+    preprocessor = AudioPreprocessor(cache_dir=str(tmp_path / "pcm"))
+    monkeypatch.setattr(preprocessor, "stream_decoder", CopyDecoder)
+    monkeypatch.setattr(live_module, "audio_preprocessor", preprocessor)
+
+    async def _stream():
+        transcriber = LiveTranscriber()
+        stream = transcriber.open(session_id=1, question_id=2, file_extension=".pcm", language="en")
+        pcm = _speech_pcm(20)
+        for i in range(0, len(pcm), 2 * SAMPLE_RATE):
+            await transcriber.append(stream, pcm[i:i + 2 * SAMPLE_RATE])
+            await stream.pass_task
+        await transcriber.finish(stream)
+        claimed = await transcriber.claim(stream.stream_id, 1, 2)
+        transcriber.discard(claimed)
+        return stream
+
+    stream = asyncio.run(_stream())
+
+    live = stream.transcript_data["processing"]["live"]
+    assert stream.error is None and live["streamed_audio_seconds"] > 15.0
+    assert len(stream.transcript_data["segments"]) == 5
+    assert stream.transcript_data["processing"]["language_pinned"] is True
+    assert not os.path.exists(stream.file_path)
+    assert os.path.exists(preprocessor._cache_path(stream.content_hash))
+
+
+def test_websocket_streams_and_finishes_an_answer(tmp_path, monkeypatch):
+    """The endpoint acknowledges the stream, may report progress and sends the final transcript."""
+    _live_setup(tmp_path, monkeypatch)
+    recording_service = LiveRecordingService()
+    pcm = _speech_pcm(20)
+    websocket = FakeWebSocket(
+        [{"type": "websocket.receive", "bytes": pcm[i:i + 2 * SAMPLE_RATE]} for i in range(0, len(pcm), 2 * SAMPLE_RATE)]
+        + [{"type": "websocket.receive", "text": json.dumps({"type": "finish"})}]
+    )
+
+    asyncio.run(stream_recording(websocket, token="token", question_id=2, file_extension=".pcm",
+                                 db=SimpleNamespace(close=lambda: None), recording_service=recording_service))
+
+    types = [message["type"] for message in websocket.sent]
+    assert types[0] == "ready" and types[-1] == "final" and set(types[1:-1]) <= {"progress"}
+    final = websocket.sent[-1]
+    assert final["finished"] is True and final["error"] is None
+    # How the answer splits into windows depends on when passes run, so only the outcome is checked
+    assert final["text"].startswith("Speech segment") and final["transcribed_seconds"] == 20.0
+    assert websocket.closed
+    # The finished stream waits for its upload
+    stream = live_module.live_transcriber.get(final["stream_id"])
+    assert stream is not None
+    live_module.live_transcriber.discard(stream)
+
+
+def test_upload_reuses_the_live_transcript(tmp_path, monkeypatch, register_backend):
+    """An upload with the streamed bytes' hash is served from the cache, also in cascade mode."""
+    cache = _live_setup(tmp_path, monkeypatch, backend="two_size")
+    register_backend("two_size", TwoSizeBackend)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CASCADE_ENABLED", True)
+    monkeypatch.setattr(settings, "CASCADE_FAST_MODEL_SIZE", "tiny")
+    service = live_module.transcription_service
+    monkeypatch.setattr(service, "model_size", "small")
+
+    async def _stream():
+        transcriber = LiveTranscriber()
+        stream = transcriber.open(session_id=1, question_id=2, file_extension=".pcm", language="en")
+        await transcriber.append(stream, _speech_pcm(8))
+        await transcriber.finish(stream)
+        transcriber.discard(stream)
+        return stream
+
+    stream = asyncio.run(_stream())
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Recording(id=1, session_id=1, question_id=2, file_path="missing.pcm", content_hash=stream.content_hash))
+    db.commit()
+
+    # The file is never read: the transcript comes from the cache
+    assert asyncio.run(service.transcribe_recording(1, db)) is True
+    recording = db.get(Recording, 1)
+    assert recording.transcription_status == "completed"
+    assert cache.get(stream.content_hash, "tiny-cascade-small", "two_size") is not None
+    assert cache.get_stats()["hits"] >= 1
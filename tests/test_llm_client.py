@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for the shared async LLM client used by analysis."""
+import os
+import sys
+import time
+import asyncio
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.analysis.llm_client import LLMClient
+
+
+class _SlowCompletions:
+    """Stands in for the OpenAI API: answers after a delay without blocking the loop."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(model=request["model"])
+
+
+def _client(monkeypatch, delay):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    completions = _SlowCompletions(delay)
+    client = LLMClient()
+    created = []
+    monkeypatch.setattr(client, "_create_client",
+                        lambda: created.append(1) or SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return client, completions, created
+
+
+def test_completions_share_one_client_and_keep_the_loop_free(monkeypatch):
+    """Concurrent calls reuse the loop's client while a ticker keeps running on time."""
+    client, completions, created = _client(monkeypatch, delay=0.3)
+
+    async def _run():
+        lags = []
+
+        async def _ticker():
+            for _ in range(10):
+                expected = time.perf_counter() + 0.02
+                await asyncio.sleep(0.02)
+                lags.append(time.perf_counter() - expected)
+
+        await asyncio.gather(_ticker(), *[client.chat_completion(model="gpt-4o-mini", timeout=5) for _ in range(3)])
+        return lags
+
+    lags = asyncio.run(_run())
+    assert max(lags) < 0.1
+    assert len(created) == 1 and completions.requests[0]["timeout"] == 5
+    assert client.get_stats()["completed"] == 3
+
+
+def test_cancelling_the_caller_cancels_the_request(monkeypatch):
+    """A cancelled analysis task does not leave the completion running."""
+    client, _, _ = _client(monkeypatch, delay=10)
+
+    async def _run():
+        task = asyncio.create_task(client.chat_completion(model="gpt-4o-mini"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(_run()) is True
+    stats = client.get_stats()
+    assert stats["cancelled"] == 1 and stats["in_flight"] == 0
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Tests for rate-limit pacing and retries of LLM calls."""
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.services.analysis.llm_scheduler import LLMScheduler, TokenBucket
+
+
+def test_token_bucket_queues_reservations_in_order():
+    """Once the minute's budget is spent, each reservation waits behind the previous one."""
+    bucket = TokenBucket(60)  # One per second
+    assert bucket.reserve(60) == 0
+    first, second = bucket.reserve(1), bucket.reserve(1)
+    assert 0.9 < first < 1.1 and 1.9 < second < 2.1
+    bucket.refund(2)
+    assert bucket.reserve(1) < 1.1
+
+
+def test_rate_limited_calls_are_paced_and_retried(monkeypatch):
+    """Calls beyond the TPM budget wait in the queue; 429s are retried after Retry-After."""
+    monkeypatch.setattr(settings, "LLM_SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_RATE_LIMITS", "test-model=6000:60000")  # 1000 tokens per second
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 0.01)
+    scheduler = LLMScheduler()
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            response = SimpleNamespace(status_code=429, headers={"retry-after-ms": "50"}, request=None)
+            raise RateLimitError("Rate limit reached", response=response, body=None)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=60))
+
+    async def run():
+        # With the minute's budget spent, each 100-token call queues for another 0.1s of refill
+        scheduler._buckets_for("test-model")[1].reserve(60000)
+        await asyncio.gather(*[scheduler.submit("test-model", 100, call) for _ in range(3)])
+
+    asyncio.run(run())
+    stats = scheduler.get_stats()
+    assert stats["rate_limited"] == 2 and stats["retries"] == 2 and len(attempts) == 5
+    assert stats["max_queue_depth"] == 3 and stats["total_wait_seconds"] > 0.3
+    assert stats["queued"] == 0
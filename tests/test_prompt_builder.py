@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests for the token-budgeted analysis prompt builder."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.analysis.prompt_builder import (
+    PromptBuilder, TokenCounter, trim_filler, collapse_stutters, OMISSION_MARKER
+)
+
+
+def _render(i, response):
+    return f"\n### Question {i + 1}\n**Response:** {response}\n"
+
+
+def _answer(sentences, filler=False):
+    hesitation = "um, " if filler else ""
+    return " ".join(f"{hesitation}In project {n} I designed the caching layer and measured the latency gains."
+                    for n in range(sentences))
+
+
+def test_filler_trimming():
+    """Hesitations go; words that merely contain them stay. Stutters are collapsed separately."""
+    text = "Um, I I think, uh, the umbrella team, you know, shipped it."
+    assert trim_filler(text) == "I I think the umbrella team shipped it."
+    assert collapse_stutters(trim_filler(text)) == "I think the umbrella team shipped it."
+
+
+def test_meant_repeats_are_not_collapsed():
+    """Numbers and words that are grammatical when doubled keep their meaning."""
+    text = "She had had very very little time, so that that plan took 2 2 3 weeks."
+    assert collapse_stutters(text) == text
+
+
+def test_short_answers_stay_whole_and_long_ones_are_compressed():
+    """Over budget, the long answers share what the short ones leave."""
+    builder = PromptBuilder(TokenCounter(max_entries=100))
+    answers = [_answer(2), _answer(60), _answer(80)]
+    full = builder.build("system", "header\n", "footer\n", answers, _render, model="gpt-4o-mini", budget_tokens=100000)
+    assert full.level == "full" and full.prompt.count(OMISSION_MARKER.strip()) == 0
+
+    plan = builder.build("system", "header\n", "footer\n", answers, _render, model="gpt-4o-mini", budget_tokens=800)
+    assert plan.level == "compressed"
+    assert plan.prompt_tokens <= 800 + len(answers)
+    assert answers[0] in plan.prompt
+    assert plan.answers[1]["sent"] < plan.answers[1]["original"]
+    assert plan.prompt.count("In project 79") == 1  # closing sentence of the longest answer is kept
+    assert plan.to_metadata()["predicted_prompt_tokens"] == plan.prompt_tokens
+
+
+def test_filler_trimming_is_tried_before_compression():
+    """An answer that fits once hesitations are gone is otherwise sent whole."""
+    counter = TokenCounter(max_entries=100)
+    builder = PromptBuilder(counter)
+    answer = _answer(10, filler=True)
+    trimmed_tokens = counter.count(_render(0, trim_filler(answer)), "gpt-4o-mini")
+
+    plan = builder.build("", "", "", [answer], _render, model="gpt-4o-mini", budget_tokens=trimmed_tokens + 20)
+    assert plan.level == "filler_trimmed" and OMISSION_MARKER.strip() not in plan.prompt
+
+    builder.build("", "", "", [answer], _render, model="gpt-4o-mini", budget_tokens=trimmed_tokens + 20)
+    assert counter.get_stats()["hits"] > 0
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Tests for per-question analysis fan-out and the session merge."""
+import os
+import sys
+import json
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.analysis.analysis_service import AnalysisService
+
+def _transcripts(count):
+    return [{
+        "question_id": i + 1,
+        "question_text": f"Question {i + 1}?",
+        "question_category": "general",
+        "transcript": f"Answer number {i + 1} with some detail.",
+        "word_count": 6,
+        "duration": 4.0,
+        "speaking_rate": 90.0
+    } for i in range(count)]
+
+
+SESSION_METRICS = {"total_duration": 20.0, "total_words": 30, "average_speaking_rate": 90.0}
+
+
+def _reply(request):
+    prompt = request["messages"][1]["content"]
+    if "Answer number 3" in prompt:
+        return "not json"
+    if "score" in prompt and "hiring_recommendation" in prompt:
+        return json.dumps({"overall_score": 7, "hiring_recommendation": "hire"})
+    return json.dumps({"score": 7, "scores": {"communication": 7}})
+
+
+def test_questions_fan_out_with_bounded_concurrency(fake_llm, monkeypatch):
+    """Calls overlap up to the limit, a malformed answer is isolated, and reruns only pay for changes."""
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "ANALYSIS_QUESTION_CONCURRENCY", 2)
+    fake_llm.reply, fake_llm.usage, fake_llm.delay = _reply, (300, 50), 0.02
+    calls = fake_llm.calls
+    service = AnalysisService()
+
+    transcripts = _transcripts(5)
+    analysis, completions, budget = asyncio.run(service._analyze_questions_and_merge(transcripts, SESSION_METRICS, False))
+    assert len(calls) == 6 and fake_llm.max_in_flight == 2
+    assert transcripts[2]["question_analysis"]["error"] == "parsing_error"
+    assert transcripts[0]["question_analysis"]["score"] == 7
+    assert analysis["hiring_recommendation"] == "hire"
+    assert len(budget["questions"]) == 5
+
+    # Only the edited answer and the malformed one (never cached) are sent again
+    transcripts = _transcripts(5)
+    transcripts[0]["transcript"] = "A different first answer."
+    asyncio.run(service._analyze_questions_and_merge(transcripts, SESSION_METRICS, False))
+    question_calls = [c for c in calls[6:] if "hiring_recommendation" not in c["messages"][1]["content"]]
+    assert len(question_calls) == 2
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests for the analysis step of interviewer-triggered batch processing."""
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from openai import RateLimitError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.endpoints.interviewer.results import _process_session_analysis
+from app.core.database.models import Base, Recording
+from app.services.analysis.analysis_service import analysis_service
+
+
+def _recordings():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for recording_id in (1, 2):
+        db.add(Recording(id=recording_id, session_id=1, question_id=recording_id, transcript="{}",
+                         transcription_status="completed", analysis_status="pending"))
+    db.commit()
+    return db, db.query(Recording).order_by(Recording.id).all()
+
+
+def test_each_recording_stores_its_entry_of_the_session_analysis(monkeypatch):
+    """One session analysis serves every recording, without the segments."""
+    db, recordings = _recordings()
+
+    async def analyze(session_id, db):
+        return {"question_responses": [
+            {"recording_id": 1, "transcript": "first", "segments": [{"start": 0.0}]},
+            {"recording_id": 2, "transcript": "second", "segments": []}
+        ]}
+    monkeypatch.setattr(analysis_service, "analyze_session_transcripts", analyze)
+
+    asyncio.run(_process_session_analysis(db, 1, recordings))
+    assert [recording.analysis_status for recording in recordings] == ["completed", "completed"]
+    assert json.loads(recordings[1].analysis) == {"recording_id": 2, "transcript": "second"}
+
+
+def test_exhausted_rate_limit_schedules_a_retry(monkeypatch):
+    """A 429 that outlasted the scheduler's retries is retried an hour later instead of failing."""
+    db, recordings = _recordings()
+
+    async def analyze(session_id, db):
+        response = SimpleNamespace(status_code=429, headers={}, request=None)
+        raise RateLimitError("Rate limit reached", response=response, body=None)
+    monkeypatch.setattr(analysis_service, "analyze_session_transcripts", analyze)
+
+    asyncio.run(_process_session_analysis(db, 1, recordings))
+    for recording in recordings:
+        assert recording.analysis_status == "retry_scheduled"
+        assert recording.analysis_error == "Rate limit reached"
+        next_retry_at = recording.next_retry_at.replace(tzinfo=timezone.utc)
+        assert 3500 < (next_retry_at - datetime.now(timezone.utc)).total_seconds() <= 3600
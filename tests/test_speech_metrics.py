@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Tests for the vectorized speech metrics engine."""
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.analysis.analysis_service import AnalysisService
+from app.services.analysis.prompt_builder import trim_filler
+from app.services.analysis.speech_metrics import SpeechMetricsEngine, recording_timings, buffer_timings, count_filler
+from app.services.transcription.compact_transcript import encode_transcript, decode_transcript
+
+
+def _segments(count, seed):
+    rng = random.Random(seed)
+    segments, t = [], rng.uniform(0, 2)
+    for i in range(count):
+        length = rng.uniform(0.5, 6)
+        segments.append({"id": i, "start": t, "end": t + length, "text": " um word" * rng.randint(1, 12)})
+        t += length + rng.choice([0.0, 0.05, 0.3, 0.8, 1.5, 2.5, 4.0])
+    return segments
+
+
+def test_matches_the_per_segment_loop():
+    """One pass over the whole session gives the loop's figures for every recording, empty ones included."""
+    sessions = [_segments(40, 1), [], _segments(1, 2), _segments(200, 3)]
+    metrics = SpeechMetricsEngine(rate_windows=3).analyze_session([recording_timings(s) for s in sessions])
+
+    loop = AnalysisService.__new__(AnalysisService)
+    for segments, result in zip(sessions, metrics):
+        expected = loop._analyze_speech_timing(segments)
+        assert set(expected) <= set(result)
+        for key, value in expected.items():
+            assert result[key] == pytest.approx(value), key
+        if segments:
+            assert sum(result["pause_histogram"]) == result["total_pauses"]
+            assert result["long_pauses"] == sum(1 for a, b in zip(segments, segments[1:]) if b["start"] - a["end"] > 3.0)
+            assert result["filler_rate"] == pytest.approx(50.0)
+            assert len(result["speaking_rate_over_time"]) == 3
+
+
+def test_speaking_rate_over_time():
+    """Words are counted in the part of the answer where their segment falls."""
+    segments = [
+        {"start": 0.0, "end": 10.0, "text": "one two three four five six seven eight nine ten"},
+        {"start": 10.0, "end": 20.0, "text": "one two"},
+        {"start": 20.0, "end": 30.0, "text": "one two three four five"},
+    ]
+    [result] = SpeechMetricsEngine(rate_windows=3).analyze_session([recording_timings(segments)])
+    assert result["speaking_rate_over_time"] == [60.0, 12.0, 30.0]
+    assert result["total_pauses"] == 0 and result["speech_continuity_score"] == 10.0
+
+
+def test_only_stutters_count_as_fillers():
+    """Repeated numbers and meant repeats like "had had" are not fillers."""
+    assert count_filler("I I had had um 2 2 the the results") == {"words": 10, "fillers": 3}
+
+
+def test_fillers_are_what_the_prompt_trims():
+    """Hesitations are counted by the same scan that leaves them out of the prompt."""
+    text = "So,  you know, we um shipped it, uh, on time"
+    assert count_filler(text)["fillers"] == 3
+    assert trim_filler(text) == "So we shipped it on time"
+
+
+def test_stored_transcripts_give_the_same_metrics():
+    """Word counts read from the compact transcript's UTF-8 buffer match those of the segment texts."""
+    segments = _segments(30, 4)
+    segments[3]["text"] = " réponse   très  longue"
+    transcript = decode_transcript(encode_transcript({"text": "", "segments": segments})[0])
+    starts, ends = transcript.timings()
+    engine = SpeechMetricsEngine(rate_windows=4)
+    [from_dicts] = engine.analyze_session([recording_timings(segments, transcript.text)])
+    [stored] = engine.analyze_session([buffer_timings(starts, ends, *transcript.segment_text_buffer(), transcript.text)])
+    assert stored["speaking_rate_over_time"] == pytest.approx(from_dicts["speaking_rate_over_time"], rel=1e-3)
+    assert stored["filler_words"] == from_dicts["filler_words"]
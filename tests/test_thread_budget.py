@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Tests for the per-worker inference thread budget."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.transcription.thread_budget import ThreadBudget
+
+
+def test_cores_are_split_across_workers_and_pool_processes(monkeypatch):
+    """16 cores over 4 web workers with 2 pool processes each leaves 2 threads per decode."""
+    monkeypatch.setattr(settings, "INFERENCE_CPU_CORES", 16)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "INFERENCE_EXECUTOR_MODE", "process")
+    monkeypatch.setattr(settings, "INFERENCE_POOL_WORKERS", 2)
+    monkeypatch.setattr(settings, "INFERENCE_INTRA_OP_THREADS", 0)
+
+    budget = ThreadBudget()
+    assert budget.cores_per_worker == 4 and budget.intra_op_threads == 2
+
+    # More workers than cores still leaves every decode one thread; an explicit count wins
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 32)
+    assert budget.intra_op_threads == 1
+    monkeypatch.setattr(settings, "INFERENCE_INTRA_OP_THREADS", 3)
+    assert budget.intra_op_threads == 3
+
+
+def test_apply_sets_native_thread_variables(monkeypatch):
+    """The budget is exported to the OpenMP/MKL variables spawned pool processes inherit."""
+    monkeypatch.setattr(settings, "INFERENCE_CPU_CORES", 8)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "INFERENCE_EXECUTOR_MODE", "thread")
+    monkeypatch.setattr(settings, "INFERENCE_MAX_CONCURRENT", 2)
+    monkeypatch.setattr(settings, "INFERENCE_INTRA_OP_THREADS", 0)
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+
+    stats = ThreadBudget().apply("web_worker")
+    assert stats["intra_op_threads"] == 2 and stats["applied_to"] == "web_worker"
+    assert os.environ["OMP_NUM_THREADS"] == "2" and os.environ["MKL_NUM_THREADS"] == "2"
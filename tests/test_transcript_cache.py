@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for the content-hash transcript cache."""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.transcription.transcript_cache import TranscriptCache
+
+TRANSCRIPT = {"text": "hello there", "language": "en", "duration": 1.5,
+              "segments": [{"start": 0.0, "end": 1.5, "text": "hello there"}]}
+
+
+def test_hit_requires_matching_model_and_backend(tmp_path):
+    """Entries are keyed by audio hash, model size and backend."""
+    cache = TranscriptCache(cache_dir=str(tmp_path))
+    cache.put("abc", "base", "local_whisper", TRANSCRIPT)
+
+    assert cache.get("abc", "base", "local_whisper") == TRANSCRIPT
+    assert cache.get("abc", "small", "local_whisper") is None
+    assert cache.get("abc", "base", "openai_api") is None
+    assert cache.get("def", "base", "local_whisper") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Entries older than the age limit are dropped on lookup."""
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_age_days=1)
+    cache.put("abc", "base", "local_whisper", TRANSCRIPT)
+    path = cache._entry_path("abc", "base", "local_whisper")
+    old = time.time() - 2 * 86400
+    os.utime(path, (old, old))
+
+    assert cache.get("abc", "base", "local_whisper") is None
+    assert not os.path.exists(path)
+    assert cache.get_stats()["expired"] == 1
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    """Once over the size limit the least recently used entries go first."""
+    entry_size = len(str(TRANSCRIPT))
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_size_mb=2.5 * entry_size / 1024 ** 2)
+    now = time.time()
+    for age, content_hash in ((30, "oldest"), (20, "older")):
+        cache.put(content_hash, "base", "local_whisper", TRANSCRIPT)
+        path = cache._entry_path(content_hash, "base", "local_whisper")
+        os.utime(path, (now - age, now - age))
+
+    cache.put("newest", "base", "local_whisper", TRANSCRIPT)
+
+    assert not os.path.exists(cache._entry_path("oldest", "base", "local_whisper"))
+    assert os.path.exists(cache._entry_path("older", "base", "local_whisper"))
+    assert os.path.exists(cache._entry_path("newest", "base", "local_whisper"))
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_lookup_falls_through_expired_entries(tmp_path):
+    """An expired entry for the first key doesn't hide a cached transcript under a later one."""
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_age_days=1)
+    cache.put("abc", "base", "openai_api", TRANSCRIPT)
+    cache.put("abc", "base", "local_whisper", TRANSCRIPT)
+    path = cache._entry_path("abc", "base", "openai_api")
+    old = time.time() - 2 * 86400
+    os.utime(path, (old, old))
+
+    assert cache.get_any("abc", [("base", "openai_api"), ("base", "local_whisper")]) == TRANSCRIPT
+    stats = cache.get_stats()
+    assert stats["expired"] == 1 and stats["hits"] == 1 and stats["misses"] == 0
+
+
+def test_writes_under_the_size_limit_skip_the_scan(tmp_path, monkeypatch):
+    """The directory is only scanned once written bytes may exceed the limit."""
+    entry_size = len(str(TRANSCRIPT))
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_size_mb=4.5 * entry_size / 1024 ** 2)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for i in range(6):
+        cache.put(f"hash{i}", "base", "local_whisper", TRANSCRIPT)
+
+    # The first write establishes the size; the fifth and sixth push it over the limit
+    assert len(scans) == 3
+    assert len(os.listdir(tmp_path)) == 4
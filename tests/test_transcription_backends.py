@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for the transcription backend registry and fallback chain."""
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.transcription.audio_preprocessor import NormalizedAudio, SAMPLE_RATE
+from app.services.transcription.transcription_backend import TranscriptionBackend
+from app.services.transcription.transcription_backend_factory import TranscriptionBackendFactory
+from app.services.transcription.transcription_service import TranscriptionService
+
+
+class FailingBackend(TranscriptionBackend):
+    name = "failing"
+
+    def is_available(self):
+        return True
+
+    async def _transcribe(self, pcm_path, model_size, window, language):
+        raise RuntimeError("backend down")
+
+
+def _normalized(tmp_path, seconds=6.0):
+    """Two tone bursts with a pause between them, as cached PCM."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t)
+    audio[(t > 2.0) & (t < 4.0)] = 0.0
+    pcm_path = str(tmp_path / "answer.pcm")
+    (audio * 32767).astype(np.int16).tofile(pcm_path)
+    return NormalizedAudio(pcm_path=pcm_path, content_hash="abc", duration=seconds,
+                           decode_seconds=0.0, cache_hit=True)
+
+
+def test_stub_backend_is_deterministic(tmp_path):
+    """The stub backend returns the same segments for the same audio."""
+    normalized = _normalized(tmp_path)
+    service = TranscriptionService(backend_name="stub")
+
+    first = asyncio.run(service._transcribe_normalized(normalized))
+    second = asyncio.run(service._transcribe_normalized(normalized))
+
+    assert first["segments"] == second["segments"]
+    assert len(first["segments"]) == 2
+    assert first["backend"] == "stub"
+    assert service.build_transcript_data(first, normalized)["processing"]["backend"] == "stub"
+
+
+def test_failed_backend_falls_back(tmp_path, monkeypatch, register_backend):
+    """A failing primary backend hands over to the fallback, which is recorded."""
+    monkeypatch.setattr(settings, "USE_FALLBACK_TRANSCRIPTION", True)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_FALLBACK_BACKEND", "stub")
+    register_backend("failing", FailingBackend)
+    fallbacks_before = TranscriptionBackendFactory.get_stats()["fallbacks"]
+
+    result = asyncio.run(TranscriptionService(backend_name="failing")._transcribe_normalized(_normalized(tmp_path)))
+
+    assert result["backend"] == "stub"
+    assert TranscriptionBackendFactory.get_stats()["fallbacks"] == fallbacks_before + 1
+    assert TranscriptionBackendFactory.get_backend("failing").get_stats()["failures"] == 1
+
+
+def test_unavailable_backend_is_skipped(monkeypatch):
+    """Backends without credentials are left out of the chain."""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(settings, "USE_OPENAI_WHISPER", False)
+    monkeypatch.setattr(settings, "USE_FALLBACK_TRANSCRIPTION", True)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_FALLBACK_BACKEND", "stub")
+
+    chain = TranscriptionBackendFactory.get_backend_chain("openai_api")
+    assert [backend.name for backend in chain] == ["stub"]
+
+
+def test_openai_backend_uploads_trimmed_audio(tmp_path, monkeypatch):
+    """Long silences are not uploaded, and segment times come back on the recording's timeline."""
+    from types import SimpleNamespace
+    from app.services.transcription.openai_backend import OpenAITranscriptionBackend
+
+    monkeypatch.setattr(settings, "VAD_ENABLED", True)
+    uploads = []
+
+    async def create(**request):
+        uploads.append(request["file"][1])
+        return {"text": " later", "language": "english",
+                "segments": [{"id": 0, "start": 3.0, "end": 3.5, "text": " later"}]}
+
+    backend = OpenAITranscriptionBackend()
+    backend._client = SimpleNamespace(audio=SimpleNamespace(transcriptions=SimpleNamespace(create=create)))
+    normalized = _normalized(tmp_path)
+
+    result = asyncio.run(backend._transcribe(normalized.pcm_path, "base", None, None))
+
+    assert len(uploads[0]) < 2 * 5 * SAMPLE_RATE
+    assert result["vad"]["skipped_percentage"] > 0
+    assert result["segments"][0]["start"] > 4.0
+
+
+def test_language_names_are_normalized_to_codes(monkeypatch):
+    """The hosted API's full language names pin the same code as local Whisper's, without Whisper installed."""
+    monkeypatch.setitem(sys.modules, "whisper", None)
+    service = TranscriptionService(backend_name="stub")
+
+    assert service._language_code("English") == "en" and service._language_code("en") == "en"
+    assert service._language_code("castilian") == "es"
+    assert service._language_code("klingon") is None and service._language_code(None) is None
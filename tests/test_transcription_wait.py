@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Tests for waiting on upload transcriptions through the database."""
+import os
+import sys
+import asyncio
+import importlib
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database.models import Base, Recording
+from app.services.transcription.transcription_service import TranscriptionService
+
+service_module = importlib.import_module("app.services.transcription.transcription_service")
+
+
+def _database(*rows):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for recording_id, status, started_at in rows:
+        db.add(Recording(id=recording_id, session_id=1, question_id=1,
+                         transcription_status=status, transcription_started_at=started_at))
+    db.commit()
+    return db
+
+
+def test_stale_rows_are_reclaimed_and_returned():
+    """A row another worker left in processing is redone; finished rows are not."""
+    now = datetime.now(timezone.utc)
+    db = _database((1, "completed", now), (2, "processing", now - timedelta(hours=2)), (3, "failed", now))
+    service = TranscriptionService(backend_name="stub")
+
+    pending = asyncio.run(service.wait_for_transcriptions([1, 2, 3], db))
+    assert sorted(pending) == [2, 3]
+    assert db.get(Recording, 2).transcription_status == "pending"
+
+
+def test_rows_still_running_at_the_timeout_are_reclaimed():
+    """A fresh in-flight row is waited for until the timeout, then handed back."""
+    db = _database((1, "processing", datetime.now(timezone.utc)))
+    service = TranscriptionService(backend_name="stub")
+
+    assert asyncio.run(service.wait_for_transcriptions([1], db, timeout_seconds=0)) == [1]
+
+
+def test_queued_rows_with_a_fresh_heartbeat_are_waited_for(monkeypatch):
+    """A row queued long ago is left alone while its worker keeps the heartbeat fresh."""
+    monkeypatch.setattr(settings, "TRANSCRIPTION_WAIT_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_STALE_SECONDS", 0.05)
+    db = _database()
+    db.add(Recording(id=1, session_id=1, question_id=1, transcription_status="queued",
+                     created_at=datetime.now(timezone.utc) - timedelta(hours=2),
+                     transcription_heartbeat_at=datetime.now(timezone.utc)))
+    db.commit()
+    monkeypatch.setattr(service_module, "create_task_session", lambda: sessionmaker(bind=db.get_bind())())
+    service = TranscriptionService(backend_name="stub")
+
+    async def run():
+        heartbeat = service._start_heartbeat(1)
+        waiting = asyncio.create_task(service.wait_for_transcriptions([1], db, timeout_seconds=5))
+        # Several times the stale limit
+        await asyncio.sleep(0.3)
+        heartbeat.cancel()
+        db.get(Recording, 1).transcription_status = "completed"
+        db.commit()
+        return await waiting
+
+    assert asyncio.run(run()) == []
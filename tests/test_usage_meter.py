@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests for buffered LLM usage metering and daily rollups."""
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database.models import Base, LLMUsage
+from app.services.analysis.usage_meter import UsageMeter, usage_context
+
+
+def _meter():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    return UsageMeter(session_factory=factory), factory
+
+
+def test_calls_are_buffered_then_rolled_up_per_tenant_and_model(monkeypatch):
+    """Recording does no database work; flushes insert the calls and add to the daily totals."""
+    monkeypatch.setattr(settings, "USAGE_METER_ENABLED", True)
+    monkeypatch.setattr(settings, "USAGE_METER_BATCH_SIZE", 1000)
+    meter, factory = _meter()
+
+    with usage_context(user_id=7, session_id=3):
+        meter.record("gpt-4o-mini", 1000, 200, 0.0003, purpose="session_analysis")
+        meter.record("gpt-4o-mini", 500, 100, 0.00015, purpose="session_analysis")
+    meter.record("gpt-4o", 100, 50, 0.001)
+    assert meter.get_stats()["buffered"] == 3
+    assert factory().query(LLMUsage).count() == 0
+
+    assert asyncio.run(meter.flush()) == 3
+    with usage_context(user_id=7):
+        meter.record("gpt-4o-mini", 100, 0, 0.000015)
+    asyncio.run(meter.flush())
+
+    db = factory()
+    assert db.query(LLMUsage).filter_by(user_id=7).count() == 3
+    rollups = {(row["user_id"], row["model"]): row for row in meter.daily_rollups(db)}
+    assert rollups[(7, "gpt-4o-mini")]["calls"] == 3
+    assert rollups[(7, "gpt-4o-mini")]["total_tokens"] == 1900
+    assert rollups[(None, "gpt-4o")]["cost"] == 0.001
+    assert meter.daily_rollups(db, user_id=7, model="gpt-4o") == []
+
+
+def test_failed_flush_keeps_records_for_the_next_one(monkeypatch):
+    """Nothing is lost while the database is unavailable."""
+    monkeypatch.setattr(settings, "USAGE_METER_ENABLED", True)
+    meter, factory = _meter()
+    meter.record("gpt-4o-mini", 10, 10, 0.0)
+
+    def broken_session():
+        raise ConnectionError("database unavailable")
+
+    meter._session_factory = broken_session
+    assert asyncio.run(meter.flush()) == 0
+    assert meter.get_stats()["buffered"] == 1 and meter.get_stats()["flush_failures"] == 1
+
+    meter._session_factory = factory
+    assert asyncio.run(meter.flush()) == 1
+
+
+def test_rejected_rows_are_dropped_and_the_rest_written(monkeypatch):
+    """An integrity error is not retried forever: the batch is written row by row."""
+    monkeypatch.setattr(settings, "USAGE_METER_ENABLED", True)
+    meter, factory = _meter()
+    for _ in range(3):
+        meter.record("gpt-4o-mini", 10, 10, 0.0)
+    meter._buffer[1]["id"] = meter._buffer[2]["id"] = 5
+
+    assert asyncio.run(meter.flush()) == 2
+    stats = meter.get_stats()
+    assert stats["buffered"] == 0 and stats["rejected"] == 1
+    assert factory().query(LLMUsage).count() == 2
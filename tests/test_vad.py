@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Tests for VAD silence trimming and timestamp remapping."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.transcription.vad import trim_silence, detect_speech
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    rng = np.random.default_rng(0)
+    return (rng.normal(0, 1e-4, int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def test_long_silences_are_trimmed():
+    """Preparation-time silence and long mid-answer pauses are dropped."""
+    audio = np.concatenate([_silence(10), _tone(3), _silence(5), _tone(2), _silence(4)])
+    trimmed = trim_silence(audio, SAMPLE_RATE, min_silence=1.0, padding=0.25)
+
+    assert len(trimmed.original_starts) == 2
+    assert 5.0 < trimmed.trimmed_duration < 7.0
+    assert trimmed.skipped_percentage > 70
+
+
+def test_short_pauses_are_kept():
+    """Pauses shorter than min_silence stay in the audio."""
+    audio = np.concatenate([_silence(1), _tone(2), _silence(0.5), _tone(2), _silence(1)])
+    regions = detect_speech(audio, SAMPLE_RATE, min_silence=1.0, padding=0.1)
+    assert len(regions) == 1
+
+
+def test_segment_timestamps_map_back_to_original_timeline():
+    """Segments from trimmed audio land where the speech was in the recording."""
+    audio = np.concatenate([_silence(10), _tone(3), _silence(5), _tone(2), _silence(4)])
+    trimmed = trim_silence(audio, SAMPLE_RATE, min_silence=1.0, padding=0.25)
+
+    second_region_trimmed = float(trimmed.trimmed_starts[1])
+    segments = [
+        {"start": 0.25, "end": 3.25, "words": [{"start": 0.3, "end": 0.8}]},
+        {"start": second_region_trimmed + 0.25, "end": second_region_trimmed + 2.25}
+    ]
+    trimmed.remap_segments(segments)
+
+    assert abs(segments[0]["start"] - 10.0) < 0.05
+    assert abs(segments[0]["end"] - 13.0) < 0.05
+    assert abs(segments[0]["words"][0]["start"] - 10.05) < 0.05
+    assert abs(segments[1]["start"] - 18.0) < 0.05
+    # The 5 second pause between answers is visible again for pause metrics
+    assert segments[1]["start"] - segments[0]["end"] > 4.5
+
+
+def test_silent_recording_is_left_untouched():
+    """With no detectable speech the model still sees the whole recording."""
+    audio = _silence(5)
+    trimmed = trim_silence(audio, SAMPLE_RATE)
+    assert trimmed.trimmed_duration == trimmed.original_duration
+    assert trimmed.skipped_percentage == 0.0
+
+
+def test_continuous_speech_at_two_loudness_levels_is_kept():
+    """Without any real silence, quieter speech is not mistaken for the noise floor."""
+    audio = np.concatenate([_tone(0.25, amplitude) for _ in range(4) for amplitude in (0.3, 0.05)])
+    trimmed = trim_silence(audio, SAMPLE_RATE, min_silence=0.1, padding=0.0)
+    assert trimmed.skipped_percentage == 0.0